@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark reading large HTTP response bodies.
+
+Serves multi-megabyte bodies from a local server and compares safe_http_get
+with the previous read loop, which grew a bytes object chunk by chunk.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.origin.runtime.net import HTTPClient, safe_http_get
+
+
+class BodyHandler(BaseHTTPRequestHandler):
+    """Serves /<n> as n bytes of ASCII text."""
+    protocol_version = "HTTP/1.1"
+    
+    def do_GET(self):
+        size = int(self.path.strip("/"))
+        self.send_response(200)
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        self.wfile.write(b"x" * size)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def legacy_get(session: requests.Session, url: str) -> str:
+    """The read loop safe_http_get used before: content += chunk."""
+    response = session.get(url, stream=True)
+    content = b""
+    for chunk in response.iter_content(chunk_size=8192):
+        content += chunk
+    return content.decode('utf-8')
+
+
+def best_of(runs: int, fn) -> float:
+    """Fastest of several timed runs, in seconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTTP body reads")
+    parser.add_argument("--sizes", default="1,5,20", help="Comma-separated body sizes in MB")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BodyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    
+    session = requests.Session()
+    client = HTTPClient()
+    print(f"{'size':>8}  {'legacy':>10}  {'current':>10}  {'speedup':>8}")
+    try:
+        for size_mb in (float(s) for s in args.sizes.split(",")):
+            size = int(size_mb * 1024 * 1024)
+            url = f"{base}/{size}"
+            legacy = best_of(args.runs, lambda: legacy_get(session, url))
+            current = best_of(args.runs, lambda: safe_http_get(url, max_size=size, client=client))
+            print(f"{size_mb:>6g}MB  {legacy:>9.3f}s  {current:>9.3f}s  {legacy / current:>7.1f}x")
+    finally:
+        session.close()
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
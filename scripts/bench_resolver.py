@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark dependency resolution on synthetic registries.
+
+Generates a registry of packages with several versions each, whose
+dependencies point at later packages with caret ranges. In the "conflicts"
+scenario every tenth package has a new major version that only the newest
+versions of other packages accept, while their older versions (and some
+whole packages) pin the previous one, so the resolver has to give up
+versions and backjump. Resolution is timed both against in-memory metadata
+and through a registry.json file.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.origin.errors import OriginPkgError
+from src.origin.registry import Registry
+from src.origin.resolver import Resolver
+
+
+def make_registry(packages: int, versions: int, fanout: int, conflicts: bool, seed: int) -> dict:
+    """Registry entries ("name@version" -> {"url", "dependencies"}) for a synthetic graph."""
+    rng = random.Random(seed)
+    registry = {}
+    for i in range(packages):
+        for v in range(versions):
+            major = 2 if conflicts and v == versions - 1 and i % 10 == 0 else 1
+            version = f"{major}.{v}.0"
+            dependencies = {}
+            for _ in range(fanout):
+                j = rng.randrange(i + 1, packages + fanout) if i + 1 < packages else packages
+                if j < packages:
+                    newest = v == versions - 1 and i % 3 != 0
+                    target_major = 2 if conflicts and j % 10 == 0 and newest else 1
+                    dependencies[f"pkg{j}"] = f"^{target_major}.0.0"
+            registry[f"pkg{i}@{version}"] = {"url": f"https://pkg.test/pkg{i}-{version}.tar.gz",
+                                             "dependencies": dependencies}
+    return registry
+
+
+def resolve_in_memory(registry: dict, requirements: dict):
+    """Resolve with version lists and dependencies served from dicts."""
+    versions = {}
+    for key, entry in registry.items():
+        name, version = key.rsplit("@", 1)
+        versions.setdefault(name, []).append((version, entry["url"]))
+    resolver = Resolver(lambda name: versions.get(name, []),
+                        lambda name, version, url: registry[f"{name}@{version}"]["dependencies"])
+    return resolver, resolver.resolve(requirements)
+
+
+def resolve_from_file(path: Path, requirements: dict):
+    """Resolve through a Registry reading registry.json."""
+    registry = Registry(path)
+    resolver = Resolver(registry.versions, lambda name, version, url: registry.dependencies(name, version))
+    return resolver, resolver.resolve(requirements)
+
+
+def best_of(runs: int, fn):
+    """Fastest of several timed runs, in seconds, and the last result."""
+    times = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dependency resolution")
+    parser.add_argument("--packages", type=int, default=1000, help="Packages in the registry")
+    parser.add_argument("--versions", type=int, default=5, help="Versions per package")
+    parser.add_argument("--fanout", type=int, default=3, help="Dependencies per package version")
+    parser.add_argument("--roots", type=int, default=20, help="Packages the project depends on")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement (best is reported)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the graph")
+    args = parser.parse_args()
+    
+    print(f"{'scenario':>10}  {'resolved':>8}  {'decisions':>9}  {'backjumps':>9}  {'memory':>9}  {'file':>9}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for scenario in ("compatible", "conflicts"):
+            registry = make_registry(args.packages, args.versions, args.fanout,
+                                     scenario == "conflicts", args.seed)
+            path = Path(temp_dir) / f"{scenario}.json"
+            path.write_text(json.dumps(registry))
+            requirements = {f"pkg{i}": "*" for i in range(min(args.roots, args.packages))}
+            try:
+                memory, (resolver, resolution) = best_of(args.runs, lambda: resolve_in_memory(registry, requirements))
+                from_file, _ = best_of(args.runs, lambda: resolve_from_file(path, requirements))
+            except OriginPkgError as e:
+                print(f"{scenario:>10}  unresolvable: {str(e).splitlines()[0]}")
+                continue
+            print(f"{scenario:>10}  {len(resolution):>8}  {resolver.decisions:>9}  {resolver.backjumps:>9}  "
+                  f"{memory * 1000:>7.1f}ms  {from_file * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
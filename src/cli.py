@@ -13,17 +13,22 @@ import parser
 from src.origin.parser.optimizations import constant_fold
 
 from src.origin.pkgmgr import PackageManager
-from src.origin.errors import OriginPkgError, PublishError
+from src.origin.errors import OriginError, OriginPkgError, PublishError
 from src.origin.registry import Registry, parse_package_spec
 from src.origin.net import is_url
 from src.origin.evaluator import Evaluator
-from src.origin.recorder import Recorder
-from src.origin.utils import get_recording_path
-from src.origin.replayer import Replayer
+from src.origin.recorder import Recorder, SamplingRecorder
+from src.origin.utils import get_recording_path, EventSlice
+from src.origin.replayer import Replayer, extract_recording
 from src.origin.replay_shell import ReplayShell
+from src.origin.replay_index import RecordingIndex, RecordingQuery
+from src.origin.runtime.http_cache import HTTPCache, get_http_cache_enabled
+from src.origin.runtime.net_replay import NetReplay
 from src.origin.publish import publish_package
 
-def run(filename: str, net_allowed: bool = False, files_allowed: bool = True, record: bool = False, args: list = None, profile: bool = False) -> None:
+def run(filename: str, net_allowed: bool = False, files_allowed: bool = True, record: bool = False, args: list = None, profile: bool = False,
+        record_slice: EventSlice = None, sampling: dict = None, checkpoint_every: int = None,
+        resume: tuple = None, http_cache: bool = False, replay_net: str = None) -> None:
     with open(filename) as f:
         source = f.read()
     tokens = lexer.tokenize(source)
@@ -38,13 +43,40 @@ def run(filename: str, net_allowed: bool = False, files_allowed: bool = True, re
     if record:
         script_path = pathlib.Path(filename)
         recording_path = get_recording_path(script_path)
-        recorder = Recorder(recording_path)
-        print(f"Recording to {recording_path}")
+        if sampling:
+            recorder = SamplingRecorder(recording_path, **sampling)
+            print(f"Sampling execution; last {recorder.ring.maxlen} events go to {recording_path} on error")
+        elif record_slice is not None:
+            recorder = Recorder(recording_path, event_slice=record_slice, checkpoint_every=checkpoint_every)
+            print(f"Recording events {record_slice} to {recording_path}")
+        else:
+            recorder = Recorder(recording_path, checkpoint_every=checkpoint_every)
+            print(f"Recording to {recording_path}")
+    
+    # Find the checkpoint to continue a recorded run from
+    checkpoint = None
+    if resume:
+        resume_path, resume_at = resume
+        checkpoint = Replayer.from_file(pathlib.Path(resume_path)).resume_point(resume_at)
+        if checkpoint is None:
+            raise OriginError(f"no resumable checkpoint in {resume_path}; record with --checkpoint-every N")
+        print(f"Resuming from event {checkpoint.get('seq', '?')} (statement {checkpoint['position']['stmt'] + 1})")
+    
+    # Serve http_get from an earlier recording; no request reaches the network
+    net_replay = None
+    if replay_net:
+        net_replay = NetReplay.from_file(pathlib.Path(replay_net))
+        net_allowed = True
     
     # Use evaluator instead of runtime
-    evaluator = Evaluator(recorder)
+    cache = HTTPCache() if http_cache or get_http_cache_enabled() else None
+    evaluator = Evaluator(recorder, http_cache=cache, net_replay=net_replay)
     try:
-        evaluator.execute(ast, base_path=None, net_allowed=net_allowed, files_allowed=files_allowed, args=args)
+        if checkpoint is not None:
+            evaluator.resume(ast, checkpoint["position"]["stmt"], checkpoint["locals"], base_path=None,
+                             net_allowed=net_allowed, files_allowed=files_allowed, args=args)
+        else:
+            evaluator.execute(ast, base_path=None, net_allowed=net_allowed, files_allowed=files_allowed, args=args)
         
         # Print profiling information if requested
         if profile:
@@ -63,7 +95,24 @@ def run(filename: str, net_allowed: bool = False, files_allowed: bool = True, re
             else:
                 print("Profiling not yet implemented in current evaluator")
                 print("Use the visitor-based evaluator for detailed profiling")
+            http_stats = evaluator.http.stats()
+            if http_stats["requests"]:
+                print(f"HTTP pool: {http_stats['requests']} requests over {http_stats['connections']} connections "
+                      f"({http_stats['reused']} reused)")
+            if cache is not None:
+                cache_stats = cache.stats()
+                print(f"HTTP cache: {cache_stats['hits']} hits, {cache_stats['revalidated']} revalidated, "
+                      f"{cache_stats['misses']} misses")
+            if net_replay is not None:
+                print(f"HTTP replay: {net_replay.served} responses served from {net_replay.source}")
+    except Exception as e:
+        if recorder:
+            recorder.on_error(e)
+            if isinstance(recorder, SamplingRecorder) and recorder.event_count:
+                print(f"Wrote last {recorder.event_count} sampled events to {recorder.out_path}")
+        raise
     finally:
+        evaluator.close()
         if recorder:
             recorder.close()
 
@@ -79,12 +128,24 @@ def main():
     run_parser.add_argument("--deny-files", action="store_true", help="Deny file operations")
     run_parser.add_argument("--record", action="store_true", help="Record execution to .orirec file")
     run_parser.add_argument("--profile", action="store_true", help="Print execution profiling statistics")
+    run_parser.add_argument("--slice", help="With --record, keep only events START:END (indices) or START..END (block ids)")
+    run_parser.add_argument("--sample", type=int, metavar="N", help="With --record, sample every Nth event into a ring buffer written only on error")
+    run_parser.add_argument("--sample-rate", type=float, metavar="HZ", help="With --record, sample at most HZ events per second")
+    run_parser.add_argument("--sample-blocks", action="append", metavar="PATTERN", help="With --record, only sample block ids matching PATTERN (repeatable)")
+    run_parser.add_argument("--ring-size", type=int, default=1000, metavar="K", help="Sampled events kept for the error dump (default: 1000)")
+    run_parser.add_argument("--checkpoint-every", type=int, metavar="N", help="With --record, store variable deltas with a full checkpoint every N events")
+    run_parser.add_argument("--http-cache", action="store_true", help="Cache http_get responses in .origin/http-cache (or set ORIGIN_HTTP_CACHE=1)")
+    run_parser.add_argument("--replay-net", metavar="REC", help="Serve http_get responses from a recording instead of the network")
+    run_parser.add_argument("--resume", metavar="REC[@N]", help="Continue from the last checkpoint in a recording (at or before event N)")
     
     # Replay command (new functionality)
     replay_parser = subparsers.add_parser("replay", help="Replay recorded execution")
-    replay_parser.add_argument("file", help="Recording file (.orirec) to replay")
+    replay_parser.add_argument("file", help="Recording file (.orirec) to replay, or 'extract' / 'query'")
+    replay_parser.add_argument("extra", nargs="*", help="For 'extract': the recording file; for 'query': the recording file and query")
     replay_parser.add_argument("--step", action="store_true", help="Start interactive step-by-step replay")
     replay_parser.add_argument("--start", type=int, help="Start at specific event index (0-based)")
+    replay_parser.add_argument("--slice", help="Load only events START:END (indices) or START..END (block ids)")
+    replay_parser.add_argument("--out", help="For 'extract': output .orirec file")
     
     # Package management commands
     add_parser = subparsers.add_parser("add", help="Add a local library or remote package")
@@ -92,6 +153,21 @@ def main():
     add_parser.add_argument("--checksum", type=str, help="SHA-256 checksum for verification")
     add_parser.add_argument("--update", action="store_true", help="Update lockfile even if package exists")
     
+    install_parser = subparsers.add_parser("install", help="Install all dependencies in pkg.json")
+    install_parser.add_argument("--jobs", type=int, metavar="N", help="Packages to fetch at once (default: ORIGIN_INSTALL_JOBS or 8)")
+    install_parser.add_argument("--link-mode", choices=["auto", "hardlink", "symlink", "copy"],
+                                help="How libraries are placed from the package store (default: ORIGIN_LINK_MODE or auto)")
+    install_parser.add_argument("--offline", action="store_true", help="Only use archives from the archive cache")
+    install_parser.add_argument("--frozen", action="store_true",
+                                help="Install exactly what origin.lock records, without the registry")
+    
+    cache_parser = subparsers.add_parser("cache", help="Manage the package archive cache")
+    cache_subparsers = cache_parser.add_subparsers(dest="cache_command", help="Available cache commands")
+    cache_subparsers.add_parser("stats", help="Show the archive cache location and size")
+    cache_prune_parser = cache_subparsers.add_parser("prune", help="Evict least recently used archives")
+    cache_prune_parser.add_argument("--max-bytes", type=int, help="Shrink the cache to this size (default: the cache limit)")
+    cache_prune_parser.add_argument("--all", action="store_true", help="Remove every cached archive")
+    
     remove_parser = subparsers.add_parser("remove", help="Remove an installed library")
     remove_parser.add_argument("name", type=str, help="Library name")
     
@@ -107,6 +183,8 @@ def main():
     audit_parser.add_argument("--level", choices=["info", "warn", "crit"], default="warn", 
                              help="Minimum severity level to report (default: warn)")
     audit_parser.add_argument("--ignore", nargs="+", help="Packages to ignore during audit")
+    audit_parser.add_argument("--no-cache", action="store_true",
+                             help="Check every package even if nothing changed since the last audit")
     
     # Package command
     package_parser = subparsers.add_parser("package", help="Build standalone Origin executables")
@@ -145,10 +223,95 @@ def main():
             if args.deny_files:
                 files_allowed = False
             
+            record_slice = None
+            if args.slice:
+                if not args.record:
+                    print("Error: --slice requires --record")
+                    sys.exit(1)
+                try:
+                    record_slice = EventSlice.parse(args.slice)
+                except ValueError as e:
+                    print(f"Error: {e}")
+                    sys.exit(1)
+            
+            sampling = None
+            if args.sample or args.sample_rate or args.sample_blocks:
+                if not args.record:
+                    print("Error: sampling options require --record")
+                    sys.exit(1)
+                if record_slice is not None:
+                    print("Error: --slice cannot be combined with sampling options")
+                    sys.exit(1)
+                sampling = {
+                    "every": args.sample or 1,
+                    "rate": args.sample_rate,
+                    "block_patterns": args.sample_blocks,
+                    "ring_size": args.ring_size
+                }
+            
+            if args.checkpoint_every is not None:
+                if not args.record:
+                    print("Error: --checkpoint-every requires --record")
+                    sys.exit(1)
+                if sampling is not None:
+                    print("Error: --checkpoint-every cannot be combined with sampling options")
+                    sys.exit(1)
+                if args.checkpoint_every < 1:
+                    print("Error: --checkpoint-every must be at least 1")
+                    sys.exit(1)
+            
+            resume = None
+            if args.resume:
+                if args.record:
+                    print("Error: --resume cannot be combined with --record")
+                    sys.exit(1)
+                resume_path, sep, resume_at = args.resume.rpartition("@")
+                if sep and resume_at.isdigit():
+                    resume = (resume_path, int(resume_at))
+                else:
+                    resume = (args.resume, None)
+            
             # Pass extra command line arguments as ARGS
             file_index = sys.argv.index(args.file)
             extra_args = sys.argv[file_index+1:]
-            run(args.file, net_allowed=args.allow_net, files_allowed=files_allowed, record=args.record, args=extra_args, profile=args.profile)
+            run(args.file, net_allowed=args.allow_net, files_allowed=files_allowed, record=args.record, args=extra_args, profile=args.profile,
+                record_slice=record_slice, sampling=sampling, checkpoint_every=args.checkpoint_every, resume=resume,
+                http_cache=args.http_cache, replay_net=args.replay_net)
+        
+        elif args.command == "replay" and args.file == "extract":
+            if len(args.extra) != 1 or not args.slice or not args.out:
+                print("Usage: origin replay extract <file.orirec> --slice START:END --out <out.orirec>")
+                sys.exit(1)
+            
+            try:
+                count = extract_recording(pathlib.Path(args.extra[0]), pathlib.Path(args.out), EventSlice.parse(args.slice))
+                print(f"Extracted {count} events to {args.out}")
+            except (ValueError, FileNotFoundError) as e:
+                print(f"Error extracting recording: {e}")
+                sys.exit(1)
+        
+        elif args.command == "replay" and args.file == "query":
+            if len(args.extra) != 2:
+                print('Usage: origin replay query <file.orirec> "<query>"   (e.g. "x > 100", "var=x", "block=LetNode:x")')
+                sys.exit(1)
+            
+            try:
+                recording_path = pathlib.Path(args.extra[0])
+                query = RecordingQuery.parse(args.extra[1])
+                replayer = Replayer.from_file(recording_path)
+                index = RecordingIndex.for_recording(recording_path, replayer)
+                results = query.run(replayer, index)
+            except (ValueError, FileNotFoundError) as e:
+                print(f"Error querying recording: {e}")
+                sys.exit(1)
+            
+            for event_index, value in results:
+                block_id = replayer.block_id_at(event_index)
+                if query.kind == 'block':
+                    print(f"{event_index}\t{block_id}")
+                else:
+                    print(f"{event_index}\t{block_id}\t{query.name} = {json.dumps(value)}")
+            print(f"{len(results)} matching event{'s' if len(results) != 1 else ''}")
         
         elif args.command == "replay":
             # Load the recording file
@@ -158,7 +321,8 @@ def main():
                 sys.exit(1)
             
             try:
-                replayer = Replayer.from_file(recording_path)
+                event_slice = EventSlice.parse(args.slice) if args.slice else None
+                replayer = Replayer.from_file(recording_path, event_slice=event_slice)
                 
                 # Start at specific index if requested
                 if args.start is not None:
@@ -168,7 +332,7 @@ def main():
                 
                 if args.step:
                     # Start interactive shell
-                    shell = ReplayShell(replayer)
+                    shell = ReplayShell(replayer, recording_path=None if event_slice else recording_path)
                     shell.run()
                 else:
                     # Just show info about the recording
@@ -184,6 +348,25 @@ def main():
         elif args.command == "add":
             PackageManager().add(args.source, args.checksum, args.update)
         
+        elif args.command == "install":
+            PackageManager(offline=args.offline).install(args.jobs, args.link_mode, frozen=args.frozen)
+        
+        elif args.command == "cache":
+            from src.origin.archive_cache import ArchiveCache
+            
+            cache = ArchiveCache()
+            if args.cache_command == "stats":
+                stats = cache.stats()
+                print(f"Archive cache: {cache.root}")
+                print(f"{stats['archives']} archives, {stats['bytes'] / 1024 / 1024:.1f} MB "
+                      f"of {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+            elif args.cache_command == "prune":
+                removed, freed = cache.prune(0 if args.all else args.max_bytes)
+                print(f"✖ Removed {removed} archives ({freed / 1024 / 1024:.1f} MB)")
+            else:
+                cache_parser.print_help()
+                sys.exit(1)
+        
         elif args.command == "remove":
             PackageManager().remove(args.name)
         
@@ -213,7 +396,7 @@ def main():
                 
                 # Run audit
                 auditor = DependencyAuditor()
-                issues = auditor.audit(level=level, ignore_packages=args.ignore)
+                issues = auditor.audit(level=level, ignore_packages=args.ignore, use_cache=not args.no_cache)
                 
                 # Format and output report
                 report = auditor.format_report(issues, json_output=args.json)
@@ -1,16 +1,24 @@
+import json
 import tarfile
 import zipfile
 import pathlib
+from typing import Any, Dict, Optional
 from .errors import OriginPkgError
+from .hashing import HashingReader, file_digest
 
 
-def extract_archive(archive_path: pathlib.Path, extract_to: pathlib.Path) -> None:
+def extract_archive(archive_path: pathlib.Path, extract_to: pathlib.Path) -> str:
     """
     Extract an archive file (.tar.gz or .zip) to the specified directory.
     
+    Tar archives are read in a single pass that also computes their checksum.
+    
     Args:
         archive_path: Path to the archive file
         extract_to: Directory to extract to
+    
+    Returns:
+        The SHA-256 hex digest of the archive
         
     Raises:
         OriginPkgError: On unsupported archive types or extraction errors
@@ -24,18 +32,17 @@ def extract_archive(archive_path: pathlib.Path, extract_to: pathlib.Path) -> Non
     try:
         if archive_path.suffix == '.gz' and archive_path.stem.endswith('.tar'):
             # Handle .tar.gz files
-            with tarfile.open(archive_path, 'r:gz') as tar:
-                tar.extractall(extract_to)
+            return _extract_tar_stream(archive_path, extract_to, 'r|gz')
                 
         elif archive_path.suffix == '.zip':
-            # Handle .zip files
+            # Handle .zip files (the central directory needs random access, so hash separately)
             with zipfile.ZipFile(archive_path, 'r') as zip_file:
                 zip_file.extractall(extract_to)
+            return file_digest(archive_path)
                 
         elif archive_path.suffix == '.tar':
             # Handle .tar files
-            with tarfile.open(archive_path, 'r') as tar:
-                tar.extractall(extract_to)
+            return _extract_tar_stream(archive_path, extract_to, 'r|')
                 
         else:
             raise OriginPkgError(
@@ -49,6 +56,53 @@ def extract_archive(archive_path: pathlib.Path, extract_to: pathlib.Path) -> Non
         raise OriginPkgError(f"Unexpected error extracting {archive_path}: {e}")
 
 
+def _extract_tar_stream(archive_path: pathlib.Path, extract_to: pathlib.Path, mode: str) -> str:
+    """Extract a tar archive sequentially, hashing it as it is read."""
+    with HashingReader(open(archive_path, 'rb')) as reader:
+        with tarfile.open(fileobj=reader, mode=mode) as tar:
+            tar.extractall(extract_to)
+        reader.drain()
+        return reader.hexdigest()
+
+
+def read_manifest(archive_path: pathlib.Path) -> Optional[Dict[str, Any]]:
+    """
+    Read the pkg.json of a packaged library without extracting the archive.
+    
+    The manifest may be at the top of the archive or inside its single
+    top-level directory.
+    
+    Returns:
+        The parsed manifest, or None if the archive has none
+    
+    Raises:
+        OriginPkgError: If the archive or its manifest cannot be read
+    """
+    try:
+        if archive_path.suffix == '.zip':
+            with zipfile.ZipFile(archive_path, 'r') as zip_file:
+                for name in zip_file.namelist():
+                    if _is_manifest(name):
+                        return json.loads(zip_file.read(name))
+            return None
+        
+        with tarfile.open(archive_path, 'r:*') as tar:
+            for member in tar:
+                if member.isfile() and _is_manifest(member.name):
+                    return json.load(tar.extractfile(member))
+        return None
+    except (tarfile.TarError, zipfile.BadZipFile, OSError) as e:
+        raise OriginPkgError(f"Failed to read {archive_path}: {e}")
+    except ValueError as e:
+        raise OriginPkgError(f"Invalid pkg.json in {archive_path}: {e}")
+
+
+def _is_manifest(member_name: str) -> bool:
+    """Whether an archive member is a library's pkg.json (at most one directory deep)."""
+    parts = [part for part in member_name.split('/') if part and part != '.']
+    return 1 <= len(parts) <= 2 and parts[-1] == 'pkg.json'
+
+
 def is_archive_file(file_path: pathlib.Path) -> bool:
     """
     Check if a file is a supported archive format.
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+from typing import Dict, Optional, Tuple
+from .errors import OriginPkgError
+
+# Default cache size limit (2GB)
+DEFAULT_ARCHIVE_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+def get_archive_cache_dir() -> pathlib.Path:
+    """Get the archive cache location: ORIGIN_ARCHIVE_CACHE_DIR, or ~/.origin/cache/archives."""
+    value = os.environ.get("ORIGIN_ARCHIVE_CACHE_DIR")
+    if value:
+        return pathlib.Path(value).expanduser()
+    return pathlib.Path.home() / ".origin" / "cache" / "archives"
+
+
+def get_archive_cache_max_bytes() -> int:
+    """Get the archive cache size limit from environment or default."""
+    value = os.environ.get("ORIGIN_ARCHIVE_CACHE_MAX_BYTES")
+    if not value:
+        return DEFAULT_ARCHIVE_CACHE_MAX_BYTES
+    try:
+        return int(value)
+    except ValueError:
+        raise OriginPkgError(f"Invalid ORIGIN_ARCHIVE_CACHE_MAX_BYTES: {value!r}")
+
+
+class ArchiveCache:
+    """
+    User-level cache of downloaded package archives.
+    
+    Archives are stored by checksum as ``<root>/<sha256>/<filename>``, and
+    ``<root>/urls/`` records which checksum each URL last served. Lookups
+    with a known checksum (from origin.lock) match any cached copy of that
+    content; lookups without one go through the URL. Only verified archives
+    are stored, and the cache is kept under ``max_bytes`` by evicting the
+    least recently used archives.
+    """
+    
+    def __init__(self, root: Optional[pathlib.Path] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize the cache; the directory is created on the first store.
+        
+        Args:
+            root: Cache directory (defaults to ORIGIN_ARCHIVE_CACHE_DIR or ~/.origin/cache/archives)
+            max_bytes: Size limit (defaults to ORIGIN_ARCHIVE_CACHE_MAX_BYTES, or 2GB)
+        """
+        self.root = pathlib.Path(root) if root is not None else get_archive_cache_dir()
+        self.max_bytes = max_bytes if max_bytes is not None else get_archive_cache_max_bytes()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    def _url_path(self, url: str) -> pathlib.Path:
+        return self.root / "urls" / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+    
+    def _archive(self, checksum: str) -> Optional[pathlib.Path]:
+        """Get the cached archive with a checksum, if any."""
+        try:
+            items = list((self.root / checksum.lower()).iterdir())
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return items[0] if len(items) == 1 else None
+    
+    def lookup(self, url: str, checksum: Optional[str] = None) -> Optional[Tuple[pathlib.Path, str]]:
+        """
+        Find a cached archive, marking it as recently used.
+        
+        Args:
+            url: URL the archive is downloaded from
+            checksum: Expected SHA-256, if known; any archive with it matches
+        
+        Returns:
+            The cached archive (not to be modified) and its SHA-256, or None
+        """
+        if checksum is None:
+            try:
+                with open(self._url_path(url), 'r', encoding='utf-8') as f:
+                    checksum = json.load(f)["checksum"]
+            except (OSError, ValueError, KeyError):
+                checksum = None
+        
+        archive = self._archive(checksum) if checksum else None
+        try:
+            if archive is not None:
+                os.utime(archive)
+        except OSError:
+            archive = None  # Evicted by another process meanwhile
+        if archive is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return archive, checksum.lower()
+    
+    def store(self, url: str, archive_path: pathlib.Path, checksum: str) -> None:
+        """
+        Cache a verified archive under its checksum and record it for its URL.
+        
+        Archives larger than the whole cache are not stored.
+        """
+        checksum = checksum.lower()
+        if archive_path.stat().st_size > self.max_bytes:
+            return
+        
+        with self._lock:
+            entry = self.root / checksum
+            if self._archive(checksum) is None:
+                self.root.mkdir(parents=True, exist_ok=True)
+                temp = pathlib.Path(tempfile.mkdtemp(dir=self.root, prefix=".add-"))
+                try:
+                    shutil.copyfile(archive_path, temp / archive_path.name)
+                    shutil.rmtree(entry, ignore_errors=True)
+                    try:
+                        temp.rename(entry)
+                    except OSError:
+                        if self._archive(checksum) is None:
+                            raise
+                finally:
+                    shutil.rmtree(temp, ignore_errors=True)
+            
+            url_path = self._url_path(url)
+            url_path.parent.mkdir(exist_ok=True)
+            temp_path = url_path.with_name(f"{url_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            temp_path.write_text(json.dumps({"url": url, "checksum": checksum}), encoding='utf-8')
+            os.replace(temp_path, url_path)
+            self._evict(self.max_bytes)
+    
+    def prune(self, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Evict least recently used archives until the cache fits in ``max_bytes``.
+        
+        Args:
+            max_bytes: Target size (defaults to the cache limit; 0 empties the cache)
+        
+        Returns:
+            The number of archives removed and the bytes freed
+        """
+        with self._lock:
+            return self._evict(self.max_bytes if max_bytes is None else max_bytes)
+    
+    def _evict(self, max_bytes: int) -> Tuple[int, int]:
+        entries = []
+        total = 0
+        for entry in self._entries():
+            archive = self._archive(entry.name)
+            if archive is None:
+                shutil.rmtree(entry, ignore_errors=True)  # Left by an interrupted store
+                continue
+            stat = archive.stat()
+            entries.append((stat.st_mtime, entry, stat.st_size))
+            total += stat.st_size
+        
+        removed = freed = 0
+        entries.sort()
+        for _, entry, size in entries:
+            if total <= max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+            freed += size
+        
+        # URLs whose archive is gone would only cause misses
+        if removed:
+            for url_path in (self.root / "urls").glob("*.json"):
+                try:
+                    checksum = json.loads(url_path.read_text(encoding='utf-8'))["checksum"]
+                except (OSError, ValueError, KeyError):
+                    checksum = None
+                if not checksum or self._archive(checksum) is None:
+                    url_path.unlink(missing_ok=True)
+        return removed, freed
+    
+    def _entries(self):
+        if not self.root.exists():
+            return []
+        return [path for path in self.root.iterdir() if path.is_dir() and path.name != "urls"
+                and not path.name.startswith(".")]
+    
+    def stats(self) -> Dict[str, int]:
+        """Get the number and total size of cached archives, and this session's hits and misses."""
+        archives = [self._archive(entry.name) for entry in self._entries()]
+        sizes = [archive.stat().st_size for archive in archives if archive is not None]
+        return {
+            "archives": len(sizes),
+            "bytes": sum(sizes),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
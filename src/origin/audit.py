@@ -1,12 +1,25 @@
+import hashlib
 import json
+import os
 import pathlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from enum import Enum
 from .errors import OriginPkgError
-from .semver import SemVer, SemVerRange
+from .hashing import file_digest
+from .semver import SemVer, VersionSet
 from .lock import Lockfile
-from .registry import Registry
+from .registry import Registry, _source_stamp
+
+# Saved result of the last audit, relative to the project directory
+AUDIT_CACHE_FILE = pathlib.Path(".origin") / "audit-cache.json"
+AUDIT_CACHE_VERSION = 1
+
+# Packages evaluated per worker task, and workers used at most
+AUDIT_CHUNK_SIZE = 256
+DEFAULT_AUDIT_JOBS = 8
 
 
 class Severity(Enum):
@@ -33,6 +46,7 @@ class DependencyNode:
     parent: Optional[str] = None
     required_ranges: List[str] = field(default_factory=list)
     checksum: Optional[str] = None
+    required_by: List[Optional[str]] = field(default_factory=list)  # Per range: requiring package, None for pkg.json
 
 
 class DependencyAuditor:
@@ -62,13 +76,21 @@ class DependencyAuditor:
             except (json.JSONDecodeError, Exception) as e:
                 raise OriginPkgError(f"Failed to load pkg.json: {e}")
     
-    def audit(self, level: Severity = Severity.WARN, ignore_packages: Optional[List[str]] = None) -> List[AuditIssue]:
+    def audit(self, level: Severity = Severity.WARN, ignore_packages: Optional[List[str]] = None,
+              jobs: Optional[int] = None, use_cache: bool = True) -> List[AuditIssue]:
         """
         Perform a complete audit of the dependency tree.
         
+        Every issue is saved in .origin/audit-cache.json, keyed by the contents
+        of origin.lock and pkg.json and by the registry file's size and
+        modification time, so auditing an unchanged project reads the saved
+        issues instead of checking every package again.
+        
         Args:
             level: Minimum severity level to report
             ignore_packages: List of package names to ignore
+            jobs: Workers checking packages (defaults to DEFAULT_AUDIT_JOBS)
+            use_cache: Whether to reuse and save the result of the last audit
             
         Returns:
             List of audit issues found
@@ -76,27 +98,93 @@ class DependencyAuditor:
         if ignore_packages is None:
             ignore_packages = []
         
-        issues = []
-        
-        # Load dependency tree from lockfile
-        dependency_tree = self._load_dependency_tree()
-        
-        # Check for conflicts
-        conflict_issues = self._check_conflicts(dependency_tree, ignore_packages)
-        issues.extend(conflict_issues)
-        
-        # Check for outdated packages
-        outdated_issues = self._check_outdated_packages(dependency_tree, ignore_packages)
-        issues.extend(outdated_issues)
+        cache_key = self._cache_key() if use_cache else None
+        issues = self._load_cached_issues(cache_key) if cache_key else None
+        if issues is None:
+            issues = self._audit_tree(jobs)
+            if cache_key:
+                self._save_cached_issues(cache_key, issues)
         
-        # Filter by severity level
+        # Filter by severity level and ignored packages
         filtered_issues = [
             issue for issue in issues 
             if self._get_severity_level(issue.severity) >= self._get_severity_level(level)
+            and issue.package_name not in ignore_packages
         ]
         
         return filtered_issues
     
+    def _audit_tree(self, jobs: Optional[int] = None) -> List[AuditIssue]:
+        """Check every package in the dependency tree, in chunks spread over a worker pool."""
+        # Load dependency tree from lockfile
+        dependency_tree = self._load_dependency_tree()
+        
+        # Load or build the registry index once, before the workers share it
+        try:
+            self.registry.index()
+        except OriginPkgError:
+            pass  # Outdated checks skip packages the registry can't answer for
+        
+        nodes = list(dependency_tree.items())
+        chunks = [dict(nodes[i:i + AUDIT_CHUNK_SIZE]) for i in range(0, len(nodes), AUDIT_CHUNK_SIZE)]
+        jobs = min(jobs or DEFAULT_AUDIT_JOBS, len(chunks))
+        if jobs > 1:
+            with ThreadPoolExecutor(jobs, "origin-audit") as pool:
+                results = list(pool.map(self._audit_chunk, chunks))
+        else:
+            results = [self._audit_chunk(chunk) for chunk in chunks]
+        
+        # Conflicts come before outdated packages
+        conflict_issues = [issue for conflicts, _ in results for issue in conflicts]
+        outdated_issues = [issue for _, outdated in results for issue in outdated]
+        return conflict_issues + outdated_issues
+    
+    def _audit_chunk(self, tree: Dict[str, DependencyNode]) -> Tuple[List[AuditIssue], List[AuditIssue]]:
+        """Check part of the dependency tree for conflicts and outdated packages."""
+        return self._check_conflicts(tree, []), self._check_outdated_packages(tree, [])
+    
+    def _cache_key(self) -> str:
+        """Identify the inputs of an audit: origin.lock, pkg.json and the registry."""
+        hasher = hashlib.sha256(f"origin-audit-{AUDIT_CACHE_VERSION}".encode())
+        for path in (self.lockfile.lock_path, self.manifest_path):
+            hasher.update(b"\0" + (file_digest(path).encode() if path.exists() else b"-"))
+        registry_path = self.registry.registry_path
+        registry_stamp = _source_stamp(registry_path) if registry_path.exists() else None
+        hasher.update(b"\0" + json.dumps([str(registry_path), registry_stamp]).encode())
+        return hasher.hexdigest()
+    
+    def _load_cached_issues(self, cache_key: str) -> Optional[List[AuditIssue]]:
+        """Get the issues saved by the last audit, if its inputs were the same."""
+        try:
+            with open(self.project_path / AUDIT_CACHE_FILE, 'r') as f:
+                data = json.load(f)
+            if data.get("version") != AUDIT_CACHE_VERSION or data.get("key") != cache_key:
+                return None
+            return [self._issue_from_dict(issue) for issue in data["issues"]]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None  # Missing or unreadable: audit again
+    
+    def _save_cached_issues(self, cache_key: str, issues: List[AuditIssue]) -> None:
+        """Save an audit's issues for the next audit; a read-only project is not cached."""
+        cache_path = self.project_path / AUDIT_CACHE_FILE
+        data = {
+            "version": AUDIT_CACHE_VERSION,
+            "key": cache_key,
+            "issues": [self._issue_to_dict(issue) for issue in issues]
+        }
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f)
+                os.replace(temp_path, cache_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            pass
+    
     def _load_dependency_tree(self) -> Dict[str, DependencyNode]:
         """Load the dependency tree from lockfile and manifest."""
         tree = {}
@@ -116,71 +204,68 @@ class DependencyAuditor:
         # Add required ranges from manifest dependencies
         if 'dependencies' in self.manifest:
             for dep_name, dep_range in self.manifest['dependencies'].items():
-                if dep_name in tree:
-                    tree[dep_name].required_ranges.append(dep_range)
-                else:
-                    # Package in manifest but not in lockfile
-                    tree[dep_name] = DependencyNode(
-                        name=dep_name,
-                        version='0.0.0',  # Placeholder
-                        required_ranges=[dep_range]
-                    )
+                self._add_requirement(tree, dep_name, dep_range, None)
+        
+        # And from the dependencies of each locked package
+        for name, info in packages.items():
+            for dep_name, dep_range in (info.get('dependencies') or {}).items():
+                self._add_requirement(tree, dep_name, dep_range, f"{name}@{info.get('version', '0.0.0')}")
         
         return tree
     
+    def _add_requirement(self, tree: Dict[str, DependencyNode], dep_name: str, dep_range: str,
+                         parent: Optional[str]) -> None:
+        """Record a range required of a package, following "name@range" aliases."""
+        if '@' in dep_range[1:]:
+            dep_name, dep_range = dep_range.rsplit('@', 1)
+        
+        if dep_name not in tree:
+            # Package required but not in lockfile
+            tree[dep_name] = DependencyNode(
+                name=dep_name,
+                version='0.0.0',  # Placeholder
+                parent=parent
+            )
+        tree[dep_name].required_ranges.append(dep_range)
+        tree[dep_name].required_by.append(parent)
+    
     def _check_conflicts(self, tree: Dict[str, DependencyNode], ignore_packages: List[str]) -> List[AuditIssue]:
         """Check for version conflicts in the dependency tree."""
         issues = []
         
-        # Group packages by name to find conflicts
-        package_groups = {}
         for node in tree.values():
-            if node.name in ignore_packages:
-                continue
-            
-            if node.name not in package_groups:
-                package_groups[node.name] = []
-            package_groups[node.name].append(node)
-        
-        # Check each package group for conflicts
-        for package_name, nodes in package_groups.items():
-            if len(nodes) <= 1:
+            if node.name in ignore_packages or not node.required_ranges:
                 continue
             
-            # Check if all required ranges are compatible
-            all_ranges = []
-            for node in nodes:
-                all_ranges.extend(node.required_ranges)
+            all_ranges = node.required_ranges
+            installed_version = node.version if node.version != '0.0.0' else None  # Not a placeholder
+            ranges_str = ', '.join(all_ranges)
             
-            if not all_ranges:
+            # Intersect every range required of the package; an empty set is a conflict
+            allowed = self._combine_ranges(all_ranges)
+            if allowed is None:
+                message = f"Invalid version ranges: {ranges_str}"
+            elif allowed.is_empty():
+                message = f"Conflicting version ranges: {ranges_str}"
+            elif installed_version and not self._version_in(allowed, installed_version):
+                message = f"Installed version {installed_version} does not satisfy {ranges_str}"
+            else:
                 continue
             
-            # Check if ranges are compatible
-            if not self._are_ranges_compatible(all_ranges):
-                # Find the installed version
-                installed_version = None
-                for node in nodes:
-                    if node.version != '0.0.0':  # Not a placeholder
-                        installed_version = node.version
-                        break
-                
-                ranges_str = ', '.join(all_ranges)
-                message = f"Conflicting version ranges: {ranges_str}"
-                
-                # Determine parent packages
-                parent_packages = [node.parent for node in nodes if node.parent]
-                parent_info = f" (parents: {', '.join(parent_packages)})" if parent_packages else ""
-                
-                issues.append(AuditIssue(
-                    package_name=package_name,
-                    severity=Severity.CRIT,
-                    message=message + parent_info,
-                    details={
-                        'ranges': all_ranges,
-                        'installed_version': installed_version,
-                        'parent_packages': parent_packages
-                    }
-                ))
+            # Determine parent packages
+            parent_packages = [parent for parent in node.required_by if parent]
+            parent_info = f" (parents: {', '.join(parent_packages)})" if parent_packages else ""
+            
+            issues.append(AuditIssue(
+                package_name=node.name,
+                severity=Severity.CRIT,
+                message=message + parent_info,
+                details={
+                    'ranges': all_ranges,
+                    'installed_version': installed_version,
+                    'parent_packages': parent_packages
+                }
+            ))
         
         return issues
     
@@ -236,55 +321,45 @@ class DependencyAuditor:
         if not ranges:
             return True
         
-        try:
-            # Create a combined range from all ranges
-            combined_range = self._combine_ranges(ranges)
-            
-            # If we can create a combined range, they're compatible
-            return combined_range is not None
-        
-        except Exception:
-            return False
+        # Ranges are compatible if some version satisfies all of them
+        combined_range = self._combine_ranges(ranges)
+        return combined_range is not None and not combined_range.is_empty()
     
-    def _combine_ranges(self, ranges: List[str]) -> Optional[SemVerRange]:
-        """Combine multiple version ranges into a single range."""
+    def _combine_ranges(self, ranges: List[str]) -> Optional[VersionSet]:
+        """
+        Combine multiple version ranges into the set of versions satisfying all of them.
+        
+        Returns:
+            The intersection of the ranges (possibly empty), or None if a range is invalid
+        """
         if not ranges:
             return None
         
-        # For now, use a simple approach: check if all ranges overlap
-        # This is a simplified implementation
         try:
-            # Parse all ranges
-            range_objects = [SemVerRange(r) for r in ranges]
-            
-            # Find common versions that satisfy all ranges
-            # This is a simplified check - in practice, you'd need more sophisticated logic
-            return range_objects[0]  # Simplified for now
-            
-        except Exception:
+            combined = VersionSet.any()
+            for r in ranges:
+                combined = combined.intersect(VersionSet.from_range(r))
+            return combined
+        
+        except (OriginPkgError, ValueError):
             return None
     
+    def _version_in(self, versions: VersionSet, version: str) -> bool:
+        """Whether a version string is in a set; unparsable versions are not checked."""
+        try:
+            return versions.contains(SemVer.parse(version))
+        except OriginPkgError:
+            return True
+    
     def _get_latest_version(self, package_name: str) -> Optional[str]:
         """Get the latest non-prerelease version from the registry."""
         try:
-            # Query registry for all versions
-            registry = self.registry._load_registry()
-            
-            available_versions = []
-            for reg_key in registry.keys():
-                if reg_key.startswith(f"{package_name}@"):
-                    version_part = reg_key[len(f"{package_name}@"):]
-                    # Skip prerelease versions
-                    if '-' not in version_part:
-                        available_versions.append(version_part)
-            
-            if not available_versions:
-                return None
-            
-            # Find the highest version
-            versions = [SemVer.parse(v) for v in available_versions]
-            latest = max(versions)
-            return str(latest)
+            # The registry index lists versions newest first
+            for version, _, _ in self.registry.index().versions(package_name):
+                # Skip prerelease versions
+                if version.prerelease is None:
+                    return str(version)
+            return None
         
         except Exception:
             return None
@@ -360,16 +435,7 @@ class DependencyAuditor:
     def _format_json_report(self, issues: List[AuditIssue]) -> str:
         """Format issues as JSON."""
         report = {
-            'issues': [
-                {
-                    'package': issue.package_name,
-                    'severity': issue.severity.value,
-                    'message': issue.message,
-                    'details': issue.details,
-                    'parent_package': issue.parent_package
-                }
-                for issue in issues
-            ],
+            'issues': [self._issue_to_dict(issue) for issue in issues],
             'summary': {
                 'total': len(issues),
                 'critical': len([i for i in issues if i.severity == Severity.CRIT]),
@@ -378,4 +444,24 @@ class DependencyAuditor:
             }
         }
         
-        return json.dumps(report, indent=2) 
\ No newline at end of file
+        return json.dumps(report, indent=2)
+    
+    def _issue_to_dict(self, issue: AuditIssue) -> Dict[str, Any]:
+        """Convert an issue to its JSON report form."""
+        return {
+            'package': issue.package_name,
+            'severity': issue.severity.value,
+            'message': issue.message,
+            'details': issue.details,
+            'parent_package': issue.parent_package
+        }
+    
+    def _issue_from_dict(self, data: Dict[str, Any]) -> AuditIssue:
+        """Convert an issue's JSON report form back to an issue."""
+        return AuditIssue(
+            package_name=data['package'],
+            severity=Severity(data['severity']),
+            message=data['message'],
+            details=data['details'],
+            parent_package=data.get('parent_package')
+        ) 
\ No newline at end of file
@@ -1,7 +1,10 @@
 import json
-from typing import Any, Union, Dict, List
+from typing import Any, Union, Dict, Iterable, Iterator, List
 from ..errors import OriginError
 
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = ',]' + _WHITESPACE
+
 
 def parse(json_str: str) -> Union[Dict[str, Any], List[Any], str, int, float, bool, None]:
     """
@@ -24,4 +27,89 @@ def parse(json_str: str) -> Union[Dict[str, Any], List[Any], str, int, float, bo
     except json.JSONDecodeError as e:
         raise OriginError(f"Invalid JSON: {e}")
     except Exception as e:
-        raise OriginError(f"JSON parsing error: {e}") 
\ No newline at end of file
+        raise OriginError(f"JSON parsing error: {e}") 
+
+
+def iter_array(chunks: Iterable[str]) -> Iterator[Any]:
+    """
+    Lazily parse the elements of a top-level JSON array from pieces of text.
+    
+    Each element is yielded as soon as it has been read completely, and text
+    before it is discarded, so memory use depends on the largest element
+    rather than on the whole document.
+    
+    Args:
+        chunks: Successive pieces of the JSON document, e.g. from iter_http_get
+    
+    Yields:
+        The array's elements, converted like parse()
+    
+    Raises:
+        OriginError: If the document is not a valid JSON array
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    exhausted = False
+    
+    def fill(min_chars: int) -> bool:
+        """Append at least ``min_chars`` more characters, dropping consumed text; False at end of input."""
+        nonlocal buffer, pos, exhausted
+        pieces = [buffer[pos:]]
+        added = 0
+        for chunk in chunks:
+            pieces.append(chunk)
+            added += len(chunk)
+            if added >= min_chars:
+                break
+        else:
+            exhausted = True
+        if not added:
+            return False
+        buffer = "".join(pieces)
+        pos = 0
+        return True
+    
+    def next_char() -> str:
+        """Skip whitespace and return the next character, or '' at end of input."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or exhausted or not fill(1):
+                return buffer[pos] if pos < len(buffer) else ""
+    
+    if next_char() != "[":
+        raise OriginError("Invalid JSON: expected a top-level array")
+    pos += 1
+    if next_char() == "]":
+        pos += 1
+    else:
+        while True:
+            next_char()
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                value, end = e, None
+            # A number cut off by the end of the buffer ("12" of "123", "1." of
+            # "1.5") also decodes, so an element is only complete once the text
+            # after it is read; otherwise it is parsed again with more text.
+            # Each retry at least doubles the text held, so large elements are
+            # not re-parsed once per chunk.
+            complete = end is not None and end < len(buffer) and buffer[end] in _DELIMITERS
+            if not complete and not exhausted and fill(max(len(buffer) - pos, 1)):
+                continue
+            if end is None:
+                raise OriginError(f"Invalid JSON: {value}")
+            pos = end
+            delimiter = next_char()
+            if delimiter not in (",", "]"):
+                raise OriginError("Invalid JSON: expected ',' or ']' after array element")
+            pos += 1
+            yield value
+            if delimiter == "]":
+                break
+    
+    if next_char() != "":
+        raise OriginError("Invalid JSON: extra data after array")
\ No newline at end of file
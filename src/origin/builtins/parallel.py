@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Sequence
+from ..errors import OriginError
+
+# Default number of calls run at once
+DEFAULT_CONCURRENCY = 8
+
+
+def parallel(fn: Callable[[Any], Any], items: Sequence[Any], concurrency: int = DEFAULT_CONCURRENCY) -> List[Any]:
+    """
+    Call a function on every item, running up to ``concurrency`` calls at once.
+    
+    Calls run on threads, so this speeds up functions that wait on I/O such
+    as network requests; CPU-bound functions gain nothing.
+    
+    Args:
+        fn: Function taking one item
+        items: Items to call it on
+        concurrency: Maximum number of calls in flight
+    
+    Returns:
+        Results in the same order as ``items``
+    
+    Raises:
+        OriginError: If concurrency is invalid; errors raised by ``fn`` propagate,
+                     earliest item first
+    """
+    if isinstance(concurrency, bool) or not isinstance(concurrency, int) or concurrency < 1:
+        raise OriginError(f"concurrency must be a positive integer, got {concurrency!r}")
+    
+    items = list(items)
+    if concurrency == 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(items))) as executor:
+        return list(executor.map(fn, items))
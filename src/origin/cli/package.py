@@ -4,7 +4,6 @@ Package CLI module for building standalone Origin executables.
 """
 
 import argparse
-import hashlib
 import json
 import os
 import platform
@@ -18,6 +17,8 @@ from typing import Dict, List, Optional, Tuple
 
 import requests
 
+from ..hashing import file_digest
+
 
 class PackageBuilder:
     """Builds standalone Origin executables using PyInstaller."""
@@ -163,11 +164,7 @@ class PackageBuilder:
     
     def calculate_sha256(self, file_path: Path) -> str:
         """Calculate SHA-256 hash of a file."""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        return sha256_hash.hexdigest()
+        return file_digest(file_path)
     
     def smoke_test(self, exe_path: Path) -> bool:
         """Run a basic smoke test on the built executable."""
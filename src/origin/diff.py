@@ -1,9 +1,12 @@
 import json
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 MAX_VALUE_SIZE = 64 * 1024  # 64 KiB
 TRUNCATED_MARKER = "<truncated>"
 
+# Sentinel for keys that are absent from one side of a diff
+_MISSING = object()
+
 def truncate_value(value: Any, max_size: int = MAX_VALUE_SIZE) -> Any:
     """Truncate a value if it's too large for display."""
     if isinstance(value, (str, int, float, bool)) or value is None:
@@ -33,13 +36,26 @@ def truncate_value(value: Any, max_size: int = MAX_VALUE_SIZE) -> Any:
         except:
             return TRUNCATED_MARKER
 
-def compute_diff(old_env: Dict[str, Any], new_env: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+def changed_keys(old_vars: Dict[str, Any], new_vars: Dict[str, Any]) -> List[str]:
+    """
+    List the keys whose values differ between two variable mappings.
+    
+    Keys that were added or removed count as changed.
+    """
+    keys = [key for key, value in new_vars.items() if old_vars.get(key, _MISSING) != value]
+    keys.extend(key for key in old_vars if key not in new_vars)
+    return keys
+
+def compute_diff(old_env: Dict[str, Any], new_env: Dict[str, Any],
+                 keys: Optional[Iterable[str]] = None) -> Dict[str, Tuple[Any, Any]]:
     """
     Compute differences between two environment snapshots.
     
     Args:
         old_env: Previous environment snapshot
         new_env: Current environment snapshot
+        keys: Keys known to have changed, e.g. from a recording's per-event
+              change set; only these are compared. Defaults to every key.
         
     Returns:
         Dictionary mapping keys to (old_value, new_value) tuples for changed values
@@ -50,10 +66,10 @@ def compute_diff(old_env: Dict[str, Any], new_env: Dict[str, Any]) -> Dict[str,
     old_vars = old_env.get('variables', {})
     new_vars = new_env.get('variables', {})
     
-    # Find all keys that exist in either environment
-    all_keys = set(old_vars.keys()) | set(new_vars.keys())
+    if keys is None:
+        keys = changed_keys(old_vars, new_vars)
     
-    for key in all_keys:
+    for key in keys:
         old_value = old_vars.get(key)
         new_value = new_vars.get(key)
         
@@ -6,7 +6,11 @@ import lexer
 import parser
 from .recorder import Recorder
 from .runtime.eval import EvaluatorVisitor
+from .runtime.net import HTTPClient, await_all, await_http
+from .runtime.http_cache import HTTPCache
+from .runtime.net_replay import NetReplay
 from .errors import OriginError
+from .builtins.parallel import DEFAULT_CONCURRENCY, parallel
 
 class _JSONVisitor:
     from .builtins.json import parse as json_parse
@@ -23,11 +27,16 @@ class _AIVisitor:
 class Evaluator:
     """Evaluates Origin AST with optional execution recording."""
     
-    def __init__(self, recorder: Optional[Recorder] = None):
+    def __init__(self, recorder: Optional[Recorder] = None, http_cache: Optional[HTTPCache] = None,
+                 net_replay: Optional[NetReplay] = None):
         self.recorder = recorder
         self.global_loaded_modules = set()
         self.use_eval_fallback = os.environ.get('ORIGIN_EVAL_FALLBACK') == '1'
         self.visitor = None  # Store visitor for profiling
+        # Pooled connections shared by every http_get of the run; also records or replays exchanges
+        self.http = HTTPClient(cache=http_cache, recorder=recorder, replay=net_replay)
+        self._top_node = None  # Top-level statement being executed, for checkpoint positions
+        self._top_index = 0
         if self.use_eval_fallback:
             print("Warning: Using eval() fallback mode (deprecated)")
     
@@ -45,19 +54,34 @@ class Evaluator:
         """Record execution step if recorder is active."""
         if self.recorder:
             node_id = self._generate_node_id(node)
-            env = {
+            # Only top-level statements can be resumed from
+            position = {"stmt": self._top_index} if node is self._top_node else None
+            # Built lazily so sampling recorders skip the copy for dropped events
+            env = lambda: {
                 "variables": variables.copy(),
                 "functions": list(functions.keys()),  # Don't record function bodies
-                "node_type": type(node).__name__
+                "node_type": type(node).__name__,
+                "position": position
             }
             self.recorder.record(node_id, env)
     
+    def close(self) -> None:
+        """Release resources held for the run, such as pooled HTTP connections."""
+        self.http.close()
+    
     def _plus(self, a, b):
         """String concatenation or numeric addition."""
         if isinstance(a, str) or isinstance(b, str):
             return str(a) + str(b)
         return a + b
     
+    def _replace_await_outside_strings(self, expr):
+        """Replace await(...) with _AWAIT_(...), since await is a reserved word for eval()."""
+        parts = re.split(r'("[^"]*")', expr)
+        for i in range(0, len(parts), 2):
+            parts[i] = re.sub(r'\bawait\s*\(', '_AWAIT_(', parts[i])
+        return "".join(parts)
+    
     def _replace_plus_outside_strings(self, expr):
         """Replace a + b with _PLUS_(a, b) where a and b are quoted strings or identifiers/numbers."""
         pattern = r'((?:"[^"]*")|(?:\w+))\s*\+\s*((?:"[^"]*")|(?:\w+))'
@@ -72,7 +96,48 @@ class Evaluator:
         
         # Import the safe HTTP function
         from .runtime.net import safe_http_get
-        return safe_http_get(url, headers)
+        return safe_http_get(url, headers, client=self.http)
+    
+    def _http_get_many(self, urls, concurrency=DEFAULT_CONCURRENCY, net_allowed=False):
+        """Concurrent HTTP GET of many URLs with per-URL errors."""
+        if not net_allowed:
+            raise OriginError("Network access not permitted — run with --allow-net")
+        
+        from .runtime.net import http_get_many
+        return http_get_many(urls, concurrency, client=self.http)
+    
+    def _http_get_async(self, url, headers=None, net_allowed=False):
+        """Start an HTTP GET in the background, returning a handle for await."""
+        if not net_allowed:
+            raise OriginError("Network access not permitted — run with --allow-net")
+        
+        from .runtime.net import http_get_async
+        return http_get_async(url, headers, client=self.http)
+    
+    def _http_get_json(self, url, each=None, net_allowed=False):
+        """HTTP GET parsed as JSON, or calling each on the elements of a top-level array as they arrive."""
+        if not net_allowed:
+            raise OriginError("Network access not permitted — run with --allow-net")
+        
+        from .runtime.net import http_get_json, iter_http_get_json
+        if each is None:
+            return http_get_json(url, client=self.http)
+        if not callable(each):
+            raise OriginError("http_get_json expects a function as its second argument")
+        count = 0
+        for item in iter_http_get_json(url, client=self.http):
+            each(item)
+            count += 1
+        return count
+    
+    def _parallel(self, fn, items, concurrency=DEFAULT_CONCURRENCY):
+        """Call fn on each item concurrently, returning results in order."""
+        if not callable(fn):
+            raise OriginError("parallel expects a function as its first argument")
+        # Keep recorded events in execution order
+        if self.recorder:
+            concurrency = 1
+        return parallel(fn, items, concurrency)
     
     def _ai_ask(self, prompt):
         """AI ask function stub."""
@@ -89,8 +154,9 @@ class Evaluator:
             if len(args) != len(func['params']):
                 raise OriginError(f"function '{name}' expects {len(func['params'])} arguments, got {len(args)}")
             local_vars = variables.copy()
+            # Called from eval(), so arguments are already evaluated values
             for param, arg in zip(func['params'], args):
-                local_vars[param] = self._eval_expr(arg, local_vars, functions)
+                local_vars[param] = arg
             result = None
             for stmt in func['body']:
                 if isinstance(stmt, LetNode):
@@ -118,10 +184,17 @@ class Evaluator:
                 allowed_names[fname] = self._make_func(fname, functions, variables)
             # Add built-in functions
             allowed_names['http_get'] = lambda url, headers=None: self._http_get(url, headers, self.net_allowed)
+            allowed_names['http_get_many'] = lambda urls, concurrency=DEFAULT_CONCURRENCY: self._http_get_many(urls, concurrency, self.net_allowed)
+            allowed_names['http_get_json'] = lambda url, each=None: self._http_get_json(url, each, self.net_allowed)
+            allowed_names['http_get_async'] = lambda url, headers=None: self._http_get_async(url, headers, self.net_allowed)
+            allowed_names['_AWAIT_'] = await_http
+            allowed_names['await_all'] = await_all
+            allowed_names['parallel'] = self._parallel
             allowed_names['_PLUS_'] = self._plus
             allowed_names['json'] = _JSONVisitor
             allowed_names['ai'] = _AIVisitor
             expr = re.sub(r"\s+", " ", expr.strip())
+            expr = self._replace_await_outside_strings(expr)
             expr = self._replace_plus_outside_strings(expr)
             return eval(expr, allowed_names)
         else:
@@ -138,6 +211,7 @@ class Evaluator:
                         visitor = EvaluatorVisitor(variables, functions, self.recorder, self.net_allowed)
                         visitor.base_path = self.base_path
                         visitor.files_allowed = self.files_allowed
+                        visitor.http = self.http
                         self.visitor = visitor  # Store for profiling
                         return node.accept(visitor)
                     elif expr.startswith('"') and expr.endswith('"'):
@@ -146,6 +220,7 @@ class Evaluator:
                         visitor = EvaluatorVisitor(variables, functions, self.recorder, self.net_allowed)
                         visitor.base_path = self.base_path
                         visitor.files_allowed = self.files_allowed
+                        visitor.http = self.http
                         self.visitor = visitor  # Store for profiling
                         return node.accept(visitor)
                     elif expr in variables:
@@ -154,6 +229,7 @@ class Evaluator:
                         visitor = EvaluatorVisitor(variables, functions, self.recorder, self.net_allowed)
                         visitor.base_path = self.base_path
                         visitor.files_allowed = self.files_allowed
+                        visitor.http = self.http
                         self.visitor = visitor  # Store for profiling
                         return node.accept(visitor)
                 
@@ -162,11 +238,18 @@ class Evaluator:
                 for fname in functions:
                     allowed_names[fname] = self._make_func(fname, functions, variables)
                 allowed_names['http_get'] = lambda url, headers=None: self._http_get(url, headers, self.net_allowed)
+                allowed_names['http_get_many'] = lambda urls, concurrency=DEFAULT_CONCURRENCY: self._http_get_many(urls, concurrency, self.net_allowed)
+                allowed_names['http_get_json'] = lambda url, each=None: self._http_get_json(url, each, self.net_allowed)
+                allowed_names['http_get_async'] = lambda url, headers=None: self._http_get_async(url, headers, self.net_allowed)
+                allowed_names['_AWAIT_'] = await_http
+                allowed_names['await_all'] = await_all
+                allowed_names['parallel'] = self._parallel
                 allowed_names['_PLUS_'] = self._plus
                 allowed_names['json'] = _JSONVisitor
                 allowed_names['ai'] = _AIVisitor
                 
                 expr = re.sub(r"\s+", " ", expr.strip())
+                expr = self._replace_await_outside_strings(expr)
                 expr = self._replace_plus_outside_strings(expr)
                 return eval(expr, allowed_names)
             except Exception as e:
@@ -176,11 +259,18 @@ class Evaluator:
                 for fname in functions:
                     allowed_names[fname] = self._make_func(fname, functions, variables)
                 allowed_names['http_get'] = lambda url, headers=None: self._http_get(url, headers, self.net_allowed)
+                allowed_names['http_get_many'] = lambda urls, concurrency=DEFAULT_CONCURRENCY: self._http_get_many(urls, concurrency, self.net_allowed)
+                allowed_names['http_get_json'] = lambda url, each=None: self._http_get_json(url, each, self.net_allowed)
+                allowed_names['http_get_async'] = lambda url, headers=None: self._http_get_async(url, headers, self.net_allowed)
+                allowed_names['_AWAIT_'] = await_http
+                allowed_names['await_all'] = await_all
+                allowed_names['parallel'] = self._parallel
                 allowed_names['_PLUS_'] = self._plus
                 allowed_names['json'] = _JSONVisitor
                 allowed_names['ai'] = _AIVisitor
                 
                 expr = re.sub(r"\s+", " ", expr.strip())
+                expr = self._replace_await_outside_strings(expr)
                 expr = self._replace_plus_outside_strings(expr)
                 return eval(expr, allowed_names)
     
@@ -275,5 +365,39 @@ class Evaluator:
         self.net_allowed = net_allowed
         self.files_allowed = files_allowed
         
-        for node in ast:
-            self._exec_node(node, variables, functions) 
\ No newline at end of file
+        # Imported modules run through execute() too; only the outermost call tracks positions
+        outermost = self._top_node is None
+        try:
+            for index, node in enumerate(ast):
+                if outermost:
+                    self._top_node, self._top_index = node, index
+                self._exec_node(node, variables, functions)
+        finally:
+            if outermost:
+                self._top_node = None
+    
+    def resume(self, ast: List[Any], stmt: int, variables: Dict[str, Any], base_path=None,
+               net_allowed=False, files_allowed=True, args=None) -> None:
+        """
+        Continue a recorded run from a checkpoint.
+        
+        Function definitions and imports before ``stmt`` are re-run to rebuild
+        the functions, then the recorded variables are restored and execution
+        continues with statement ``stmt``.
+        
+        Args:
+            ast: The program that was recorded
+            stmt: Index of the top-level statement to resume at
+            variables: Variables recorded at the checkpoint
+        """
+        if not 0 <= stmt <= len(ast):
+            raise OriginError(f"checkpoint position {stmt} is outside the program; was it edited since recording?")
+        
+        functions = {}
+        restored = {}
+        prelude = [node for node in ast[:stmt] if isinstance(node, (FuncDefNode, ImportNode))]
+        self.execute(prelude, base_path=base_path, variables=restored, functions=functions,
+                     net_allowed=net_allowed, files_allowed=files_allowed, args=args)
+        restored.update(variables)
+        self.execute(ast[stmt:], base_path=base_path, variables=restored, functions=functions,
+                     net_allowed=net_allowed, files_allowed=files_allowed, args=args)
\ No newline at end of file
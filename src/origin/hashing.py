@@ -0,0 +1,94 @@
+import hashlib
+import pathlib
+from typing import BinaryIO, Optional
+
+# Bytes hashed per read; large enough that hashing is not dominated by call overhead
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_hasher(path: pathlib.Path, algorithm: str = "sha256"):
+    """
+    Hash a file's contents in bounded memory.
+    
+    Returns:
+        The hash object, so callers can keep feeding it (e.g. when appending
+        to a partial download)
+    """
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, algorithm)
+        hasher = hashlib.new(algorithm)
+        buffer = bytearray(HASH_BLOCK_SIZE)
+        view = memoryview(buffer)
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                return hasher
+            hasher.update(view[:size])
+
+
+def file_digest(path: pathlib.Path, algorithm: str = "sha256") -> str:
+    """Get the hex digest of a file's contents, reading it in blocks."""
+    return file_hasher(path, algorithm).hexdigest()
+
+
+class HashingReader:
+    """
+    Readable binary file that hashes everything read through it.
+    
+    Lets a consumer such as ``tarfile`` in stream mode read an archive while
+    its checksum is computed in the same pass.
+    """
+    
+    def __init__(self, fileobj: BinaryIO, hasher=None):
+        self._file = fileobj
+        self.hasher = hasher if hasher is not None else hashlib.sha256()
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        self.hasher.update(data)
+        return data
+    
+    def drain(self) -> None:
+        """Hash whatever the consumer left unread."""
+        while self.read(HASH_BLOCK_SIZE):
+            pass
+    
+    def hexdigest(self) -> str:
+        return self.hasher.hexdigest()
+    
+    def close(self) -> None:
+        self._file.close()
+    
+    def __enter__(self) -> 'HashingReader':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class HashingWriter:
+    """Writable binary file that hashes everything written through it."""
+    
+    def __init__(self, fileobj: BinaryIO, hasher=None):
+        self._file = fileobj
+        self.hasher = hasher if hasher is not None else hashlib.sha256()
+    
+    def write(self, data: bytes) -> int:
+        self.hasher.update(data)
+        return self._file.write(data)
+    
+    def flush(self) -> None:
+        self._file.flush()
+    
+    def hexdigest(self) -> str:
+        return self.hasher.hexdigest()
+    
+    def close(self) -> None:
+        self._file.close()
+    
+    def __enter__(self) -> 'HashingWriter':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,11 +1,28 @@
+import contextlib
 import json
+import os
 import pathlib
-from typing import Dict, Any, Optional
+import tempfile
+import threading
+from typing import Dict, Any, Iterator, Optional
 from .errors import OriginPkgError
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 
 class Lockfile:
-    """Helper class for managing origin.lock files."""
+    """
+    Helper class for managing origin.lock files.
+    
+    Writes replace the file atomically, under an exclusive lock on a
+    ``.origin.lock.lck`` file next to it so concurrent origin processes
+    don't overwrite each other's changes. Use ``transaction()`` to make
+    several changes with a single write.
+    """
     
     def __init__(self, lock_path: pathlib.Path):
         """
@@ -16,6 +33,9 @@ class Lockfile:
         """
         self.lock_path = lock_path
         self._data: Optional[Dict[str, Any]] = None
+        self._mutex = threading.RLock()
+        self._depth = 0  # Nesting of open transactions
+        self._dirty = False  # Whether an open transaction has changes to write
     
     def load(self) -> Dict[str, Any]:
         """Load the lockfile data."""
@@ -43,35 +63,105 @@ class Lockfile:
         """
         Save data to the lockfile with deterministic ordering.
         
+        Inside a transaction the data is written when the transaction ends.
+        
         Args:
             data: Dictionary to save
         """
+        with self.transaction():
+            self._data = data
+            self._dirty = True
+    
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator['Lockfile']:
+        """
+        Batch changes to the lockfile into a single write.
+        
+        The lockfile is locked against other processes and re-read on entry.
+        add_package, remove_package and save only change the loaded data until
+        the outermost transaction ends, which writes it once, or discards it
+        if the block raised.
+        
+        Example:
+            with lockfile.transaction():
+                for package in packages:
+                    lockfile.add_package(...)
+        """
+        with self._mutex:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self
+                finally:
+                    self._depth -= 1
+                return
+            
+            with self._file_lock():
+                self._data = None  # Pick up changes other processes committed
+                self._depth = 1
+                self._dirty = False
+                try:
+                    yield self
+                    if self._dirty:
+                        self._write(self._data)
+                except BaseException:
+                    self._data = None
+                    raise
+                finally:
+                    self._depth = 0
+                    self._dirty = False
+    
+    def _write(self, data: Dict[str, Any]) -> None:
+        """Replace the lockfile with ``data`` by renaming a complete temporary file over it."""
+        temp_path = None
         try:
             # Ensure directory exists
             self.lock_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Sort keys for deterministic output
-            sorted_data = self._sort_dict(data)
-            
-            with open(self.lock_path, 'w') as f:
-                json.dump(sorted_data, f, indent=2, sort_keys=True)
-            
-            # Update cache
-            self._data = data
+            fd, temp_path = tempfile.mkstemp(dir=self.lock_path.parent, prefix=f".{self.lock_path.name}.",
+                                             suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                # Sort keys for deterministic output
+                json.dump(data, f, indent=2, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.lock_path)
+            temp_path = None
             
         except Exception as e:
             raise OriginPkgError(f"Failed to write lockfile {self.lock_path}: {e}")
+        finally:
+            if temp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(temp_path)
     
-    def _sort_dict(self, obj: Any) -> Any:
-        """Recursively sort dictionary keys for deterministic output."""
-        if isinstance(obj, dict):
-            return {k: self._sort_dict(v) for k, v in sorted(obj.items())}
-        elif isinstance(obj, list):
-            return [self._sort_dict(item) for item in obj]
-        else:
-            return obj
+    @contextlib.contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock on the lockfile's lock file, waiting for other processes."""
+        guard_path = self.lock_path.with_name(f".{self.lock_path.name}.lck")
+        try:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(guard_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            raise OriginPkgError(f"Failed to lock {self.lock_path}: {e}")
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
     
-    def add_package(self, name: str, version: str, checksum: str) -> None:
+    def add_package(self, name: str, version: str, checksum: str, url: Optional[str] = None,
+                    dependencies: Optional[Dict[str, str]] = None) -> None:
         """
         Add a package to the lockfile.
         
@@ -79,18 +169,25 @@ class Lockfile:
             name: Package name
             version: Resolved version
             checksum: SHA-256 checksum
+            url: Where the package was downloaded from
+            dependencies: The package's own dependencies (name -> range)
         """
-        data = self.load()
-        
-        if 'packages' not in data:
-            data['packages'] = {}
-        
-        data['packages'][name] = {
-            'version': version,
-            'checksum': checksum
-        }
-        
-        self.save(data)
+        with self.transaction():
+            data = self.load()
+            
+            if 'packages' not in data:
+                data['packages'] = {}
+            
+            data['packages'][name] = {
+                'version': version,
+                'checksum': checksum
+            }
+            if url:
+                data['packages'][name]['url'] = url
+            if dependencies is not None:
+                data['packages'][name]['dependencies'] = dependencies
+            
+            self.save(data)
     
     def get_package(self, name: str) -> Optional[Dict[str, str]]:
         """
@@ -125,18 +222,21 @@ class Lockfile:
         Args:
             name: Package name
         """
-        data = self.load()
-        packages = data.get('packages', {})
-        
-        if name in packages:
-            del packages[name]
-            self.save(data)
+        with self.transaction():
+            data = self.load()
+            packages = data.get('packages', {})
+            
+            if name in packages:
+                del packages[name]
+                self.save(data)
     
     def clear(self) -> None:
         """Clear all lockfile data."""
-        self._data = {}
-        if self.lock_path.exists():
-            self.lock_path.unlink()
+        with self.transaction():
+            if self.lock_path.exists():
+                self.lock_path.unlink()
+            self._data = {}
+            self._dirty = False
     
     def get_all_packages(self) -> Dict[str, Dict[str, str]]:
         """
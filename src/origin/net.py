@@ -1,20 +1,48 @@
-import urllib.request
-import urllib.error
-import hashlib
+import concurrent.futures
+import http.client
+import os
 import pathlib
-import time
-from typing import Optional
+import shutil
+import urllib.error
+import urllib.request
+from typing import List, Optional, Tuple
 from .errors import OriginPkgError
+from .hashing import HASH_BLOCK_SIZE, HashingWriter, file_hasher
+from .policy import NetworkPolicy
+
+# Bytes read from the network (and written to disk) at a time
+DOWNLOAD_BLOCK_SIZE = 64 * 1024
+
+# Seconds a download may stall before the attempt fails (and is resumed on retry)
+DOWNLOAD_TIMEOUT = 60
+
+# Archives at least this large are fetched as parallel ranges when the server allows it
+PARALLEL_DOWNLOAD_MIN_SIZE = 8 * 1024 * 1024
+DEFAULT_DOWNLOAD_CONNECTIONS = 4
 
 
-def download(url: str, dest: pathlib.Path, progress: bool = True) -> None:
+def download(url: str, dest: pathlib.Path, progress: bool = True,
+             policy: Optional[NetworkPolicy] = None, connections: Optional[int] = None) -> str:
     """
     Download a file from URL to destination path.
     
+    Data is written to ``<dest>.part`` and moved into place once complete. A
+    failed attempt keeps what it received: retries, and later calls for the
+    same destination, ask the server for the rest with a Range request. Large
+    files from servers that accept ranges are fetched over several connections
+    at once. The SHA-256 of the file is computed while it is written.
+    
     Args:
         url: The URL to download from
         dest: Destination path for the downloaded file
         progress: Whether to show download progress
+        policy: Rate limit, retry and circuit breaker settings (defaults to
+                the project's pkg.json "network" section and ORIGIN_NET_* variables)
+        connections: Connections for parallel downloads (defaults to
+                     ORIGIN_DOWNLOAD_CONNECTIONS, or 4; 1 disables them)
+    
+    Returns:
+        The SHA-256 hex digest of the downloaded file
     
     Raises:
         OriginPkgError: On network errors or invalid URLs
@@ -22,36 +50,180 @@ def download(url: str, dest: pathlib.Path, progress: bool = True) -> None:
     try:
         # Ensure destination directory exists
         dest.parent.mkdir(parents=True, exist_ok=True)
+        if policy is None:
+            policy = NetworkPolicy.load()
+        if connections is None:
+            connections = _download_connections()
+        part = dest.with_name(dest.name + ".part")
         
-        # Download with retry logic
-        max_retries = 3
-        retry_delay = 1
+        def attempt():
+            return _fetch(url, part, connections, progress)
         
-        for attempt in range(max_retries):
-            try:
-                if progress:
-                    print(f"Downloading {url}...")
-                
-                urllib.request.urlretrieve(url, dest)
-                
-                if progress:
-                    print(f"✓ Downloaded to {dest}")
-                return
-                
-            except urllib.error.URLError as e:
-                if attempt < max_retries - 1:
-                    if progress:
-                        print(f"Download failed, retrying in {retry_delay}s... ({e})")
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                else:
-                    raise OriginPkgError(f"Failed to download {url}: {e}")
-            except Exception as e:
-                raise OriginPkgError(f"Unexpected error downloading {url}: {e}")
+        def on_retry(error: Exception, delay: float):
+            if progress:
+                print(f"Download failed, retrying in {delay:.1f}s... ({error})")
+        
+        try:
+            digest = policy.call(url, attempt, lambda e: _is_transient(e, policy), OriginPkgError, on_retry)
+        except urllib.error.URLError as e:
+            raise OriginPkgError(f"Failed to download {url}: {e}")
+        except OriginPkgError:
+            raise
+        except Exception as e:
+            raise OriginPkgError(f"Unexpected error downloading {url}: {e}")
+        
+        os.replace(part, dest)
+        if progress:
+            print(f"✓ Downloaded to {dest}")
+        return digest
                 
     except Exception as e:
         if not isinstance(e, OriginPkgError):
             raise OriginPkgError(f"Download failed: {e}")
+        raise
+
+
+def _download_connections() -> int:
+    """Get the number of connections for parallel downloads from the environment."""
+    value = os.environ.get("ORIGIN_DOWNLOAD_CONNECTIONS")
+    if not value:
+        return DEFAULT_DOWNLOAD_CONNECTIONS
+    try:
+        return max(1, int(value))
+    except ValueError:
+        raise OriginPkgError(f"Invalid ORIGIN_DOWNLOAD_CONNECTIONS: {value!r}")
+
+
+def _fetch(url: str, part: pathlib.Path, connections: int, progress: bool) -> str:
+    """
+    Make one download attempt into ``part``, continuing any earlier one.
+    
+    Returns:
+        The SHA-256 hex digest of the completed ``part`` file
+    """
+    ranges = _pending_ranges(part)
+    if ranges:
+        if progress:
+            print(f"Resuming {url} in {len(ranges)} parts...")
+        return _fetch_ranges(url, part, ranges)
+    
+    offset = part.stat().st_size if part.exists() else 0
+    try:
+        response = _open(url, offset)
+    except urllib.error.HTTPError as e:
+        if e.code != 416 or not offset:
+            raise
+        # The partial file is no prefix of what the server has now; start over
+        part.unlink()
+        offset = 0
+        response = _open(url, offset)
+    
+    with response:
+        resumed = offset > 0 and response.status == 206
+        if not resumed:
+            size = response.headers.get("Content-Length")
+            if (connections > 1 and size and size.isdigit() and int(size) >= PARALLEL_DOWNLOAD_MIN_SIZE
+                    and response.headers.get("Accept-Ranges", "").lower() == "bytes"):
+                ranges = _split_range(int(size), connections)
+                if progress:
+                    print(f"Downloading {url} in {len(ranges)} parts...")
+                response.close()
+                return _fetch_ranges(url, part, ranges)
+        
+        if progress:
+            print(f"Resuming {url} from byte {offset}..." if resumed else f"Downloading {url}...")
+        hasher = file_hasher(part) if resumed else None
+        received = 0
+        with HashingWriter(open(part, 'ab' if resumed else 'wb'), hasher) as f:
+            for block in iter(lambda: response.read(DOWNLOAD_BLOCK_SIZE), b""):
+                f.write(block)
+                received += len(block)
+        _check_length(response, received)
+    return f.hexdigest()
+
+
+def _fetch_ranges(url: str, part: pathlib.Path, ranges: List[Tuple[int, int]]) -> str:
+    """
+    Fetch byte ranges in parallel, then join them into ``part``.
+    
+    Each range goes to its own ``<part>.<start>-<end>`` file, so a failed
+    attempt keeps every byte received. Ranges are joined and hashed in order
+    as soon as they are complete, while later ones are still downloading.
+    """
+    paths = [_range_path(part, start, end) for start, end in ranges]
+    with concurrent.futures.ThreadPoolExecutor(len(ranges), "origin-download") as pool:
+        futures = [pool.submit(_fetch_range, url, path, start, end)
+                   for path, (start, end) in zip(paths, ranges)]
+        with HashingWriter(open(part, 'wb')) as out:
+            for path, future in zip(paths, futures):
+                future.result()
+                with open(path, 'rb') as f:
+                    shutil.copyfileobj(f, out, HASH_BLOCK_SIZE)
+    for path in paths:
+        path.unlink()
+    return out.hexdigest()
+
+
+def _fetch_range(url: str, path: pathlib.Path, start: int, end: int) -> None:
+    """Download bytes ``start`` to ``end`` (inclusive) into ``path``, continuing what it holds."""
+    offset = start + (path.stat().st_size if path.exists() else 0)
+    if offset > end:
+        return
+    with _open(url, offset, end) as response:
+        if response.status != 206:
+            raise OriginPkgError(f"Server ignored the range request for {url}")
+        received = 0
+        with open(path, 'ab') as f:
+            for block in iter(lambda: response.read(DOWNLOAD_BLOCK_SIZE), b""):
+                f.write(block)
+                received += len(block)
+        _check_length(response, received)
+
+
+def _check_length(response, received: int) -> None:
+    """Fail (transiently) if the connection closed before the whole body arrived."""
+    expected = response.headers.get("Content-Length")
+    if expected and expected.isdigit() and received < int(expected):
+        raise ConnectionError(f"Connection closed after {received} of {expected} bytes")
+
+
+def _open(url: str, offset: int = 0, end: Optional[int] = None):
+    """Open a URL, from byte ``offset`` (to ``end``) if given."""
+    request = urllib.request.Request(url)
+    if offset or end is not None:
+        request.add_header("Range", f"bytes={offset}-{'' if end is None else end}")
+    return urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT)
+
+
+def _split_range(size: int, count: int) -> List[Tuple[int, int]]:
+    """Split ``size`` bytes into ``count`` contiguous inclusive ranges."""
+    step = -(-size // count)
+    return [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+
+def _range_path(part: pathlib.Path, start: int, end: int) -> pathlib.Path:
+    """File holding one range of a parallel download."""
+    return part.with_name(f"{part.name}.{start}-{end}")
+
+
+def _pending_ranges(part: pathlib.Path) -> List[Tuple[int, int]]:
+    """Get the ranges of an interrupted parallel download into ``part``, in order."""
+    ranges = []
+    prefix = part.name + "."
+    for path in part.parent.iterdir():
+        if not path.name.startswith(prefix):
+            continue
+        start, _, end = path.name[len(prefix):].partition("-")
+        if start.isdigit() and end.isdigit():
+            ranges.append((int(start), int(end)))
+    return sorted(ranges)
+
+
+def _is_transient(error: Exception, policy: NetworkPolicy) -> bool:
+    """Whether a failed download is worth retrying: connection problems and statuses in the retry set."""
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in policy.retry_statuses
+    return isinstance(error, (urllib.error.URLError, http.client.IncompleteRead, ConnectionError, TimeoutError))
 
 
 def download_checksum(url: str) -> Optional[str]:
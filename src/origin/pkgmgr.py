@@ -1,20 +1,60 @@
+import contextlib
+import hashlib
 import json
+import os
 import shutil
 import pathlib
-import hashlib
 import tempfile
-from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urlparse
 from .errors import OriginPkgError
 from .net import download, download_checksum, is_url
-from .archive import extract_archive, is_archive_file
+from .hashing import file_digest
+from .archive import extract_archive, is_archive_file, read_manifest
 from .registry import Registry, parse_package_spec
 from .lock import Lockfile
+from .policy import NetworkPolicy
+from .store import PackageStore, get_link_mode
+from .archive_cache import ArchiveCache
+from .resolver import Resolver
+from .semver import SemVer, VersionSet
 
 LIB_DIR = pathlib.Path(".origin") / "libs"
 
+# Per-package records of what was installed into LIB_DIR, read by `origin install --frozen`
+STAMP_DIR = pathlib.Path(".origin") / "stamps"
+
+# Packages `origin install` downloads and extracts at once
+DEFAULT_INSTALL_JOBS = 8
+
+
+@dataclass
+class PlannedPackage:
+    """A package `origin install` will fetch."""
+    name: str
+    version: str
+    url: str
+    checksum: Optional[str] = None  # Expected SHA-256, when the version comes from origin.lock
+    dependencies: Dict[str, str] = field(default_factory=dict)
+
+
+def get_install_jobs() -> int:
+    """Get the number of parallel install jobs from ORIGIN_INSTALL_JOBS."""
+    value = os.environ.get("ORIGIN_INSTALL_JOBS")
+    if not value:
+        return DEFAULT_INSTALL_JOBS
+    try:
+        return max(1, int(value))
+    except ValueError:
+        raise OriginPkgError(f"Invalid ORIGIN_INSTALL_JOBS: {value!r}")
+
+
 class PackageManager:
-    def __init__(self, cwd: pathlib.Path = pathlib.Path.cwd()):
+    def __init__(self, cwd: pathlib.Path = pathlib.Path.cwd(), offline: bool = False):
         self.cwd = cwd
+        self.offline = offline  # Only use archives from the archive cache
         self.manifest_path = cwd / "pkg.json"
         if not self.manifest_path.exists():
             raise OriginPkgError("No pkg.json found in this directory.")
@@ -22,6 +62,9 @@ class PackageManager:
         self.manifest = json.loads(self.manifest_path.read_text())
         self.lockfile = Lockfile(cwd / "origin.lock")
         self.registry = Registry()
+        self.network_policy = NetworkPolicy.load(cwd)  # Shared so rate limits and circuits span downloads
+        self.store = PackageStore()
+        self.archive_cache = ArchiveCache()
 
     # public API -----------------------------------------------------------
 
@@ -51,15 +94,255 @@ class PackageManager:
             else:
                 self._install_local(src_path)
     
+    def install(self, jobs: Optional[int] = None, link_mode: Optional[str] = None, frozen: bool = False):
+        """
+        Install every dependency in pkg.json.
+        
+        Dependencies are first resolved into a plan. Packages missing from the
+        package store are downloaded, verified and extracted into it in
+        parallel; locked packages already there are not downloaded at all.
+        Libraries are then linked from the store and only moved into
+        .origin/libs once every package is ready, so a failed install changes
+        nothing.
+        
+        A frozen install takes the plan from origin.lock as it is, without the
+        registry or resolving anything (see plan_frozen), and leaves origin.lock
+        alone. Libraries still installed as recorded by their stamp are kept
+        without being linked again or hashed.
+        
+        Args:
+            jobs: Packages fetched at once (defaults to ORIGIN_INSTALL_JOBS, or 8)
+            link_mode: How libraries are placed from the store (see
+                       PackageStore.link; defaults to ORIGIN_LINK_MODE, or "auto")
+            frozen: Whether to install exactly the packages in origin.lock
+        """
+        plan = self.plan_frozen() if frozen else self.plan_install()
+        if not plan:
+            print("✓ No dependencies to install")
+            return
+        
+        # Libraries installed by an earlier install, by package name
+        installed: Dict[str, str] = {}
+        if frozen:
+            for package in plan:
+                lib_name = _installed_library(package.name, package.checksum)
+                if lib_name is not None:
+                    installed[package.name] = lib_name
+            if len(installed) == len(plan):
+                print(f"✓ All {len(plan)} packages are installed")
+                return
+            plan = [package for package in plan if package.name not in installed]
+        
+        link_mode = link_mode or get_link_mode()
+        checksums = {package.name: package.checksum for package in plan
+                     if package.checksum and self.store.has(package.checksum)}
+        missing = [package for package in plan if package.name not in checksums]
+        LIB_DIR.mkdir(parents=True, exist_ok=True)
+        print(f"Installing {len(plan)} packages ({len(checksums)} already in the package store"
+              + (f", {len(installed)} already installed" if installed else "") + ")...")
+        
+        # Stage next to LIB_DIR so libraries move into place with a rename
+        with tempfile.TemporaryDirectory(dir=LIB_DIR.parent, prefix=".install-") as staging_dir:
+            staging = pathlib.Path(staging_dir)
+            errors = []
+            if missing:
+                jobs = min(jobs or get_install_jobs(), len(missing))
+                with ThreadPoolExecutor(jobs, "origin-install") as pool:
+                    futures = {
+                        pool.submit(self._fetch_package, package, staging / str(index)): package
+                        for index, package in enumerate(missing)
+                    }
+                    for future in as_completed(futures):
+                        package = futures[future]
+                        try:
+                            checksums[package.name] = future.result()
+                        except OriginPkgError as e:
+                            errors.append(f"{package.name}@{package.version}: {e}")
+                        else:
+                            print(f"✓ Fetched {package.name}@{package.version}")
+            if errors:
+                raise OriginPkgError("Install failed; no libraries were changed.\n  " + "\n  ".join(sorted(errors)))
+            
+            lib_names = {lib_name: name for name, lib_name in installed.items()}
+            staged: Dict[str, pathlib.Path] = {}
+            for index, package in enumerate(plan):
+                lib_name = self.store.library(checksums[package.name]).name
+                if lib_name in lib_names:
+                    raise OriginPkgError(f"{package.name} and {lib_names[lib_name]} both install "
+                                         f"'{lib_name}'; no libraries were changed.")
+                lib_names[lib_name] = package.name
+                staged[package.name] = staging / f"link-{index}" / lib_name
+                staged[package.name].parent.mkdir()
+                self.store.link(checksums[package.name], staged[package.name], link_mode)
+            
+            # Record every package with a single write of origin.lock
+            with self.lockfile.transaction() if not frozen else contextlib.nullcontext():
+                for package in plan:
+                    dest = _link_library(staged[package.name])
+                    _write_stamp(package.name, checksums[package.name], dest)
+                    if not frozen:
+                        self.lockfile.add_package(package.name, package.version, checksums[package.name],
+                                                  package.url, package.dependencies)
+                    print(f"✔ Installed {package.name}@{package.version} → {dest}")
+    
+    def plan_install(self) -> List[PlannedPackage]:
+        """
+        Resolve the dependencies in pkg.json, and theirs, to the packages to fetch.
+        
+        Locked versions are kept while they still satisfy every requirement;
+        other packages get the highest version in the registry that is
+        compatible with the rest of the dependency graph (see Resolver).
+        
+        Raises:
+            ResolutionError: Listing every dependency that cannot be resolved,
+                             or explaining the conflict between requirements
+        """
+        locked = self.lockfile.get_all_packages()
+        resolver = Resolver(self._available_versions, self._package_dependencies,
+                            preferred={name: info.get("version") for name, info in locked.items()})
+        resolution = resolver.resolve(self.manifest.get("dependencies", {}), self.manifest.get("name", "pkg.json"))
+        
+        plan = []
+        for name, package in sorted(resolution.items()):
+            info = locked.get(name, {})
+            checksum = info.get("checksum") if (info.get("version"), info.get("url")) == (package.version, package.url) else None
+            plan.append(PlannedPackage(name, package.version, package.url, checksum, package.dependencies))
+        return plan
+    
+    def plan_frozen(self) -> List[PlannedPackage]:
+        """
+        Get the packages to fetch straight from origin.lock, without the registry.
+        
+        Only checks that every dependency in pkg.json is locked at a version
+        in its range; the dependencies of locked packages are trusted.
+        
+        Raises:
+            OriginPkgError: Listing dependencies origin.lock does not satisfy and
+                            locked packages without a URL or checksum
+        """
+        locked = self.lockfile.get_all_packages()
+        problems = []
+        for name, version_range in sorted(self.manifest.get("dependencies", {}).items()):
+            info = locked.get(name)
+            if info is None:
+                problems.append(f"{name} is not locked")
+                continue
+            try:
+                satisfied = VersionSet.from_range(version_range).contains(SemVer.parse(info.get("version", "")))
+            except OriginPkgError:
+                satisfied = False
+            if not satisfied:
+                problems.append(f"{name} is locked at {info.get('version')}, which does not satisfy {version_range}")
+        
+        plan = []
+        for name, info in sorted(locked.items()):
+            absent = [key for key in ("url", "checksum") if not info.get(key)]
+            if absent:
+                problems.append(f"{name} has no {' or '.join(absent)} in origin.lock")
+                continue
+            plan.append(PlannedPackage(name, info.get("version", ""), info["url"], info["checksum"],
+                                       dict(info.get("dependencies") or {})))
+        
+        if problems:
+            raise OriginPkgError("origin.lock does not match pkg.json; run `origin install` to update it.\n  "
+                                 + "\n  ".join(problems))
+        return plan
+    
+    def _available_versions(self, name: str) -> List[Tuple[str, str]]:
+        """Get the (version, url) pairs of a package in the registry, and its locked version."""
+        try:
+            versions = self.registry.versions(name)
+        except OriginPkgError:
+            versions = []
+        locked = self.lockfile.get_package(name)
+        if locked and locked.get("url") and all(version != locked.get("version") for version, _ in versions):
+            versions.append((locked["version"], locked["url"]))
+        return versions
+    
+    def _package_dependencies(self, name: str, version: str, url: str) -> Dict[str, str]:
+        """
+        Get the dependencies of a package version.
+        
+        They come from the registry entry or origin.lock when recorded there;
+        otherwise the pkg.json inside the package's archive is read, leaving
+        the archive in the archive cache for the install that follows.
+        """
+        dependencies = self.registry.dependencies(name, version)
+        if dependencies is not None:
+            return dependencies
+        locked = self.lockfile.get_package(name)
+        if locked and (locked.get("version"), locked.get("url")) == (version, url) and "dependencies" in locked:
+            return locked["dependencies"]
+        
+        checksum = locked.get("checksum") if locked and locked.get("version") == version else None
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                archive_path, _ = self._get_archive(url, pathlib.Path(temp_dir), checksum, progress=False)
+                manifest = read_manifest(archive_path) or {}
+        except OriginPkgError as e:
+            raise OriginPkgError(f"Cannot read the dependencies of {name}@{version}: {e}")
+        return dict(manifest.get("dependencies") or {})
+    
+    def _fetch_package(self, package: PlannedPackage, work_dir: pathlib.Path) -> str:
+        """
+        Get a planned package's verified archive in ``work_dir`` and extract it into the store.
+        
+        Returns:
+            The archive's SHA-256
+        """
+        work_dir.mkdir(parents=True)
+        archive_path, digest = self._get_archive(package.url, work_dir, package.checksum, progress=False)
+        if not self.store.has(digest):
+            extract_dir = work_dir / archive_path.stem
+            extract_archive(archive_path, extract_dir)
+            self.store.add(digest, _library_root(extract_dir))
+        return digest
+    
+    def _get_archive(self, url: str, work_dir: pathlib.Path, checksum: Optional[str] = None,
+                     progress: bool = True) -> Tuple[pathlib.Path, str]:
+        """
+        Get a verified archive from the archive cache, or download it into ``work_dir``.
+        
+        Args:
+            url: Archive URL
+            work_dir: Directory to download into
+            checksum: Expected SHA-256; without it, the ``.sha256`` file next to
+                      a downloaded archive is checked when there is one
+            progress: Whether to show download progress
+        
+        Returns:
+            The archive (which may be in the cache and must not be modified) and its SHA-256
+        """
+        cached = self.archive_cache.lookup(url, checksum)
+        if cached is not None:
+            return cached
+        if self.offline:
+            raise OriginPkgError(f"{url} is not in the archive cache (offline)")
+        
+        filename = pathlib.Path(urlparse(url).path).name
+        if not filename:
+            raise OriginPkgError(f"Could not determine filename from URL: {url}")
+        archive_path = work_dir / filename
+        digest = download(url, archive_path, progress=progress, policy=self.network_policy) or file_digest(archive_path)
+        expected = checksum or download_checksum(f"{url}.sha256")
+        if expected:
+            self._verify_checksum(archive_path, expected, digest)
+        self.archive_cache.store(url, archive_path, digest)
+        return archive_path, digest
+    
     def _install_from_registry(self, package_name: str, version_range: str, update_lock: bool = False):
         """Install a package from the registry using semantic versioning."""
         # Check if package is already in lockfile and we're not updating
         if not update_lock and self.lockfile.has_package(package_name):
             package_info = self.lockfile.get_package(package_name)
             if package_info:
-                print(f"✓ Using locked version {package_info['version']} for {package_name}")
-                # Reinstall from lockfile
-                self._install_remote(package_info['checksum'], package_info['checksum'])
+                locked_version = package_info['version']
+                url = package_info.get('url') or self.registry.resolve(package_name, locked_version)
+                if url is None:
+                    raise OriginPkgError(f"No URL for locked {package_name}@{locked_version}")
+                print(f"✓ Using locked version {locked_version} for {package_name}")
+                # Reinstall from lockfile, verifying the locked checksum
+                self._install_package(package_name, locked_version, url, package_info.get('checksum'))
                 return
         
         # Resolve version from registry
@@ -69,44 +352,30 @@ class PackageManager:
         
         resolved_version, url = result
         print(f"✓ Resolved {package_name}@{version_range} → {resolved_version}")
+        self._install_package(package_name, resolved_version, url)
+    
+    def _install_package(self, package_name: str, version: str, url: str, checksum: Optional[str] = None):
+        """Install one package version through the package store and record it in origin.lock."""
+        if checksum is None or not self.store.has(checksum):
+            # Download (or take from the archive cache) and verify checksum
+            with tempfile.TemporaryDirectory() as temp_dir:
+                archive_path, checksum = self._get_archive(url, pathlib.Path(temp_dir), checksum)
+                
+                # Extract into the package store
+                extract_dir = pathlib.Path(temp_dir) / archive_path.stem
+                extract_archive(archive_path, extract_dir)
+                self.store.add(checksum, _library_root(extract_dir))
         
-        # Download and verify checksum
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = pathlib.Path(temp_dir) / f"{package_name}.tar.gz"
-            download(url, temp_path)
-            
-            # Try to download checksum
-            checksum_url = f"{url}.sha256"
-            downloaded_checksum = download_checksum(checksum_url)
-            if downloaded_checksum:
-                self._verify_checksum(temp_path, downloaded_checksum)
-                checksum = downloaded_checksum
-            else:
-                # Calculate checksum ourselves
-                with open(temp_path, 'rb') as f:
-                    checksum = hashlib.sha256(f.read()).hexdigest()
-            
-            # Extract and install
-            extract_dir = temp_path.parent / temp_path.stem
-            extract_archive(temp_path, extract_dir)
-            
-            # Find the actual library directory
-            extracted_items = list(extract_dir.iterdir())
-            if len(extracted_items) == 1 and extracted_items[0].is_dir():
-                lib_dir = extracted_items[0]
-            else:
-                lib_dir = extract_dir
-            
-            # Copy to final location
-            final_dest = LIB_DIR / lib_dir.name
-            if final_dest.exists():
-                shutil.rmtree(final_dest)
-            shutil.copytree(lib_dir, final_dest)
-            
-            # Update lockfile
-            self.lockfile.add_package(package_name, resolved_version, checksum)
-            
-            print(f"✔ Installed {package_name}@{resolved_version} → {final_dest}")
+        # Link from the package store
+        final_dest = LIB_DIR / self.store.library(checksum).name
+        _remove_library(final_dest)
+        self.store.link(checksum, final_dest, get_link_mode())
+        _write_stamp(package_name, checksum, final_dest)
+        
+        # Update lockfile
+        self.lockfile.add_package(package_name, version, checksum, url)
+        
+        print(f"✔ Installed {package_name}@{version} → {final_dest}")
     
     def _install_local(self, src: pathlib.Path):
         """Install a local library."""
@@ -126,13 +395,13 @@ class PackageManager:
             raise OriginPkgError(f"Archive file not found: {archive_path}")
         if not is_archive_file(archive_path):
             raise OriginPkgError(f"Unsupported archive format: {archive_path.suffix}")
-        # Verify checksum if provided
-        if checksum:
-            self._verify_checksum(archive_path, checksum)
-        # Extract to temporary location
+        # Extract to temporary location, hashing the archive in the same pass
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = pathlib.Path(temp_dir)
-            extract_archive(archive_path, temp_path)
+            digest = extract_archive(archive_path, temp_path)
+            # Verify checksum if provided, before anything is installed
+            if checksum:
+                self._verify_checksum(archive_path, checksum, digest)
             # Find top-level dirs
             items = [p for p in temp_path.iterdir() if p.is_dir()]
             if len(items) != 1:
@@ -164,34 +433,15 @@ class PackageManager:
         if dest.exists():
             raise OriginPkgError(f"Library '{filename}' already installed.")
         
-        # Download to temporary location
+        # Download to temporary location (or take from the archive cache) and verify checksum
         with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = pathlib.Path(temp_dir) / filename
-            download(url, temp_path)
-            
-            # Verify checksum if provided
-            if checksum:
-                self._verify_checksum(temp_path, checksum)
-            else:
-                # Try to download checksum file
-                checksum_url = f"{url}.sha256"
-                downloaded_checksum = download_checksum(checksum_url)
-                if downloaded_checksum:
-                    self._verify_checksum(temp_path, downloaded_checksum)
+            temp_path, _ = self._get_archive(url, pathlib.Path(temp_dir), checksum)
             
             # Extract if it's an archive
             if is_archive_file(temp_path):
-                extract_dir = temp_path.parent / temp_path.stem
+                extract_dir = pathlib.Path(temp_dir) / temp_path.stem
                 extract_archive(temp_path, extract_dir)
-                
-                # Find the actual library directory
-                extracted_items = list(extract_dir.iterdir())
-                if len(extracted_items) == 1 and extracted_items[0].is_dir():
-                    # Single directory, use it as the library
-                    lib_dir = extracted_items[0]
-                else:
-                    # Multiple items or files, use the extract directory
-                    lib_dir = extract_dir
+                lib_dir = _library_root(extract_dir)
                 
                 # Copy to final location
                 final_dest = LIB_DIR / lib_dir.name
@@ -202,10 +452,11 @@ class PackageManager:
                 shutil.copy2(temp_path, dest)
                 print(f"✔ Installed {filename} → {dest}")
     
-    def _verify_checksum(self, file_path: pathlib.Path, expected_checksum: str):
-        """Verify SHA-256 checksum of a file (case-insensitive)."""
-        with open(file_path, 'rb') as f:
-            actual_checksum = hashlib.sha256(f.read()).hexdigest()
+    def _verify_checksum(self, file_path: pathlib.Path, expected_checksum: str,
+                         actual_checksum: str | None = None):
+        """Verify SHA-256 checksum of a file (case-insensitive), unless ``actual_checksum`` is already known."""
+        if actual_checksum is None:
+            actual_checksum = file_digest(file_path)
         if actual_checksum.lower() != expected_checksum.lower():
             raise OriginPkgError(
                 f"Checksum verification failed for {file_path.name}. "
@@ -215,7 +466,90 @@ class PackageManager:
 
     def remove(self, name: str):
         target = LIB_DIR / name
-        if not target.exists():
+        if not os.path.lexists(target):
             raise OriginPkgError(f"No installed lib named '{name}'.")
-        shutil.rmtree(target)
-        print(f"✖ Removed {name}") 
\ No newline at end of file
+        _remove_library(target)
+        for stamp_path in STAMP_DIR.glob("*.json"):
+            with contextlib.suppress(OSError, ValueError, AttributeError):
+                if json.loads(stamp_path.read_text()).get("library") == name:
+                    stamp_path.unlink()
+        print(f"✖ Removed {name}") 
+
+def _library_root(extract_dir: pathlib.Path) -> pathlib.Path:
+    """Get the library in an extracted archive: its only top-level directory, or the whole archive."""
+    extracted_items = list(extract_dir.iterdir())
+    if len(extracted_items) == 1 and extracted_items[0].is_dir():
+        return extracted_items[0]
+    return extract_dir
+
+
+def _link_library(lib_dir: pathlib.Path) -> pathlib.Path:
+    """
+    Move a staged library into LIB_DIR under its own name.
+    
+    An installed copy is first renamed aside into the staging area, and
+    removed with it, so libraries are swapped by two renames instead of
+    being copied over.
+    """
+    dest = LIB_DIR / lib_dir.name
+    if os.path.lexists(dest):
+        dest.rename(lib_dir.with_name(lib_dir.name + ".replaced"))
+    lib_dir.rename(dest)
+    return dest
+
+
+def _stamp_path(package_name: str) -> pathlib.Path:
+    """Get the stamp file of a package (whose name may contain slashes)."""
+    return STAMP_DIR / f"{quote(package_name, safe='')}.json"
+
+
+def _library_fingerprint(lib_path: pathlib.Path) -> Optional[str]:
+    """
+    Summarize an installed library cheaply, or None if it is missing.
+    
+    Covers the path, size and modification time of every file (or a
+    symlink's target), so changed, added or removed files change it
+    without any file being read.
+    """
+    if not lib_path.exists():
+        return None
+    hasher = hashlib.sha256()
+    if lib_path.is_symlink():
+        hasher.update(os.readlink(lib_path).encode())
+        return hasher.hexdigest()
+    for root, dirs, files in os.walk(lib_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            stat = os.lstat(path)
+            hasher.update(f"{os.path.relpath(path, lib_path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return hasher.hexdigest()
+
+
+def _write_stamp(package_name: str, checksum: str, lib_path: pathlib.Path) -> None:
+    """Record which archive a package's library was installed from, and how it looked afterwards."""
+    STAMP_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = {"checksum": checksum, "library": lib_path.name, "fingerprint": _library_fingerprint(lib_path)}
+    _stamp_path(package_name).write_text(json.dumps(stamp))
+
+
+def _installed_library(package_name: str, checksum: str) -> Optional[str]:
+    """Get the library a package installed, if it came from ``checksum`` and is unchanged since."""
+    try:
+        stamp = json.loads(_stamp_path(package_name).read_text())
+        if stamp["checksum"] != checksum:
+            return None
+        lib_name = stamp["library"]
+        if _library_fingerprint(LIB_DIR / lib_name) != stamp["fingerprint"]:
+            return None
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return lib_name
+
+
+def _remove_library(path: pathlib.Path) -> None:
+    """Remove an installed library, whether a directory or a symlink into the package store."""
+    if path.is_symlink():
+        path.unlink()
+    elif path.exists():
+        shutil.rmtree(path)
\ No newline at end of file
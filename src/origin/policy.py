@@ -0,0 +1,244 @@
+import email.utils
+import json
+import os
+import pathlib
+import random
+import threading
+import time
+import urllib.parse
+from typing import Any, Callable, Dict, Optional, Type
+
+from .errors import OriginError
+
+# Default retry behaviour: attempts after the first, and backoff bounds in seconds
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+
+# Statuses that mean "try again later" rather than "this request is wrong"
+DEFAULT_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Consecutive failures that open a host's circuit, and seconds before it is retried
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET = 30.0
+
+# pkg.json "network" keys and the environment variables that override them
+_SETTINGS = {
+    "rate": ("ORIGIN_NET_RATE", float),
+    "burst": ("ORIGIN_NET_BURST", int),
+    "retries": ("ORIGIN_NET_RETRIES", int),
+    "backoff": ("ORIGIN_NET_BACKOFF", float),
+    "backoff_max": ("ORIGIN_NET_BACKOFF_MAX", float),
+    "retry_on": ("ORIGIN_NET_RETRY_ON", lambda value: [int(s) for s in value.split(",") if s.strip()]),
+    "breaker_threshold": ("ORIGIN_NET_BREAKER_THRESHOLD", int),
+    "breaker_reset": ("ORIGIN_NET_BREAKER_RESET", float),
+}
+
+
+class NetworkPolicy:
+    """
+    Rate limiting, retries and circuit breaking for outgoing requests.
+    
+    Shared by runtime http_get calls and package downloads. Per host:
+    
+    - a token bucket allows ``rate`` requests per second with bursts of up to
+      ``burst``; requests over the limit wait for a token instead of failing
+    - transient failures (as decided by the caller) are retried up to
+      ``max_retries`` times with jittered exponential backoff, waiting at least
+      as long as a Retry-After the server sent
+    - after ``breaker_threshold`` consecutive failures the host's circuit opens
+      and requests fail immediately for ``breaker_reset`` seconds; the first
+      request after that is let through, and closes the circuit if it succeeds
+    """
+    
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX, retry_statuses=DEFAULT_RETRY_STATUSES,
+                 breaker_threshold: int = DEFAULT_BREAKER_THRESHOLD, breaker_reset: float = DEFAULT_BREAKER_RESET,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the policy.
+        
+        Args:
+            rate: Requests per second per host (None for no limit)
+            burst: Requests a host may receive at once (defaults to ``rate``, at least 1)
+            max_retries: Retries after the first attempt
+            backoff_base: Upper bound of the first backoff delay; doubles per retry
+            backoff_max: Upper bound of any backoff delay
+            retry_statuses: HTTP statuses worth retrying
+            breaker_threshold: Consecutive failures that open a circuit (0 disables it)
+            breaker_reset: Seconds an open circuit rejects requests
+            clock, sleep: Time sources, replaceable in tests
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError("Rate limit must be positive")
+        if max_retries < 0:
+            raise ValueError("Retries must not be negative")
+        
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate or 1))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets: Dict[str, list] = {}  # host -> [tokens, last refill]
+        self._circuits: Dict[str, list] = {}  # host -> [consecutive failures, opened at]
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **kwargs) -> 'NetworkPolicy':
+        """Create a policy from a pkg.json "network" section."""
+        names = {
+            "rate": "rate",
+            "burst": "burst",
+            "retries": "max_retries",
+            "backoff": "backoff_base",
+            "backoff_max": "backoff_max",
+            "retry_on": "retry_statuses",
+            "breaker_threshold": "breaker_threshold",
+            "breaker_reset": "breaker_reset",
+        }
+        unknown = set(config) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown network settings: {', '.join(sorted(unknown))}")
+        kwargs.update((names[key], value) for key, value in config.items())
+        return cls(**kwargs)
+    
+    @classmethod
+    def load(cls, project_dir: Optional[pathlib.Path] = None) -> 'NetworkPolicy':
+        """
+        Load the policy for a project.
+        
+        Settings come from the "network" section of ``project_dir/pkg.json``
+        (the current directory by default), overridden by ORIGIN_NET_*
+        environment variables.
+        """
+        manifest_path = pathlib.Path(project_dir or pathlib.Path.cwd()) / "pkg.json"
+        config: Dict[str, Any] = {}
+        if manifest_path.exists():
+            try:
+                config = dict(json.loads(manifest_path.read_text()).get("network") or {})
+            except (ValueError, AttributeError) as e:
+                raise OriginError(f"Invalid network settings in {manifest_path}: {e}")
+        
+        for key, (variable, convert) in _SETTINGS.items():
+            value = os.environ.get(variable)
+            if value:
+                config[key] = convert(value)
+        
+        try:
+            return cls.from_config(config)
+        except (TypeError, ValueError) as e:
+            raise OriginError(f"Invalid network settings: {e}")
+    
+    def call(self, url: str, fn: Callable[[], Any], is_transient: Callable[[Exception], bool],
+             error_cls: Type[Exception] = OriginError,
+             on_retry: Optional[Callable[[Exception, float], None]] = None) -> Any:
+        """
+        Make a request under the policy.
+        
+        Args:
+            url: URL being requested; limits and circuits are per host
+            fn: Makes one attempt and returns its result
+            is_transient: Whether an error raised by ``fn`` is worth retrying;
+                          a ``retry_after`` attribute on it is honoured
+            error_cls: Exception raised when the host's circuit is open
+            on_retry: Called with the error and the delay before each retry
+        
+        Returns:
+            The result of the first successful attempt
+        
+        Raises:
+            The last error of ``fn``, or ``error_cls`` if the circuit is open
+        """
+        host = urllib.parse.urlparse(url).netloc
+        attempt = 0
+        while True:
+            self._check_circuit(host, error_cls)
+            self._acquire(host)
+            try:
+                result = fn()
+            except Exception as e:
+                transient = is_transient(e)
+                if transient:
+                    self._record_failure(host)
+                if not transient or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt, getattr(e, "retry_after", None))
+                if on_retry is not None:
+                    on_retry(e, delay)
+                self.sleep(delay)
+                attempt += 1
+                continue
+            self._record_success(host)
+            return result
+    
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Get the delay before retry number ``attempt`` (from 0).
+        
+        Uses "full jitter": a random delay up to the exponential bound, so
+        clients that failed together do not retry together.
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+    
+    def _acquire(self, host: str) -> None:
+        """Take a token from the host's bucket, waiting for one if it is empty."""
+        if self.rate is None:
+            return
+        with self._lock:
+            now = self.clock()
+            bucket = self._buckets.setdefault(host, [float(self.burst), now])
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            # Reserve the token now so concurrent callers queue up behind each other
+            bucket[0] -= 1
+            wait = -bucket[0] / self.rate if bucket[0] < 0 else 0.0
+        if wait:
+            self.sleep(wait)
+    
+    def _check_circuit(self, host: str, error_cls: Type[Exception]) -> None:
+        """Fail fast while the host's circuit is open."""
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None or circuit[1] is None:
+                return
+            remaining = circuit[1] + self.breaker_reset - self.clock()
+            if remaining <= 0:
+                circuit[1] = None  # Let one request through; another failure reopens it
+                return
+        raise error_cls(f"Circuit open for {host} after {circuit[0]} consecutive failures; "
+                        f"retrying in {remaining:.0f}s")
+    
+    def _record_failure(self, host: str) -> None:
+        """Count a transient failure, opening the circuit at the threshold."""
+        with self._lock:
+            circuit = self._circuits.setdefault(host, [0, None])
+            circuit[0] += 1
+            if self.breaker_threshold and circuit[0] >= self.breaker_threshold:
+                circuit[1] = self.clock()
+    
+    def _record_success(self, host: str) -> None:
+        """Close the host's circuit."""
+        with self._lock:
+            self._circuits.pop(host, None)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Get the delay in seconds from a Retry-After header (seconds or an HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
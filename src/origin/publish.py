@@ -1,6 +1,5 @@
 import json
 import pathlib
-import hashlib
 import tarfile
 import tempfile
 import os
@@ -11,6 +10,7 @@ import urllib.request
 import urllib.error
 
 from .errors import OriginPkgError
+from .hashing import file_digest
 
 
 class PublishError(OriginPkgError):
@@ -76,17 +76,16 @@ class GitHubPublisher:
         headers = {
             'Authorization': f'token {self.token}',
             'Content-Type': content_type,
+            'Content-Length': str(file_path.stat().st_size),
             'User-Agent': 'origin-lang/1.0'
         }
         
-        with open(file_path, 'rb') as f:
-            data = f.read()
-        
-        req = urllib.request.Request(upload_url, data=data, headers=headers, method='POST')
-        
         try:
-            with urllib.request.urlopen(req) as response:
-                return json.loads(response.read().decode('utf-8'))
+            # Stream the file as the request body instead of reading it into memory
+            with open(file_path, 'rb') as f:
+                req = urllib.request.Request(upload_url, data=f, headers=headers, method='POST')
+                with urllib.request.urlopen(req) as response:
+                    return json.loads(response.read().decode('utf-8'))
         except urllib.error.HTTPError as e:
             raise PublishError(f"Failed to upload {file_path.name}: {e.code} - {e.reason}")
         except Exception as e:
@@ -129,8 +128,7 @@ def build_tarball(project_path: pathlib.Path, name: str, version: str) -> pathli
 
 def compute_checksum(file_path: pathlib.Path) -> str:
     """Compute SHA-256 checksum of a file."""
-    with open(file_path, 'rb') as f:
-        return hashlib.sha256(f.read()).hexdigest()
+    return file_digest(file_path)
 
 
 def parse_repository_url(repo_url: str) -> tuple[str, str]:
@@ -1,46 +1,273 @@
+import collections
+import fnmatch
 import json
 import pathlib
+import re
+import threading
 import time
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .diff import changed_keys
+from .snapshot import safe_snapshot
+from .utils import EventSlice
 
 class Recorder:
     """Records execution events to a JSONL file for debugging and replay."""
     
-    def __init__(self, out_path: pathlib.Path):
-        """Initialize recorder with output file path."""
+    def __init__(self, out_path: pathlib.Path, event_slice: Optional[EventSlice] = None,
+                 checkpoint_every: Optional[int] = None):
+        """
+        Initialize recorder with output file path.
+        
+        Args:
+            out_path: Path of the .orirec file to write
+            event_slice: Optional window of events to keep; other events are skipped
+            checkpoint_every: Write v3 events - variable deltas with a full
+                              checkpoint every N events - instead of v2 snapshots
+        """
+        if checkpoint_every is not None and checkpoint_every < 1:
+            raise ValueError("Checkpoint interval must be at least 1")
+        
         self.out_path = out_path
         self.fp = out_path.open("w", encoding="utf-8")
-        self.event_count = 0
+        self.event_count = 0  # Events written
+        self.seq = 0  # Events seen, including skipped ones
+        self.event_slice = event_slice
+        self.checkpoint_every = checkpoint_every
+        self._previous_locals: Optional[Dict[str, Any]] = None
+        self._previous_functions: Optional[List[str]] = None
+        self._write_lock = threading.Lock()  # Network exchanges are recorded from background threads
     
-    def record(self, node_id: str, env: Dict[str, Any]) -> None:
-        """Record an execution event with node ID and environment snapshot."""
-        from .snapshot import safe_snapshot
+    def record(self, node_id: str, env: Union[Dict[str, Any], Callable[[], Dict[str, Any]]]) -> None:
+        """
+        Record an execution event with node ID and environment snapshot.
+        
+        ``env`` may be a zero-argument callable; it is only called for events
+        that are actually kept, so callers can skip building skipped snapshots.
+        """
+        seq = self.seq
+        self.seq += 1
+        if self.event_slice is not None and not self.event_slice.contains(seq, node_id):
+            return
+        
+        self._write(self._make_event(seq, node_id, env))
+    
+    def _make_event(self, seq: int, node_id: str, env: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build a v2 event from an environment snapshot, or a v3 event when checkpointing.
+        
+        ``changed`` lists the variables that differ from the previously built
+        event, so replay tools can diff adjacent events without comparing
+        whole environments. It is omitted on the first event.
+        """
+        if callable(env):
+            env = env()
         
         # Extract variables and functions from the environment
         variables = env.get("variables", {})
         functions = env.get("functions", [])
         
+        snapshot = safe_snapshot(variables)
+        if self.checkpoint_every is not None:
+            return self._make_v3_event(seq, node_id, snapshot, functions, env.get("position"))
+        
         # Create v2 format event
         event = {
             "version": "v2",
             "ts": time.time(),
+            "seq": seq,
             "blockId": node_id,
-            "locals": safe_snapshot(variables),
+            "locals": snapshot,
             "globals": safe_snapshot({"functions": functions})
         }
+        if self._previous_locals is not None:
+            event["changed"] = changed_keys(self._previous_locals, snapshot)
+        self._previous_locals = snapshot
+        return event
+    
+    def _make_v3_event(self, seq: int, node_id: str, snapshot: Dict[str, Any], functions: List[str],
+                       position: Optional[Dict[str, int]]) -> Dict[str, Any]:
+        """
+        Build a v3 event.
+        
+        Every ``checkpoint_every``-th written event is a checkpoint holding the
+        full environment and, for top-level statements, the position needed to
+        resume execution there. Other events hold only the changed variables:
+        ``delta`` maps added or modified ones to their values and keys in
+        ``changed`` but not in ``delta`` were removed.
+        """
+        if self.event_count % self.checkpoint_every == 0:
+            event = {
+                "version": "v3",
+                "checkpoint": True,
+                "ts": time.time(),
+                "seq": seq,
+                "blockId": node_id,
+                "locals": snapshot,
+                "globals": safe_snapshot({"functions": functions})
+            }
+            if self._previous_locals is not None:
+                event["changed"] = changed_keys(self._previous_locals, snapshot)
+            if position is not None:
+                event["position"] = position
+        else:
+            changed = changed_keys(self._previous_locals or {}, snapshot)
+            event = {
+                "version": "v3",
+                "ts": time.time(),
+                "seq": seq,
+                "blockId": node_id,
+                "changed": changed,
+                "delta": {key: snapshot[key] for key in changed if key in snapshot}
+            }
+            if functions != self._previous_functions:
+                event["globals"] = safe_snapshot({"functions": functions})
         
-        self.fp.write(json.dumps(event) + "\n")
-        self.fp.flush()  # Ensure immediate write
+        self._previous_locals = snapshot
+        self._previous_functions = list(functions)
+        return event
+    
+    def record_net(self, url: str, headers: Optional[Dict[str, str]], body: Optional[str] = None,
+                   error: Optional[str] = None) -> None:
+        """
+        Record an http_get exchange so ``origin run --replay-net`` can serve it later.
+        
+        Exchanges are written as ``"kind": "net"`` lines between the steps and
+        are not counted as events. ``seq`` is the index of the next step, and
+        a failed request stores its ``error`` message instead of a ``body``.
+        """
+        exchange = {
+            "kind": "net",
+            "ts": time.time(),
+            "seq": self.seq,
+            "url": url,
+            "headers": headers or {}
+        }
+        if error is not None:
+            exchange["error"] = error
+        else:
+            exchange["body"] = body
+        line = json.dumps(exchange) + "\n"
+        with self._write_lock:
+            self.fp.write(line)
+            self.fp.flush()
+    
+    def _write(self, event: Dict[str, Any]) -> None:
+        """Append an event to the recording file."""
+        line = json.dumps(event) + "\n"
+        with self._write_lock:
+            self.fp.write(line)
+            self.fp.flush()  # Ensure immediate write
         self.event_count += 1
     
+    def on_error(self, error: BaseException) -> None:
+        """Called when the recorded run fails; every event is already on disk."""
+        pass
+    
     def close(self) -> None:
         """Close the recorder and flush any remaining data."""
-        if hasattr(self, 'fp') and not self.fp.closed:
+        if getattr(self, 'fp', None) is not None and not self.fp.closed:
             self.fp.close()
     
     def __enter__(self):
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close() 
\ No newline at end of file
+        self.close()
+
+
+class SamplingRecorder(Recorder):
+    """
+    Low-overhead recorder for always-on tracing.
+    
+    Events are filtered before any snapshot is taken: only blocks matching
+    ``block_patterns`` (fnmatch globs), then every ``every``-th of those, then at
+    most ``rate`` events per second. Sampled events go to a ring buffer holding
+    the last ``ring_size`` of them, which is written out only by dump() - called
+    when the recorded run fails - so successful runs leave no file behind.
+    """
+    
+    def __init__(self, out_path: pathlib.Path, every: int = 1, rate: Optional[float] = None,
+                 block_patterns: Optional[List[str]] = None, ring_size: int = 1000):
+        """
+        Initialize the sampling recorder.
+        
+        Args:
+            out_path: Path of the .orirec file written on dump()
+            every: Keep every Nth matching event
+            rate: Maximum sampled events per second (None for no limit)
+            block_patterns: Only consider events whose blockId matches one of these globs
+            ring_size: Number of most recent sampled events to keep
+        """
+        if every < 1:
+            raise ValueError("Sampling interval must be at least 1")
+        if ring_size < 1:
+            raise ValueError("Ring size must be at least 1")
+        if rate is not None and rate <= 0:
+            raise ValueError("Sampling rate must be positive")
+        
+        self.out_path = out_path
+        self.fp = None  # Opened by dump()
+        self.event_count = 0
+        self.seq = 0
+        self.event_slice = None
+        self.checkpoint_every = None
+        self.every = every
+        self.min_interval = 1.0 / rate if rate else 0.0
+        self.block_pattern = None
+        if block_patterns:
+            self.block_pattern = re.compile("|".join(fnmatch.translate(p) for p in block_patterns))
+        self.ring = collections.deque(maxlen=ring_size)
+        self._matched = 0
+        self._last_sample = float("-inf")
+        self._previous_locals = None
+        self._write_lock = threading.Lock()
+    
+    def record(self, node_id: str, env: Union[Dict[str, Any], Callable[[], Dict[str, Any]]]) -> None:
+        """Sample an execution event into the ring buffer."""
+        seq = self.seq
+        self.seq += 1
+        
+        if self.block_pattern is not None and not self.block_pattern.match(node_id):
+            return
+        self._matched += 1
+        if self._matched % self.every:
+            return
+        if self.min_interval:
+            now = time.monotonic()
+            if now - self._last_sample < self.min_interval:
+                return
+            self._last_sample = now
+        
+        self.ring.append(self._make_event(seq, node_id, env))
+    
+    def record_net(self, url: str, headers: Optional[Dict[str, str]], body: Optional[str] = None,
+                   error: Optional[str] = None) -> None:
+        """Sampled recordings hold only recent steps, so network exchanges are not kept."""
+        pass
+    
+    def dump(self) -> int:
+        """
+        Write the buffered events to the output file.
+        
+        Returns:
+            Number of events written
+        """
+        self.fp = self.out_path.open("w", encoding="utf-8")
+        try:
+            while self.ring:
+                self._write(self.ring.popleft())
+        finally:
+            self.fp.close()
+        return self.event_count
+    
+    def on_error(self, error: BaseException) -> None:
+        """Persist the recent history when the recorded run fails."""
+        if self.fp is None and self.ring:
+            self.dump()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_val is not None:
+            self.on_error(exc_val)
+        self.close()
\ No newline at end of file
@@ -1,12 +1,104 @@
 import json
 import pathlib
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from .errors import OriginPkgError
-from .semver import find_highest_compatible_version
+from .semver import SemVer, SemVerRange
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+
+class RegistryIndex:
+    """
+    Per-package version lists of a registry.
+    
+    Maps each package name to its entries as [version, url, dependencies]
+    lists, newest version first; dependencies is None when the registry does
+    not record them, and versions that do not parse come last. Looking up a
+    package reads its own list instead of scanning every registry key.
+    """
+    
+    def __init__(self, packages: Dict[str, List[list]]):
+        self.packages = packages
+        self._parsed: Dict[str, List[Tuple[SemVer, str, str]]] = {}
+    
+    @classmethod
+    def build(cls, registry: Dict[str, Any]) -> 'RegistryIndex':
+        """Build the index with one pass over the registry entries."""
+        packages: Dict[str, List[list]] = {}
+        for key, entry in registry.items():
+            package_name, _, version = key.rpartition("@")
+            if not package_name:
+                continue
+            dependencies = entry.get("dependencies") if isinstance(entry, dict) else None
+            packages.setdefault(package_name, []).append([version, _entry_url(entry), dependencies])
+        for entries in packages.values():
+            entries.sort(key=_version_order, reverse=True)
+        return cls(packages)
+    
+    @classmethod
+    def load(cls, index_path: pathlib.Path, registry_path: pathlib.Path) -> Optional['RegistryIndex']:
+        """Load an index file if it exists and matches the registry it was built from."""
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            source = _source_stamp(registry_path)
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return None
+        if data.get("source") != source:
+            return None
+        return cls(data["packages"])
+    
+    def save(self, index_path: pathlib.Path, registry_path: pathlib.Path) -> None:
+        """Write the index beside the registry."""
+        data = {
+            "version": INDEX_VERSION,
+            "source": _source_stamp(registry_path),
+            "packages": self.packages
+        }
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+    
+    def entry(self, package_name: str, version: str) -> Optional[list]:
+        """Get the [version, url, dependencies] entry of a package version."""
+        for entry in self.packages.get(package_name, ()):
+            if entry[0] == version:
+                return entry
+        return None
+    
+    def versions(self, package_name: str) -> List[Tuple[SemVer, str, str]]:
+        """
+        Get the valid versions of a package, newest first.
+        
+        Returns:
+            (parsed version, version, url) tuples; versions are parsed on first use
+        """
+        parsed = self._parsed.get(package_name)
+        if parsed is None:
+            parsed = []
+            for version, url, _ in self.packages.get(package_name, ()):
+                try:
+                    parsed.append((SemVer.parse(version), version, url))
+                except OriginPkgError:
+                    continue
+            self._parsed[package_name] = parsed
+        return parsed
 
 
 class Registry:
-    """Registry for resolving package aliases to URLs."""
+    """
+    Registry for resolving package aliases to URLs.
+    
+    Each "name@version" key maps to the package's URL, or to an object with
+    the "url" and the package's "dependencies" (name -> range), which lets
+    dependencies be resolved without downloading the package.
+    
+    Lookups go through a RegistryIndex, saved beside registry.json as
+    registry.json.idx and rebuilt when the registry file changes.
+    """
     
     def __init__(self, registry_path: Optional[pathlib.Path] = None):
         """
@@ -21,6 +113,7 @@ class Registry:
         
         self.registry_path = registry_path
         self._cache: Optional[Dict[str, Any]] = None
+        self._index: Optional[RegistryIndex] = None
     
     def _load_registry(self) -> Dict[str, Any]:
         """Load the registry from JSON file."""
@@ -45,6 +138,28 @@ class Registry:
         except Exception as e:
             raise OriginPkgError(f"Failed to load registry {self.registry_path}: {e}")
     
+    def index(self) -> RegistryIndex:
+        """
+        Get the registry's index, loading the saved one if it is up to date.
+        
+        Otherwise the index is built from registry.json and saved for the
+        next process; a registry in a read-only location is indexed in memory.
+        """
+        if self._index is not None:
+            return self._index
+        
+        index_path = self.registry_path.with_name(self.registry_path.name + INDEX_SUFFIX)
+        if self.registry_path.exists():
+            self._index = RegistryIndex.load(index_path, self.registry_path)
+        if self._index is None:
+            self._index = RegistryIndex.build(self._load_registry())
+            if self.registry_path.exists():
+                try:
+                    self._index.save(index_path, self.registry_path)
+                except OSError:
+                    pass
+        return self._index
+    
     def resolve(self, package_name: str, version: str) -> Optional[str]:
         """
         Resolve a package name and version to a URL.
@@ -56,12 +171,9 @@ class Registry:
         Returns:
             URL string if found, None otherwise
         """
-        registry = self._load_registry()
-        
-        # Look for exact match: package_name@version
-        key = f"{package_name}@{version}"
-        if key in registry:
-            return registry[key]
+        entry = self.index().entry(package_name, version)
+        if entry is not None:
+            return entry[1]
         
         return None
     
@@ -76,30 +188,39 @@ class Registry:
         Returns:
             Tuple of (version, url) if found, None otherwise
         """
-        registry = self._load_registry()
-        
-        # Collect all available versions for this package
-        available_versions = []
-        version_urls = {}
+        try:
+            range_obj = SemVerRange(version_range)
+        except OriginPkgError:
+            return None
         
-        for reg_key, url in registry.items():
-            if reg_key.startswith(f"{package_name}@"):
-                # Extract version from key
-                version_part = reg_key[len(f"{package_name}@"):]
-                available_versions.append(version_part)
-                version_urls[version_part] = url
+        # Versions are newest first, so the first match is the highest
+        for version, version_str, url in self.index().versions(package_name):
+            if range_obj.satisfies(version):
+                return version_str, url
         
-        if not available_versions:
-            return None
+        return None
+    
+    def versions(self, package_name: str) -> List[Tuple[str, str]]:
+        """
+        List the registered versions of a package.
         
-        # Find the highest compatible version
-        resolved_version = find_highest_compatible_version(available_versions, version_range)
+        Returns:
+            (version, url) pairs, newest first
+        """
+        return [(version, url) for version, url, _ in self.index().packages.get(package_name, ())]
+    
+    def dependencies(self, package_name: str, version: str) -> Optional[Dict[str, str]]:
+        """
+        Get the dependencies registered for a package version.
         
-        if resolved_version is None:
+        Returns:
+            The dependencies, or None if the registry does not record them
+            (the package's own pkg.json then has to be read)
+        """
+        entry = self.index().entry(package_name, version)
+        if entry is None or entry[2] is None:
             return None
-        
-        url = version_urls[resolved_version]
-        return resolved_version, url
+        return dict(entry[2])
     
     def add_alias(self, alias: str, url: str) -> None:
         """
@@ -120,8 +241,9 @@ class Registry:
             with open(self.registry_path, 'w') as f:
                 json.dump(registry, f, indent=2)
             
-            # Update cache
+            # Update cache; the index is rebuilt on next use
             self._cache = registry
+            self._index = None
             
         except Exception as e:
             raise OriginPkgError(f"Failed to write registry {self.registry_path}: {e}")
@@ -136,6 +258,27 @@ class Registry:
         return self._load_registry().copy()
 
 
+def _entry_url(entry: Any) -> str:
+    """Get the URL of a registry entry, either a URL or an object with a "url"."""
+    if isinstance(entry, dict):
+        return entry.get("url", "")
+    return entry
+
+
+def _version_order(entry: list) -> Tuple:
+    """Sort key for index entries: by version, with unparsable versions lowest."""
+    try:
+        return (1, SemVer.parse(entry[0]).sort_key)
+    except OriginPkgError:
+        return (0, entry[0])
+
+
+def _source_stamp(registry_path: pathlib.Path) -> List[int]:
+    """Identify a registry file's contents cheaply by size and modification time."""
+    stat = registry_path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
 def parse_package_spec(spec: str) -> tuple[str, Optional[str]]:
     """
     Parse a package specification string.
@@ -0,0 +1,229 @@
+import bisect
+import json
+import pathlib
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .diff import changed_keys
+from .replayer import Replayer
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+# Sentinel for variables that are not defined at an event
+_MISSING = object()
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+class RecordingIndex:
+    """
+    Inverted index over a recording.
+    
+    Maps each variable to the sorted event indices where its value changed
+    (including where it first appeared or disappeared), and each block id to
+    the event indices where it executed.
+    """
+    
+    def __init__(self, changes: Dict[str, List[int]], blocks: Dict[str, List[int]], total_events: int):
+        self.changes = changes
+        self.blocks = blocks
+        self.total_events = total_events
+    
+    @classmethod
+    def build(cls, replayer: Replayer) -> 'RecordingIndex':
+        """
+        Build the index with one pass over the recording.
+        
+        Uses the change sets stored in the recording where present and only
+        compares environments for events recorded without them.
+        """
+        changes: Dict[str, List[int]] = {}
+        blocks: Dict[str, List[int]] = {}
+        previous: Dict[str, Any] = {}
+        
+        for index in range(len(replayer.events)):
+            env = replayer.env_at(index) or {}
+            variables = env.get("variables", {})
+            keys = replayer.changed_keys(index)
+            if keys is None:
+                keys = changed_keys(previous, variables)
+            for name in keys:
+                changes.setdefault(name, []).append(index)
+            previous = variables
+            
+            block_id = replayer.block_id_at(index)
+            if block_id is not None:
+                blocks.setdefault(block_id, []).append(index)
+        
+        return cls(changes, blocks, len(replayer.events))
+    
+    @classmethod
+    def for_recording(cls, recording_path: pathlib.Path, replayer: Replayer) -> 'RecordingIndex':
+        """
+        Load the index stored beside a recording, rebuilding it if it is missing or stale.
+        
+        Args:
+            recording_path: The .orirec file the replayer was fully loaded from
+            replayer: Replayer holding every event of the recording
+        """
+        index_path = index_path_for(recording_path)
+        index = cls.load(index_path, recording_path)
+        if index is not None and index.total_events == len(replayer.events):
+            return index
+        
+        index = cls.build(replayer)
+        try:
+            index.save(index_path, recording_path)
+        except OSError:
+            pass  # Read-only location; the in-memory index still works
+        return index
+    
+    @classmethod
+    def load(cls, index_path: pathlib.Path, recording_path: pathlib.Path) -> Optional['RecordingIndex']:
+        """Load an index file if it exists and matches the recording it was built from."""
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return None
+        if data.get("source") != _source_stamp(recording_path):
+            return None
+        return cls(data["changes"], data["blocks"], data["total_events"])
+    
+    def save(self, index_path: pathlib.Path, recording_path: pathlib.Path) -> None:
+        """Write the index beside the recording."""
+        data = {
+            "version": INDEX_VERSION,
+            "source": _source_stamp(recording_path),
+            "total_events": self.total_events,
+            "changes": self.changes,
+            "blocks": self.blocks
+        }
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+    
+    def changes_of(self, name: str) -> List[int]:
+        """Get the event indices where a variable changed."""
+        return self.changes.get(name, [])
+    
+    def next_change(self, name: str, after: int) -> Optional[int]:
+        """Get the first event after ``after`` where a variable changed."""
+        indices = self.changes_of(name)
+        position = bisect.bisect_right(indices, after)
+        return indices[position] if position < len(indices) else None
+    
+    def events_for_block(self, block_id: str) -> List[int]:
+        """Get the event indices where a block executed."""
+        return self.blocks.get(block_id, [])
+
+
+def index_path_for(recording_path: pathlib.Path) -> pathlib.Path:
+    """Get the path of the index stored beside a recording."""
+    return recording_path.with_name(recording_path.name + INDEX_SUFFIX)
+
+
+def _source_stamp(recording_path: pathlib.Path) -> List[int]:
+    """Identify a recording's contents cheaply by size and modification time."""
+    stat = recording_path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class RecordingQuery:
+    """
+    A query over a recording.
+    
+    Supported forms:
+        x > 100          events where x changed to a value matching the comparison
+        var=x            events where x changed
+        x changed        same as var=x
+        block=LetNode:x  events where a block executed
+    
+    Comparison operators are ==, !=, <, <=, > and >=. The right-hand side is
+    parsed as JSON, falling back to a bare string.
+    """
+    
+    def __init__(self, kind: str, name: str, op: Optional[str] = None, value: Any = None):
+        self.kind = kind
+        self.name = name
+        self.op = op
+        self.value = value
+    
+    @classmethod
+    def parse(cls, text: str) -> 'RecordingQuery':
+        """Parse a query string, raising ValueError if it is malformed."""
+        text = text.strip()
+        
+        match = re.fullmatch(r'(var|block)\s*=\s*(.+)', text)
+        if match:
+            return cls(match.group(1), match.group(2).strip())
+        
+        match = re.fullmatch(r'(\w+)\s+changed', text)
+        if match:
+            return cls('var', match.group(1))
+        
+        match = re.fullmatch(r'(\w+)\s*(==|!=|<=|>=|<|>)\s*(.+)', text)
+        if match:
+            return cls('compare', match.group(1), match.group(2), _parse_literal(match.group(3)))
+        
+        raise ValueError(f"Invalid query '{text}': use 'x > 100', 'var=x', 'x changed' or 'block=<id>'")
+    
+    def run(self, replayer: Replayer, index: RecordingIndex, limit: Optional[int] = None) -> List[Tuple[int, Any]]:
+        """
+        Find matching events.
+        
+        Only events listed in the index are inspected, so the cost depends on how
+        often the variable changed rather than on the length of the recording.
+        
+        Returns:
+            List of (event index, variable value) pairs; the value is None for block queries
+        """
+        results: List[Tuple[int, Any]] = []
+        if self.kind == 'block':
+            candidates = index.events_for_block(self.name)
+        else:
+            candidates = index.changes_of(self.name)
+        
+        for event_index in candidates:
+            value = None
+            if self.kind != 'block':
+                env = replayer.env_at(event_index) or {}
+                value = env.get("variables", {}).get(self.name, _MISSING)
+                if self.kind == 'compare' and not self._matches(value):
+                    continue
+                if value is _MISSING:
+                    value = None
+            results.append((event_index, value))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+    
+    def _matches(self, value: Any) -> bool:
+        """Apply the comparison, treating undefined or incomparable values as non-matching."""
+        if value is _MISSING:
+            return False
+        try:
+            return bool(_COMPARISONS[self.op](value, self.value))
+        except TypeError:
+            return False
+
+
+def _parse_literal(text: str) -> Any:
+    """Parse the right-hand side of a comparison."""
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+            return text[1:-1]
+        return text
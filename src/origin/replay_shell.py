@@ -1,16 +1,41 @@
+import pathlib
 import sys
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 from .replayer import Replayer
-from .diff import compute_diff, format_diff
+from .replay_index import RecordingIndex, RecordingQuery
+from .diff import changed_keys, format_diff, truncate_value
+
+MAX_FIND_RESULTS = 20
+DISPLAY_CACHE_SIZE = 10000  # Truncated values kept for redisplay
 
 class ReplayShell:
     """Interactive shell for replaying recorded execution events."""
     
-    def __init__(self, replayer: Replayer):
-        """Initialize the replay shell with a replayer."""
+    def __init__(self, replayer: Replayer, recording_path: Optional[pathlib.Path] = None):
+        """
+        Initialize the replay shell with a replayer.
+        
+        Args:
+            replayer: Replayer to step through
+            recording_path: File the replayer was fully loaded from; its search
+                            index is stored beside it. Omit for partial loads.
+        """
         self.replayer = replayer
-        self.previous_env: Optional[dict] = None
+        self.recording_path = recording_path
+        self.previous_index: Optional[int] = None
+        self._index: Optional[RecordingIndex] = None
+        self._display_cache: Dict[Tuple[int, str], Any] = {}
+    
+    @property
+    def index(self) -> RecordingIndex:
+        """Search index, loaded or built on first use."""
+        if self._index is None:
+            if self.recording_path is not None:
+                self._index = RecordingIndex.for_recording(self.recording_path, self.replayer)
+            else:
+                self._index = RecordingIndex.build(self.replayer)
+        return self._index
     
     def display_current_state(self) -> None:
         """Display current event information and changes."""
@@ -20,21 +45,54 @@ class ReplayShell:
             return
         
         info = self.replayer.get_info()
-        print(f"\n[{info['current_index'] + 1}/{info['total_events']}] {event['id']}")
+        print(f"\n[{info['current_index'] + 1}/{info['total_events']}] {self.replayer.block_id_at(info['current_index'])}")
         
-        # Show changes if we have a previous environment
-        if self.previous_env is not None:
-            current_env = self.replayer.current_env()
-            if current_env:
-                changes = compute_diff(self.previous_env, current_env)
-                if changes:
-                    print("Changes:")
-                    print(format_diff(changes))
-                else:
-                    print("No changes")
+        # Show changes if we have a previous event
+        current_index = info['current_index']
+        if self.previous_index is not None:
+            changes = self.compute_changes(self.previous_index, current_index)
+            if changes:
+                print("Changes:")
+                print(format_diff(changes))
+            else:
+                print("No changes")
         
-        # Update previous environment for next comparison
-        self.previous_env = self.replayer.current_env()
+        # Remember this event for the next comparison
+        self.previous_index = current_index
+    
+    def compute_changes(self, old_index: int, new_index: int) -> Dict[str, Tuple[Any, Any]]:
+        """
+        Compute the display diff between two events.
+        
+        Adjacent events use the change set stored in the recording, so stepping
+        costs O(changed variables); other jumps compare the two environments.
+        """
+        old_vars = (self.replayer.env_at(old_index) or {}).get("variables", {})
+        new_vars = (self.replayer.env_at(new_index) or {}).get("variables", {})
+        
+        keys = None
+        if abs(new_index - old_index) == 1:
+            keys = self.replayer.changed_keys(max(old_index, new_index))
+        if keys is None:
+            keys = changed_keys(old_vars, new_vars)
+        
+        changes = {}
+        for key in keys:
+            old_value = old_vars.get(key)
+            new_value = new_vars.get(key)
+            if old_value != new_value:
+                changes[key] = (self._display_value(old_index, key, old_value),
+                                self._display_value(new_index, key, new_value))
+        return changes
+    
+    def _display_value(self, event_index: int, key: str, value: Any) -> Any:
+        """Get the truncated display form of a variable at an event, cached across steps."""
+        cache_key = (event_index, key)
+        if cache_key not in self._display_cache:
+            if len(self._display_cache) >= DISPLAY_CACHE_SIZE:
+                self._display_cache.clear()
+            self._display_cache[cache_key] = truncate_value(value)
+        return self._display_cache[cache_key]
     
     def show_help(self) -> None:
         """Display help information."""
@@ -43,6 +101,8 @@ class ReplayShell:
         print("  (n)ext    - Go to next event")
         print("  (p)rev    - Go to previous event")
         print("  (g)o <k>  - Jump to event k (0-based)")
+        print("  find <q>  - List events matching a query: var=x, x > 100, block=<id>")
+        print("  when <x> changed - Jump to the next event where x changed")
         print("  (q)uit    - Exit replay")
         print("  (h)elp    - Show this help")
     
@@ -60,6 +120,40 @@ class ReplayShell:
             print("Invalid index. Use: g <number>")
             return False
     
+    def handle_find(self, args: str) -> None:
+        """Handle find command with a query."""
+        try:
+            query = RecordingQuery.parse(args)
+        except ValueError as e:
+            print(e)
+            return
+        
+        results = query.run(self.replayer, self.index, limit=MAX_FIND_RESULTS + 1)
+        if not results:
+            print("No matching events")
+            return
+        for event_index, value in results[:MAX_FIND_RESULTS]:
+            block_id = self.replayer.block_id_at(event_index)
+            if query.kind == 'block':
+                print(f"  {event_index}: {block_id}")
+            else:
+                print(f"  {event_index}: {block_id}  {query.name} = {value!r}")
+        if len(results) > MAX_FIND_RESULTS:
+            print(f"  ... (showing first {MAX_FIND_RESULTS})")
+    
+    def handle_when(self, args: str) -> bool:
+        """Handle 'when <x> changed' by jumping to the next change of x."""
+        parts = args.split()
+        if len(parts) != 2 or parts[1] != 'changed':
+            print("Usage: when <variable> changed")
+            return False
+        
+        event_index = self.index.next_change(parts[0], self.replayer.current_index)
+        if event_index is None:
+            print(f"{parts[0]} does not change after this event")
+            return False
+        return self.replayer.goto(event_index) is not None
+    
     def run(self) -> None:
         """Run the interactive replay shell."""
         print("Origin Replay Shell")
@@ -71,7 +165,8 @@ class ReplayShell:
         
         while True:
             try:
-                command = input("\n(r)un (n)ext (p)rev (g)o <k> (q)uit: ").strip().lower()
+                raw_command = input("\n(r)un (n)ext (p)rev (g)o <k> find <q> (q)uit: ").strip()
+                command = raw_command.lower()
                 
                 if not command:
                     continue
@@ -110,6 +205,13 @@ class ReplayShell:
                     if self.handle_goto(command[3:]):
                         self.display_current_state()
                 
+                elif command.startswith('find '):
+                    self.handle_find(raw_command[5:])
+                
+                elif command.startswith('when '):
+                    if self.handle_when(raw_command[5:]):
+                        self.display_current_state()
+                
                 else:
                     print("Unknown command. Type 'h' for help.")
             
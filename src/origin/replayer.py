@@ -1,39 +1,77 @@
+import bisect
 import json
 import pathlib
 from typing import Any, Dict, List, Optional, Tuple
 
+from .utils import EventSlice
+
+# v3 lines start with these (json.dumps keeps key order), so checkpoints can be
+# spotted without decoding lines outside a slice
+V3_PREFIX = '{"version": "v3"'
+CHECKPOINT_PREFIX = '{"version": "v3", "checkpoint": true'
+
+# Recorded http_get exchanges; these lines are not steps
+NET_PREFIX = '{"kind": "net"'
+
 class Replayer:
     """Replays execution events from a .orirec file for debugging."""
     
-    def __init__(self, events: List[Dict[str, Any]]):
-        """Initialize replayer with a list of events."""
+    def __init__(self, events: List[Dict[str, Any]], net_events: Optional[List[Dict[str, Any]]] = None):
+        """Initialize replayer with a list of events and the network exchanges recorded with them."""
         self.events = events
+        self.net_events = net_events or []
         self.current_index = -1  # Start before first event
         self._validate_events()
+        # v3 recordings store deltas; state is rebuilt from the nearest checkpoint
+        self._checkpoints = [i for i, event in enumerate(events) if _is_checkpoint(event)]
+        self._state: Optional[Tuple[int, Dict[str, Any], List[str]]] = None  # Last rebuilt event
         if len(self.events) > 1_000_000:
-            print(f"Warning: Large recording with {len(self.events)} events. Consider using --slice flag in future.")
+            print(f"Warning: Large recording with {len(self.events)} events. Consider loading a range with --slice START:END.")
     
     @classmethod
-    def from_file(cls, file_path: pathlib.Path) -> 'Replayer':
-        """Load events from a .orirec file."""
+    def from_file(cls, file_path: pathlib.Path, event_slice: Optional[EventSlice] = None) -> 'Replayer':
+        """
+        Load events from a .orirec file.
+        
+        Args:
+            file_path: Recording file to load
+            event_slice: Optional window of events to load; index slices skip
+                         decoding of lines outside the window. For v3 recordings
+                         the first loaded event is rebuilt into a checkpoint.
+        
+        Network exchanges (``"kind": "net"`` lines) are kept apart from the
+        steps in ``net_events`` and do not count towards event indices.
+        """
         events = []
+        net_lines: List[str] = []
+        pending: List[str] = []  # v3 lines since the last checkpoint before the window
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
+                for line_num, index, line in _iter_event_lines(f, net_lines):
+                    if event_slice is not None:
+                        if event_slice.is_past(index):
+                            break
+                        if not event_slice.by_block and not event_slice.contains(index, None):
+                            _track_checkpoint(pending, line)
+                            continue
                     try:
                         event = json.loads(line)
-                        events.append(event)
                     except json.JSONDecodeError as e:
                         raise ValueError(f"Malformed JSON at line {line_num}: {e}")
+                    if event_slice is not None and event_slice.by_block:
+                        if not event_slice.contains(index, _block_id(event)):
+                            _track_checkpoint(pending, line)
+                            continue
+                    if not events and pending:
+                        event = _rebase(pending, event)
+                    events.append(event)
+            net_events = [json.loads(line) for line in net_lines]
         except FileNotFoundError:
             raise FileNotFoundError(f"Recording file not found: {file_path}")
         except Exception as e:
             raise ValueError(f"Error reading recording file: {e}")
         
-        return cls(events)
+        return cls(events, net_events)
     
     def _validate_events(self) -> None:
         """Validate that events have required fields."""
@@ -47,6 +85,12 @@ class Replayer:
                 missing_fields = [field for field in required_fields if field not in event]
                 if missing_fields:
                     raise ValueError(f"Event {i} missing required v2 fields: {missing_fields}")
+            elif event.get("version") == "v3":
+                required_fields = ['version', 'ts', 'blockId']
+                required_fields += ['locals', 'globals'] if event.get("checkpoint") else ['changed', 'delta']
+                missing_fields = [field for field in required_fields if field not in event]
+                if missing_fields:
+                    raise ValueError(f"Event {i} missing required v3 fields: {missing_fields}")
             else:
                 # Fallback to old format for backward compatibility
                 required_fields = ['id', 'ts', 'env', 'event_num']
@@ -77,19 +121,85 @@ class Replayer:
     
     def current_env(self) -> Optional[Dict[str, Any]]:
         """Get environment of current event."""
-        if 0 <= self.current_index < len(self.events):
-            event = self.events[self.current_index]
+        return self.env_at(self.current_index)
+    
+    def env_at(self, index: int) -> Optional[Dict[str, Any]]:
+        """Get environment of the event at ``index``."""
+        if 0 <= index < len(self.events):
+            event = self.events[index]
             # Handle v2 format
             if "version" in event and event["version"] == "v2":
                 return {
                     "variables": event.get("locals", {}),
                     "functions": event.get("globals", {}).get("functions", [])
                 }
+            elif event.get("version") == "v3":
+                variables, functions = self._rebuild(index)
+                return {"variables": variables, "functions": functions}
             else:
                 # Fallback to old format
                 return event.get("env", {})
         return None
     
+    def _rebuild(self, index: int) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Rebuild the state at a v3 event from the nearest checkpoint at or before it.
+        
+        Stepping forward continues from the last rebuilt event, so sequential
+        access costs one delta per step; jumps cost at most one checkpoint
+        interval of deltas.
+        """
+        position = bisect.bisect_right(self._checkpoints, index) - 1
+        start = self._checkpoints[position] if position >= 0 else 0
+        
+        if self._state is not None and start <= self._state[0] <= index:
+            last, variables, functions = self._state
+            start = last + 1
+        else:
+            variables, functions = {}, []
+        
+        for i in range(start, index + 1):
+            variables, functions = _apply_event(variables, functions, self.events[i])
+        self._state = (index, variables, functions)
+        return variables, functions
+    
+    def resume_point(self, index: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find the checkpoint to resume live execution from.
+        
+        Args:
+            index: Latest event to resume at; defaults to the last event
+        
+        Returns:
+            The last checkpoint at or before ``index`` that recorded a top-level
+            position, or None if there is none
+        """
+        if index is None:
+            index = len(self.events) - 1
+        position = bisect.bisect_right(self._checkpoints, index)
+        for checkpoint in reversed(self._checkpoints[:position]):
+            if "position" in self.events[checkpoint]:
+                return self.events[checkpoint]
+        return None
+    
+    def changed_keys(self, index: int) -> Optional[List[str]]:
+        """
+        Get the variables that changed between event ``index - 1`` and ``index``.
+        
+        Returns:
+            The change set recorded with the event, or None if it is unknown
+            (first loaded event, or a recording made without change sets)
+        """
+        if 0 < index < len(self.events):
+            return self.events[index].get("changed")
+        return None
+    
+    def block_id_at(self, index: int) -> Optional[str]:
+        """Get the block id of the event at ``index``."""
+        if 0 <= index < len(self.events):
+            return _block_id(self.events[index])
+        return None
+    
     def current_event(self) -> Optional[Dict[str, Any]]:
         """Get current event."""
         if 0 <= self.current_index < len(self.events):
@@ -108,4 +218,126 @@ class Replayer:
     def run(self) -> None:
         """Run through all remaining events."""
         while self.next():
-            pass 
\ No newline at end of file
+            pass
+
+
+def _iter_event_lines(f, net_lines: Optional[List[str]] = None):
+    """
+    Yield (line number, event index, stripped line) for each step.
+    
+    Network exchange lines are skipped, or collected into ``net_lines`` if given.
+    """
+    index = 0
+    for line_num, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(NET_PREFIX):
+            if net_lines is not None:
+                net_lines.append(line)
+            continue
+        yield line_num, index, line
+        index += 1
+
+
+def _is_checkpoint(event: Dict[str, Any]) -> bool:
+    """Check whether an event is a v3 checkpoint."""
+    return isinstance(event, dict) and event.get("version") == "v3" and bool(event.get("checkpoint"))
+
+
+def _apply_event(variables: Dict[str, Any], functions: List[str],
+                 event: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """Apply a v3 event to the state before it, returning a new state."""
+    if event.get("checkpoint"):
+        return dict(event["locals"]), event["globals"].get("functions", [])
+    
+    variables = dict(variables)
+    delta = event["delta"]
+    for key in event["changed"]:
+        if key in delta:
+            variables[key] = delta[key]
+        else:
+            variables.pop(key, None)
+    if "globals" in event:
+        functions = event["globals"].get("functions", [])
+    return variables, functions
+
+
+def _track_checkpoint(pending: List[str], line: str) -> None:
+    """Keep the v3 lines since the most recent checkpoint outside a slice."""
+    if line.startswith(CHECKPOINT_PREFIX):
+        pending.clear()
+        pending.append(line)
+    elif pending and line.startswith(V3_PREFIX):
+        pending.append(line)
+
+
+def _rebase(pending: List[str], event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn the first event of a slice into a checkpoint.
+    
+    Replays the checkpoint and deltas that precede the slice so the loaded
+    events do not depend on events outside it.
+    """
+    if event.get("version") != "v3" or event.get("checkpoint"):
+        return event
+    
+    variables, functions = {}, []
+    for line in pending:
+        variables, functions = _apply_event(variables, functions, json.loads(line))
+    variables, functions = _apply_event(variables, functions, event)
+    
+    # "checkpoint" goes right after "version" so the line matches CHECKPOINT_PREFIX
+    rebased = {"version": "v3", "checkpoint": True}
+    rebased.update((key, value) for key, value in event.items() if key not in ("version", "delta", "globals"))
+    rebased.update({"locals": variables, "globals": {"functions": functions}})
+    return rebased
+
+
+def _block_id(event: Dict[str, Any]) -> Optional[str]:
+    """Get the block id of an event in either recording format."""
+    if isinstance(event, dict):
+        return event.get("blockId", event.get("id"))
+    return None
+
+
+def extract_recording(src_path: pathlib.Path, dest_path: pathlib.Path, event_slice: EventSlice) -> int:
+    """
+    Write the events of a recording that fall inside a slice to a new recording.
+    
+    Lines are copied verbatim, so extracted events keep their original ``seq``.
+    Network exchanges are not copied.
+    The exception is a v3 slice starting between checkpoints, whose first event
+    is rewritten as a checkpoint so the sub-recording stands on its own.
+    
+    Args:
+        src_path: Recording to read
+        dest_path: Sub-recording to write
+        event_slice: Window of events to keep
+    
+    Returns:
+        Number of events written
+    """
+    if not src_path.exists():
+        raise FileNotFoundError(f"Recording file not found: {src_path}")
+    
+    count = 0
+    pending: List[str] = []
+    with open(src_path, 'r', encoding='utf-8') as src, open(dest_path, 'w', encoding='utf-8') as dest:
+        for line_num, index, line in _iter_event_lines(src):
+            if event_slice.is_past(index):
+                break
+            block_id = None
+            if event_slice.by_block:
+                try:
+                    block_id = _block_id(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Malformed JSON at line {line_num}: {e}")
+            if event_slice.contains(index, block_id):
+                if count == 0 and pending and not line.startswith(CHECKPOINT_PREFIX):
+                    line = json.dumps(_rebase(pending, json.loads(line)))
+                dest.write(line + "\n")
+                count += 1
+            else:
+                _track_checkpoint(pending, line)
+    return count
\ No newline at end of file
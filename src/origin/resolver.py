@@ -0,0 +1,274 @@
+import heapq
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from .errors import OriginPkgError
+from .semver import SemVer, VersionSet
+
+# (range, name of the requiring package or None for the project, requirer label)
+Requirement = Tuple[str, Optional[str], str]
+
+# (parsed version, version string, url)
+Candidate = Tuple[SemVer, str, str]
+
+
+class ResolutionError(OriginPkgError):
+    """Raised when no set of versions satisfies every requirement."""
+    pass
+
+
+@dataclass
+class ResolvedPackage:
+    """A package version chosen by the resolver."""
+    name: str
+    version: str
+    url: str
+    dependencies: Dict[str, str] = field(default_factory=dict)
+
+
+class _Decision:
+    """A package whose version the resolver has chosen, and the candidates left to try."""
+    __slots__ = ("name", "candidates", "index", "added", "conflict", "reasons")
+    
+    def __init__(self, name: str, candidates: List[Candidate]):
+        self.name = name
+        self.candidates = candidates
+        self.index = 0
+        self.added: List[str] = []  # Packages the chosen version added requirements to
+        self.conflict: Set[str] = set()  # Decisions that caused candidates to be rejected
+        self.reasons: List[str] = []
+    
+    @property
+    def candidate(self) -> Candidate:
+        return self.candidates[self.index]
+
+
+class Resolver:
+    """
+    Resolves a project's dependencies and their transitive dependencies.
+    
+    Packages are decided one at a time, in the order they are first required,
+    trying the newest version satisfying every requirement on the package
+    first (a locked version is tried before that). Choosing a version adds its
+    own dependencies as requirements, checking them straight away against the
+    versions already chosen and the versions available.
+    
+    When a package runs out of candidates, the resolver backjumps to the most
+    recent decision that contributed to the conflict instead of retrying every
+    decision in between, and the requirements involved are collected into the
+    explanation raised if no solution exists.
+    
+    Version lists, dependencies, parsed ranges and the candidates matching a
+    set of requirements are memoized, so each registry entry and manifest is
+    read once per resolution.
+    """
+    
+    def __init__(self, versions: Callable[[str], List[Tuple[str, str]]],
+                 dependencies: Callable[[str, str, str], Dict[str, str]],
+                 preferred: Optional[Dict[str, str]] = None):
+        """
+        Initialize the resolver.
+        
+        Args:
+            versions: Gets the (version, url) pairs available for a package
+            dependencies: Gets the dependencies of a package version, given its
+                          name, version and url
+            preferred: Versions to try first when they satisfy the requirements,
+                       such as those in origin.lock
+        """
+        self._get_versions = versions
+        self._get_dependencies = dependencies
+        self.preferred = preferred or {}
+        self._versions: Dict[str, List[Candidate]] = {}
+        self._dependencies: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._ranges: Dict[str, VersionSet] = {}
+        self._candidates: Dict[Tuple[str, FrozenSet[str]], List[Candidate]] = {}
+        self.decisions = 0
+        self.backjumps = 0
+    
+    def resolve(self, requirements: Dict[str, str], root: str = "pkg.json") -> Dict[str, ResolvedPackage]:
+        """
+        Choose a version of every package the project needs.
+        
+        Args:
+            requirements: The project's dependencies (name -> range)
+            root: Name of the project in explanations
+        
+        Returns:
+            The chosen packages by name
+        
+        Raises:
+            ResolutionError: If no versions satisfy every requirement, explaining why
+        """
+        unresolved = [f"{name}@{version_range}" for name, version_range in sorted(requirements.items())
+                      if not self._matching(name, (version_range,))]
+        if unresolved:
+            raise ResolutionError(f"No version satisfies {', '.join(unresolved)}")
+        
+        requires: Dict[str, List[Requirement]] = {}
+        selected: Dict[str, Candidate] = {}
+        order: Dict[str, int] = {}
+        pending: List[Tuple[int, str]] = []
+        decisions: List[_Decision] = []
+        
+        def require(name: str, version_range: str, requirer: Optional[str], label: str) -> None:
+            requires.setdefault(name, []).append((version_range, requirer, label))
+            if name not in order:
+                order[name] = len(order)
+            if name not in selected:
+                heapq.heappush(pending, (order[name], name))
+        
+        def next_pending() -> Optional[str]:
+            while pending:
+                _, name = heapq.heappop(pending)
+                if name not in selected and requires.get(name):
+                    return name
+            return None
+        
+        def ranges(name: str) -> Tuple[str, ...]:
+            return tuple(version_range for version_range, _, _ in requires.get(name, ()))
+        
+        def requirers(name: str) -> Set[str]:
+            return {requirer for _, requirer, _ in requires.get(name, ()) if requirer is not None}
+        
+        def describe(name: str) -> str:
+            return " and ".join(f"{version_range} (required by {label})"
+                                for version_range, _, label in requires.get(name, ()))
+        
+        def choose(decision: _Decision) -> bool:
+            """Select the first remaining candidate whose dependencies can still be met."""
+            name = decision.name
+            while decision.index < len(decision.candidates):
+                _, version, url = decision.candidate
+                label = f"{name}@{version}"
+                dependencies = self._dependencies_of(name, version, url)
+                rejected = None
+                for dep, version_range in dependencies.items():
+                    if dep == name:
+                        continue
+                    if dep in selected:
+                        if not self._satisfies(version_range, selected[dep][0]):
+                            dep_version = selected[dep][1]
+                            rejected = ({dep}, f"{label} requires {dep} {version_range}, "
+                                               f"but {dep}@{dep_version} was chosen for {describe(dep)}")
+                            break
+                    elif not self._matching(dep, ranges(dep) + (version_range,)):
+                        others = describe(dep)
+                        rejected = (requirers(dep), f"{label} requires {dep} {version_range}, but no version "
+                                                    f"of {dep} matches" + (f" that and {others}" if others else ""))
+                        break
+                if rejected is not None:
+                    decision.conflict |= rejected[0]
+                    decision.reasons.append(rejected[1])
+                    decision.index += 1
+                    continue
+                
+                selected[name] = decision.candidate
+                for dep, version_range in dependencies.items():
+                    if dep != name:
+                        require(dep, version_range, name, label)
+                        decision.added.append(dep)
+                self.decisions += 1
+                return True
+            return False
+        
+        def undo(decision: _Decision) -> None:
+            """Unselect a decision's version and drop the requirements it added."""
+            for dep in reversed(decision.added):
+                requires[dep].pop()
+            decision.added = []
+            selected.pop(decision.name, None)
+            heapq.heappush(pending, (order[decision.name], decision.name))
+        
+        for name, version_range in requirements.items():
+            require(name, version_range, None, root)
+        
+        name = next_pending()
+        while name is not None:
+            decision = _Decision(name, self._matching(name, ranges(name)))
+            decisions.append(decision)
+            while not choose(decision):
+                # Every candidate failed: jump back to the latest decision involved
+                conflict = decision.conflict | requirers(decision.name)
+                explanation = f"no version of {decision.name} satisfies {describe(decision.name)}"
+                if decision.reasons:
+                    explanation += ":\n" + "\n".join(f"  {reason}" for reason in decision.reasons)
+                decisions.pop()
+                heapq.heappush(pending, (order[decision.name], decision.name))
+                while decisions and decisions[-1].name not in conflict:
+                    undo(decisions.pop())
+                if not decisions:
+                    raise ResolutionError("Cannot resolve dependencies: " + explanation)
+                
+                self.backjumps += 1
+                decision = decisions[-1]
+                undo(decision)
+                decision.conflict |= conflict - {decision.name}
+                _, version, _ = decision.candidate
+                decision.reasons.append(f"{decision.name}@{version} leads to a conflict: "
+                                        + explanation.replace("\n", "\n  "))
+                decision.index += 1
+            name = next_pending()
+        
+        return {
+            name: ResolvedPackage(name, version, url, self._dependencies_of(name, version, url))
+            for name, (_, version, url) in selected.items()
+        }
+    
+    def _versions_of(self, name: str) -> List[Candidate]:
+        """Get a package's versions, newest first."""
+        versions = self._versions.get(name)
+        if versions is None:
+            versions = []
+            for version, url in self._get_versions(name):
+                try:
+                    versions.append((SemVer.parse(version), version, url))
+                except OriginPkgError:
+                    continue  # Unparsable versions can never be chosen
+            versions.sort(key=lambda candidate: candidate[0].sort_key, reverse=True)
+            self._versions[name] = versions
+        return versions
+    
+    def _dependencies_of(self, name: str, version: str, url: str) -> Dict[str, str]:
+        """Get the dependencies of a package version."""
+        key = (name, version)
+        dependencies = self._dependencies.get(key)
+        if dependencies is None:
+            dependencies = dict(self._get_dependencies(name, version, url) or {})
+            self._dependencies[key] = dependencies
+        return dependencies
+    
+    def _range(self, version_range: str) -> VersionSet:
+        """Get the versions a range matches; invalid ranges match nothing."""
+        versions = self._ranges.get(version_range)
+        if versions is None:
+            try:
+                versions = VersionSet.from_range(version_range)
+            except (OriginPkgError, ValueError):
+                versions = VersionSet()
+            self._ranges[version_range] = versions
+        return versions
+    
+    def _satisfies(self, version_range: str, version: SemVer) -> bool:
+        return self._range(version_range).contains(version)
+    
+    def _matching(self, name: str, ranges: Tuple[str, ...]) -> List[Candidate]:
+        """Get the versions of a package satisfying every range, in the order to try them."""
+        key = (name, frozenset(ranges))
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            # Conflicting ranges are caught from their bounds, without listing versions
+            allowed = VersionSet.any()
+            for version_range in key[1]:
+                allowed = allowed.intersect(self._range(version_range))
+            if allowed.is_empty():
+                candidates = []
+            else:
+                candidates = [candidate for candidate in self._versions_of(name) if allowed.contains(candidate[0])]
+            preferred = self.preferred.get(name)
+            for index, candidate in enumerate(candidates):
+                if candidate[1] == preferred:
+                    candidates = [candidate] + candidates[:index] + candidates[index + 1:]
+                    break
+            self._candidates[key] = candidates
+        return candidates
@@ -27,6 +27,7 @@ class EvaluatorVisitor(ASTVisitor):
         self.node_counts = {}  # For profiling
         self.base_path = None
         self.files_allowed = True
+        self.http = None  # Pooled HTTPClient, set by the owning Evaluator
         self.global_loaded_modules = set()
         self._attr_cache = {}  # Attribute lookup cache for tight loops
     
@@ -35,7 +36,7 @@ class EvaluatorVisitor(ASTVisitor):
         if self.recorder:
             node_type = type(node).__name__
             node_id = f"{node_type}:{id(node)}"
-            env = {
+            env = lambda: {
                 "variables": self.variables.copy(),
                 "functions": list(self.functions.keys()),
                 "node_type": node_type
@@ -127,6 +128,12 @@ class EvaluatorVisitor(ASTVisitor):
         self._increment_node_count("FunctionCallNode")
         self._record_execution(node)
         
+        # parallel takes a function by name, so its first argument is not evaluated
+        if node.name == 'parallel':
+            return self._parallel(node)
+        if node.name == 'http_get_json':
+            return self._http_get_json(node)
+        
         # Evaluate arguments
         args = [arg.accept(self) for arg in node.arguments]
         
@@ -135,7 +142,23 @@ class EvaluatorVisitor(ASTVisitor):
             if not self.net_allowed:
                 raise OriginError("Network access not permitted — run with --allow-net")
             from ..runtime.net import safe_http_get
-            return safe_http_get(*args)
+            return safe_http_get(*args, client=self.http)
+        elif node.name == 'http_get_many':
+            if not self.net_allowed:
+                raise OriginError("Network access not permitted — run with --allow-net")
+            from ..runtime.net import http_get_many
+            return http_get_many(*args, client=self.http)
+        elif node.name == 'http_get_async':
+            if not self.net_allowed:
+                raise OriginError("Network access not permitted — run with --allow-net")
+            from ..runtime.net import http_get_async
+            return http_get_async(*args, client=self.http)
+        elif node.name in ('await', '_AWAIT_'):
+            from ..runtime.net import await_http
+            return await_http(*args)
+        elif node.name == 'await_all':
+            from ..runtime.net import await_all
+            return await_all(*args)
         elif node.name == '_PLUS_':
             # Custom plus function for string/numeric concatenation
             if len(args) != 2:
@@ -149,24 +172,7 @@ class EvaluatorVisitor(ASTVisitor):
         
         # Handle user-defined functions
         if node.name in self.functions:
-            func = self.functions[node.name]
-            if len(args) != len(func['params']):
-                raise OriginError(f"function '{node.name}' expects {len(func['params'])} arguments, got {len(args)}")
-            
-            # Create local environment
-            local_vars = self.variables.copy()
-            for param, arg in zip(func['params'], args):
-                local_vars[param] = arg
-            
-            # Create new visitor for function execution
-            func_visitor = EvaluatorVisitor(local_vars, self.functions, self.recorder, self.net_allowed)
-            func_visitor.base_path = self.base_path
-            func_visitor.files_allowed = self.files_allowed
-            
-            result = None
-            for stmt in func['body']:
-                result = stmt.accept(func_visitor)
-            return result
+            return self._call_function(node.name, args)
         
         # Handle JSON object
         if node.name == 'json':
@@ -185,6 +191,66 @@ class EvaluatorVisitor(ASTVisitor):
         
         raise OriginError(f"Undefined function: {node.name}")
     
+    def _call_function(self, name: str, args: List[Any]) -> Any:
+        """Call a user-defined function with evaluated arguments."""
+        func = self.functions[name]
+        if len(args) != len(func['params']):
+            raise OriginError(f"function '{name}' expects {len(func['params'])} arguments, got {len(args)}")
+        
+        # Create local environment
+        local_vars = self.variables.copy()
+        for param, arg in zip(func['params'], args):
+            local_vars[param] = arg
+        
+        # Create new visitor for function execution
+        func_visitor = EvaluatorVisitor(local_vars, self.functions, self.recorder, self.net_allowed)
+        func_visitor.base_path = self.base_path
+        func_visitor.files_allowed = self.files_allowed
+        func_visitor.http = self.http
+        
+        result = None
+        for stmt in func['body']:
+            result = stmt.accept(func_visitor)
+        return result
+    
+    def _parallel(self, node: FunctionCallNode) -> Any:
+        """Evaluate parallel(fn, items[, concurrency]) by calling fn on each item concurrently."""
+        from ..builtins.parallel import DEFAULT_CONCURRENCY, parallel
+        
+        if len(node.arguments) not in (2, 3):
+            raise OriginError("parallel requires a function, a list and an optional concurrency")
+        fn_node = node.arguments[0]
+        if not isinstance(fn_node, VariableNode) or fn_node.name not in self.functions:
+            raise OriginError("parallel expects the name of a function as its first argument")
+        
+        items = node.arguments[1].accept(self)
+        concurrency = node.arguments[2].accept(self) if len(node.arguments) == 3 else DEFAULT_CONCURRENCY
+        # Keep recorded events in execution order
+        if self.recorder:
+            concurrency = 1
+        return parallel(lambda item: self._call_function(fn_node.name, [item]), items, concurrency)
+    
+    def _http_get_json(self, node: FunctionCallNode) -> Any:
+        """Evaluate http_get_json(url[, fn]), calling fn on each element of a top-level array as it is parsed."""
+        from ..runtime.net import http_get_json, iter_http_get_json
+        
+        if not self.net_allowed:
+            raise OriginError("Network access not permitted — run with --allow-net")
+        if len(node.arguments) not in (1, 2):
+            raise OriginError("http_get_json requires a URL and an optional function")
+        url = node.arguments[0].accept(self)
+        if len(node.arguments) == 1:
+            return http_get_json(url, client=self.http)
+        
+        fn_node = node.arguments[1]
+        if not isinstance(fn_node, VariableNode) or fn_node.name not in self.functions:
+            raise OriginError("http_get_json expects the name of a function as its second argument")
+        count = 0
+        for item in iter_http_get_json(url, client=self.http):
+            self._call_function(fn_node.name, [item])
+            count += 1
+        return count
+    
     def visit_if_expr(self, node: IfExprNode) -> Any:
         """Evaluate an if expression."""
         self._increment_node_count("IfExprNode")
@@ -0,0 +1,212 @@
+import email.utils
+import hashlib
+import json
+import os
+import pathlib
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Default cache location, relative to the project like .origin/libs
+DEFAULT_CACHE_DIR = pathlib.Path(".origin") / "http-cache"
+
+# Default cache size limit (50MB)
+DEFAULT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+_MAX_AGE = re.compile(r'(?:^|,)\s*max-age\s*=\s*"?(\d+)"?', re.IGNORECASE)
+
+
+def get_http_cache_enabled() -> bool:
+    """Check whether the HTTP cache is enabled through the environment."""
+    return os.environ.get('ORIGIN_HTTP_CACHE', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def get_http_cache_max_bytes() -> int:
+    """Get the HTTP cache size limit from environment or default."""
+    return int(os.environ.get('ORIGIN_HTTP_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES))
+
+
+class CacheEntry:
+    """A cached response body with its freshness and revalidation data."""
+    
+    def __init__(self, key: str, meta: Dict[str, Any], body: str):
+        self.key = key
+        self.meta = meta
+        self.body = body
+    
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Check whether the entry can be used without asking the server."""
+        expires = self.meta.get("expires")
+        return expires is not None and (now if now is not None else time.time()) < expires
+    
+    def validators(self) -> Dict[str, str]:
+        """Get the conditional request headers that revalidate this entry."""
+        headers = {}
+        if self.meta.get("etag"):
+            headers["If-None-Match"] = self.meta["etag"]
+        if self.meta.get("last_modified"):
+            headers["If-Modified-Since"] = self.meta["last_modified"]
+        return headers
+
+
+class HTTPCache:
+    """
+    On-disk cache of HTTP GET responses.
+    
+    Responses are stored when their headers allow it: fresh ones (Cache-Control
+    max-age or Expires) are served without a request, and ones with an ETag or
+    Last-Modified are revalidated with a conditional request that costs a 304
+    instead of the full body. The cache is kept under ``max_bytes`` by evicting
+    the least recently used entries.
+    """
+    
+    def __init__(self, root: pathlib.Path = DEFAULT_CACHE_DIR, max_bytes: Optional[int] = None):
+        """
+        Initialize the cache; the directory is created on the first store.
+        
+        Args:
+            root: Cache directory
+            max_bytes: Size limit for cached bodies (defaults to ORIGIN_HTTP_CACHE_MAX_BYTES)
+        """
+        self.root = pathlib.Path(root)
+        self.max_bytes = max_bytes if max_bytes is not None else get_http_cache_max_bytes()
+        self.hits = 0  # Served without a request
+        self.revalidated = 0  # Served after a 304
+        self.misses = 0  # Fetched in full
+        self._lock = threading.Lock()
+    
+    def _key(self, url: str, headers: Dict[str, str]) -> str:
+        # Request headers such as Authorization or Accept can change the response
+        material = json.dumps([url, sorted(headers.items())])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def _paths(self, key: str):
+        return self.root / f"{key}.json", self.root / f"{key}.body"
+    
+    def lookup(self, url: str, headers: Dict[str, str]) -> Optional[CacheEntry]:
+        """Find the cached entry for a request, marking it as recently used."""
+        key = self._key(url, headers)
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'r', encoding='utf-8') as f:
+                body = f.read()
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(key, meta, body)
+    
+    def store(self, url: str, headers: Dict[str, str], response_headers: Any, body: str) -> bool:
+        """
+        Cache a successful response if its headers allow it.
+        
+        Returns:
+            Whether the response was stored
+        """
+        meta = _response_meta(response_headers)
+        if meta is None:
+            return False
+        body_bytes = body.encode('utf-8')
+        if len(body_bytes) > self.max_bytes:
+            return False
+        
+        meta["url"] = url
+        key = self._key(url, headers)
+        meta_path, body_path = self._paths(key)
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            _write_atomic(body_path, body_bytes)
+            _write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+            self._evict()
+        return True
+    
+    def refresh(self, entry: CacheEntry, response_headers: Any) -> str:
+        """
+        Update an entry after a 304 Not Modified response.
+        
+        Returns:
+            The cached body
+        """
+        meta = _response_meta(response_headers) or {}
+        for field in ("expires", "etag", "last_modified"):
+            if meta.get(field) is not None:
+                entry.meta[field] = meta[field]
+        
+        meta_path, _ = self._paths(entry.key)
+        with self._lock:
+            try:
+                _write_atomic(meta_path, json.dumps(entry.meta).encode('utf-8'))
+            except OSError:
+                pass  # The body is still valid for this request
+        self.revalidated += 1
+        return entry.body
+    
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for meta_path in self.root.glob("*.json"):
+            try:
+                last_used = meta_path.stat().st_mtime
+                size = meta_path.with_suffix(".body").stat().st_size
+            except OSError:
+                continue
+            entries.append((last_used, meta_path, size))
+            total += size
+        
+        entries.sort()
+        for _, meta_path, size in entries:
+            if total <= self.max_bytes:
+                break
+            meta_path.unlink(missing_ok=True)
+            meta_path.with_suffix(".body").unlink(missing_ok=True)
+            total -= size
+    
+    def stats(self) -> Dict[str, int]:
+        """Get counts of fresh hits, 304 revalidations and misses."""
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+
+def _response_meta(headers: Any) -> Optional[Dict[str, Any]]:
+    """
+    Extract caching metadata from response headers.
+    
+    Returns:
+        Metadata with an ``expires`` timestamp (None if the response must be
+        revalidated before each use) and any validators, or None if the
+        response may not be cached or could never be reused
+    """
+    cache_control = headers.get('Cache-Control', '') or ''
+    directives = cache_control.lower()
+    if 'no-store' in directives:
+        return None
+    
+    expires = None
+    if 'no-cache' not in directives:
+        match = _MAX_AGE.search(cache_control)
+        if match:
+            expires = time.time() + int(match.group(1))
+        elif headers.get('Expires'):
+            try:
+                expires = email.utils.parsedate_to_datetime(headers['Expires']).timestamp()
+            except (TypeError, ValueError):
+                expires = 0.0  # Invalid dates mean already expired
+    
+    meta = {
+        "expires": expires,
+        "etag": headers.get('ETag'),
+        "last_modified": headers.get('Last-Modified')
+    }
+    if not expires and not meta["etag"] and not meta["last_modified"]:
+        return None
+    return meta
+
+
+def _write_atomic(path: pathlib.Path, data: bytes) -> None:
+    """Write a file so readers never see it half written."""
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
@@ -1,11 +1,28 @@
+import codecs
+import concurrent.futures
+import contextlib
 import os
+import threading
+import time
 import urllib.parse
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional
+from ..builtins.json import iter_array, parse as json_parse
+from ..builtins.parallel import DEFAULT_CONCURRENCY, parallel
 from ..errors import OriginError
+from ..policy import NetworkPolicy, parse_retry_after
+from .http_cache import HTTPCache
+from .net_replay import NetReplay
 
 # Default max payload size (5MB)
 DEFAULT_MAX_FETCH_BYTES = 5 * 1024 * 1024
 
+# Bytes requested per read of a response body
+READ_CHUNK_SIZE = 64 * 1024
+
+# Default keep-alive connections kept per host, and seconds before idle ones are dropped
+DEFAULT_HTTP_POOL_SIZE = 10
+DEFAULT_HTTP_IDLE_TIMEOUT = 30.0
+
 # Disallowed URL schemes
 DISALLOWED_SCHEMES = {'file://', 'ftp://', 'data:'}
 
@@ -15,6 +32,153 @@ def get_max_fetch_bytes() -> int:
     return int(os.environ.get('ORIGIN_MAX_FETCH_BYTES', DEFAULT_MAX_FETCH_BYTES))
 
 
+def get_http_pool_size() -> int:
+    """Get the per-host connection pool size from environment or default."""
+    return int(os.environ.get('ORIGIN_HTTP_POOL_SIZE', DEFAULT_HTTP_POOL_SIZE))
+
+
+def get_http_idle_timeout() -> float:
+    """Get the idle connection timeout in seconds from environment or default."""
+    return float(os.environ.get('ORIGIN_HTTP_IDLE_TIMEOUT', DEFAULT_HTTP_IDLE_TIMEOUT))
+
+
+class HTTPStatusError(OriginError):
+    """A response with a non-2xx status."""
+    
+    def __init__(self, message: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after  # Seconds the server asked us to wait, if any
+
+
+class NetworkError(OriginError):
+    """A request that failed before a response arrived, e.g. a refused connection or a timeout."""
+    pass
+
+
+class HTTPClient:
+    """
+    Connection-pooled HTTP client shared by all http_get calls of a run.
+    
+    Keeps up to ``pool_size`` keep-alive connections per host, so repeated
+    requests to the same host skip TCP and TLS setup. Connections left idle
+    longer than ``idle_timeout`` are dropped before the next request rather
+    than reused after the server may have closed them. With a ``cache``,
+    safe_http_get serves and revalidates responses from it. With a
+    ``recorder``, every exchange is written to the recording; with a
+    ``replay``, responses come from a recording and the network is not used.
+    Requests are rate limited, retried and circuit broken per host by the
+    client's ``policy``.
+    """
+    
+    def __init__(self, pool_size: Optional[int] = None, idle_timeout: Optional[float] = None,
+                 cache: Optional[HTTPCache] = None, recorder=None, replay: Optional[NetReplay] = None,
+                 policy: Optional[NetworkPolicy] = None):
+        """
+        Initialize the client; the session is created on first use.
+        
+        Args:
+            pool_size: Connections kept per host (defaults to ORIGIN_HTTP_POOL_SIZE)
+            idle_timeout: Seconds before idle connections are dropped (defaults to ORIGIN_HTTP_IDLE_TIMEOUT)
+            cache: Optional on-disk response cache
+            recorder: Optional Recorder that exchanges are recorded to
+            replay: Optional recorded responses to serve instead of fetching
+            policy: Network policy (defaults to pkg.json "network" settings and ORIGIN_NET_* variables)
+        """
+        self.pool_size = pool_size if pool_size is not None else get_http_pool_size()
+        self.idle_timeout = idle_timeout if idle_timeout is not None else get_http_idle_timeout()
+        if self.pool_size < 1:
+            raise OriginError("HTTP pool size must be at least 1")
+        
+        self.policy = policy if policy is not None else NetworkPolicy.load()
+        self.cache = cache
+        self.recorder = recorder
+        self.replay = replay
+        self.requests = 0
+        self._closed_connections = 0  # Connections opened by pools that were since closed
+        self._session = None
+        self._adapter = None
+        self._executor = None  # Background threads for http_get_async, created on first use
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+    
+    def _get_session(self):
+        """Create the pooled session, or reset it if its connections went idle."""
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        with self._lock:
+            now = time.monotonic()
+            if self._session is not None and now - self._last_used > self.idle_timeout:
+                self._close_session()
+            if self._session is None:
+                self._adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                self._session = requests.Session()
+                self._session.mount('http://', self._adapter)
+                self._session.mount('https://', self._adapter)
+            self._last_used = now
+            self.requests += 1
+            return self._session
+    
+    def get(self, url: str, headers: Dict[str, str], timeout: float):
+        """Send a streaming GET request over a pooled connection."""
+        session = self._get_session()
+        return session.get(url, headers=headers, timeout=timeout, allow_redirects=True, stream=True)
+    
+    def submit(self, fn, *args) -> concurrent.futures.Future:
+        """
+        Run a call on the client's background threads.
+        
+        Up to ``pool_size`` calls run at once, so each can keep a pooled
+        connection to a shared host.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.pool_size, thread_name_prefix="origin-http")
+            return self._executor.submit(fn, *args)
+    
+    def _open_connections(self) -> int:
+        """Count connections opened by the current session's pools."""
+        if self._adapter is None:
+            return 0
+        pools = self._adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+    
+    def _close_session(self) -> None:
+        """Close the session, keeping its connection count for stats."""
+        self._closed_connections += self._open_connections()
+        self._session.close()
+        self._session = None
+        self._adapter = None
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get pool statistics.
+        
+        Returns:
+            Dictionary with the number of requests sent, connections opened and
+            requests that reused an open connection
+        """
+        with self._lock:
+            connections = self._closed_connections + self._open_connections()
+            return {
+                "requests": self.requests,
+                "connections": connections,
+                "reused": max(self.requests - connections, 0)
+            }
+    
+    def close(self) -> None:
+        """Close all pooled connections, first waiting for background requests that already started."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            if self._session is not None:
+                self._close_session()
+
+
 def validate_url(url: str) -> None:
     """
     Validate URL for security restrictions.
@@ -37,7 +201,8 @@ def validate_url(url: str) -> None:
 
 
 def safe_http_get(url: str, headers: Optional[Dict[str, str]] = None, 
-                  timeout: int = 10, max_size: Optional[int] = None) -> str:
+                  timeout: int = 10, max_size: Optional[int] = None,
+                  client: Optional[HTTPClient] = None) -> str:
     """
     Perform a safe HTTP GET request with security checks.
     
@@ -46,10 +211,202 @@ def safe_http_get(url: str, headers: Optional[Dict[str, str]] = None,
         headers: Optional request headers
         timeout: Request timeout in seconds
         max_size: Maximum response size in bytes (defaults to env var)
+        client: Pooled client to send the request through; without one a
+                new connection is opened for this request
         
     Returns:
         Response body as string
         
+    Raises:
+        OriginError: On network errors, size limits, or non-2xx status
+    """
+    if client is not None and client.replay is not None:
+        return client.replay.respond(url, headers)
+    if client is None or client.recorder is None:
+        return _fetch(url, headers, timeout, max_size, client)
+    
+    # Copy before the User-Agent default is added, so replay matches what the program asked for
+    requested = dict(headers or {})
+    try:
+        body = _fetch(url, headers, timeout, max_size, client)
+    except OriginError as e:
+        client.recorder.record_net(url, requested, error=str(e))
+        raise
+    client.recorder.record_net(url, requested, body=body)
+    return body
+
+
+def http_get_many(urls: List[str], concurrency: int = DEFAULT_CONCURRENCY,
+                  headers: Optional[Dict[str, str]] = None, timeout: int = 10,
+                  max_size: Optional[int] = None, client: Optional[HTTPClient] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch many URLs concurrently with safe_http_get.
+    
+    A failing URL does not stop the others; its error is reported in its result.
+    Set ORIGIN_HTTP_POOL_SIZE to at least ``concurrency`` so every worker can
+    keep its connection to a shared host open.
+    
+    Args:
+        urls: The URLs to fetch
+        concurrency: Maximum number of requests in flight
+        headers: Optional request headers sent with every request
+        timeout: Request timeout in seconds
+        max_size: Maximum size of each response in bytes (defaults to env var)
+        client: Pooled client to send the requests through
+    
+    Returns:
+        One {"url", "body", "error"} map per URL, in the order given; ``body`` is
+        None when the request failed and ``error`` is None when it succeeded
+    """
+    if isinstance(urls, str):
+        raise OriginError("http_get_many expects a list of URLs")
+    
+    def fetch(url: str) -> Dict[str, Any]:
+        try:
+            # Each request gets its own headers dict; safe_http_get fills in defaults
+            body = safe_http_get(url, dict(headers or {}), timeout, max_size, client)
+            return {"url": url, "body": body, "error": None}
+        except OriginError as e:
+            return {"url": url, "body": None, "error": str(e)}
+    
+    return parallel(fetch, urls, concurrency)
+
+
+def http_get_json(url: str, headers: Optional[Dict[str, str]] = None,
+                  timeout: int = 10, max_size: Optional[int] = None,
+                  client: Optional[HTTPClient] = None) -> Any:
+    """
+    Fetch a URL with safe_http_get and parse the body as JSON.
+    
+    Unlike ``json.parse(http_get(url))`` in a script, the body never becomes a
+    variable, so it is freed as soon as it is parsed and is not copied into
+    recordings.
+    
+    Raises:
+        OriginError: On request errors or invalid JSON
+    """
+    return json_parse(safe_http_get(url, headers, timeout, max_size, client))
+
+
+def iter_http_get_json(url: str, headers: Optional[Dict[str, str]] = None,
+                       timeout: int = 10, max_size: Optional[int] = None,
+                       client: Optional[HTTPClient] = None) -> Iterator[Any]:
+    """
+    Fetch a URL whose body is a JSON array and yield its elements as they arrive.
+    
+    Elements are parsed from the response stream, so a huge array is processed
+    in memory proportional to its largest element. The size limit still
+    applies to the whole body. Responses that go through the client's cache,
+    a recording or a replay are read in full first.
+    
+    Raises:
+        OriginError: On request errors, or if the body is not a JSON array
+    """
+    if client is not None and (client.cache is not None or client.recorder is not None or client.replay is not None):
+        chunks = [safe_http_get(url, headers, timeout, max_size, client)]
+    else:
+        chunks = iter_http_get(url, headers, timeout, max_size, client)
+    return iter_array(chunks)
+
+
+class HTTPFuture:
+    """Handle for a request started by http_get_async."""
+    
+    def __init__(self, url: str, future: concurrent.futures.Future):
+        self.url = url
+        self._future = future
+    
+    def done(self) -> bool:
+        """Check whether the request has finished, successfully or not."""
+        return self._future.done()
+    
+    def result(self, timeout: Optional[float] = None) -> str:
+        """
+        Wait for the response body.
+        
+        Raises:
+            OriginError: The request's own error, or if it did not finish in time
+        """
+        try:
+            return self._future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            raise OriginError(f"Timed out waiting for {self.url}")
+        except concurrent.futures.CancelledError:
+            raise OriginError(f"Request to {self.url} was cancelled")
+    
+    def __deepcopy__(self, memo):
+        # Recorder snapshots copy variables; a handle is shown, not copied
+        return self
+    
+    def __str__(self) -> str:
+        return f"<http_get_async {self.url} ({'done' if self.done() else 'pending'})>"
+
+
+def http_get_async(url: str, headers: Optional[Dict[str, str]] = None,
+                   timeout: int = 10, max_size: Optional[int] = None,
+                   client: Optional[HTTPClient] = None) -> HTTPFuture:
+    """
+    Start a safe_http_get in the background and return a handle to it.
+    
+    The caller keeps running while the request is in flight and collects the
+    body later with await_http or await_all. Errors are raised when the
+    handle is awaited, not here.
+    
+    Args:
+        client: Pooled client whose background threads run the request;
+                without one the request gets a thread of its own
+    """
+    if client is None:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(safe_http_get, url, headers, timeout, max_size)
+        executor.shutdown(wait=False)
+    else:
+        future = client.submit(safe_http_get, url, headers, timeout, max_size, client)
+    return HTTPFuture(url, future)
+
+
+def await_http(handle: HTTPFuture, timeout: Optional[float] = None) -> str:
+    """
+    Wait for a request started by http_get_async and return its body.
+    
+    Raises:
+        OriginError: If ``handle`` is not a request handle, or the request failed
+    """
+    if not isinstance(handle, HTTPFuture):
+        raise OriginError("await expects a handle returned by http_get_async")
+    return handle.result(timeout)
+
+
+def await_all(handles: List[HTTPFuture], timeout: Optional[float] = None) -> List[str]:
+    """
+    Wait for several requests started by http_get_async.
+    
+    Returns:
+        The response bodies, in the order of ``handles``
+    
+    Raises:
+        OriginError: The error of the first failed request in ``handles``
+    """
+    if isinstance(handles, HTTPFuture) or not isinstance(handles, (list, tuple)):
+        raise OriginError("await_all expects a list of handles returned by http_get_async")
+    return [await_http(handle, timeout) for handle in handles]
+
+
+def iter_http_get(url: str, headers: Optional[Dict[str, str]] = None,
+                  timeout: int = 10, max_size: Optional[int] = None,
+                  client: Optional[HTTPClient] = None,
+                  chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Stream the body of a safe HTTP GET request as decoded text.
+    
+    Takes the same arguments as safe_http_get and applies the same checks, but
+    yields the body in pieces as it arrives, so callers can process large
+    responses without holding all of them in memory. The size limit is
+    enforced while reading.
+    
+    Yields:
+        Successive pieces of the UTF-8 decoded response body
+        
     Raises:
         OriginError: On network errors, size limits, or non-2xx status
     """
@@ -60,22 +417,113 @@ def safe_http_get(url: str, headers: Optional[Dict[str, str]] = None,
     if max_size is None:
         max_size = get_max_fetch_bytes()
     
+    with _network_errors():
+        response = _send_with_policy(url, headers, timeout, max_size, client)
+        yield from _iter_body(response, max_size, chunk_size)
+
+
+def _fetch(url: str, headers: Optional[Dict[str, str]], timeout: int,
+           max_size: Optional[int], client: Optional[HTTPClient]) -> str:
+    """Get a response body from the client's cache or the network."""
+    if client is not None and client.cache is not None:
+        return _cached_http_get(url, headers, timeout, max_size, client)
+    
+    # Join once at the end; appending to a bytes buffer copied it on every chunk
+    return "".join(iter_http_get(url, headers, timeout, max_size, client))
+
+
+def _cached_http_get(url: str, headers: Optional[Dict[str, str]], timeout: int,
+                     max_size: Optional[int], client: HTTPClient) -> str:
+    """safe_http_get through the client's cache: serve fresh entries, revalidate stale ones."""
+    validate_url(url)
+    if max_size is None:
+        max_size = get_max_fetch_bytes()
+    
+    cache = client.cache
+    headers = dict(headers or {})
+    entry = cache.lookup(url, headers)
+    if entry is not None and entry.is_fresh():
+        cache.hits += 1
+        return entry.body
+    
+    request_headers = dict(headers)
+    if entry is not None:
+        request_headers.update(entry.validators())
+    
+    with _network_errors():
+        response = _send_with_policy(url, request_headers, timeout, max_size, client,
+                                     allow_not_modified=entry is not None)
+        if response.status_code == 304:
+            response.close()
+            return cache.refresh(entry, response.headers)
+        body = "".join(_iter_body(response, max_size, READ_CHUNK_SIZE))
+    
+    cache.misses += 1
     try:
-        # Try to import requests
+        cache.store(url, headers, response.headers, body)
+    except OSError:
+        pass  # An unwritable cache must not fail the request
+    return body
+
+
+@contextlib.contextmanager
+def _network_errors():
+    """Report failures of a request as OriginError."""
+    try:
+        yield
+    except OriginError:
+        raise
+    except Exception as e:
         try:
             import requests
+            if isinstance(e, requests.exceptions.RequestException):
+                raise NetworkError(f"Network error: {e}")
         except ImportError:
-            raise OriginError("Network functionality requires 'requests' library. Install with: pip install origin-lang[net]")
-        
-        # Prepare headers
-        if headers is None:
-            headers = {}
-        
-        # Add user agent if not provided
-        if 'User-Agent' not in headers:
-            headers['User-Agent'] = 'Origin-Language/1.0'
-        
-        # Make request
+            pass
+        raise OriginError(f"Unexpected error: {e}")
+
+
+def _send_with_policy(url: str, headers: Optional[Dict[str, str]], timeout: int, max_size: int,
+                      client: Optional[HTTPClient], allow_not_modified: bool = False):
+    """
+    _send under the client's network policy.
+    
+    Network errors and statuses in the policy's retry set are retried; the
+    body is not, since part of it may already have been consumed.
+    """
+    def attempt():
+        with _network_errors():
+            # Fresh headers per attempt, since _send fills in defaults
+            return _send(url, dict(headers or {}), timeout, max_size, client, allow_not_modified)
+    
+    if client is None:
+        return attempt()
+    policy = client.policy
+    return policy.call(url, attempt, lambda e: isinstance(e, NetworkError) or
+                       isinstance(e, HTTPStatusError) and e.status in policy.retry_statuses)
+
+
+def _send(url: str, headers: Optional[Dict[str, str]], timeout: int, max_size: int,
+          client: Optional[HTTPClient], allow_not_modified: bool = False):
+    """Send a GET request and check its status and declared size before the body is read."""
+    # Try to import requests
+    try:
+        import requests
+    except ImportError:
+        raise OriginError("Network functionality requires 'requests' library. Install with: pip install origin-lang[net]")
+    
+    # Prepare headers
+    if headers is None:
+        headers = {}
+    
+    # Add user agent if not provided
+    if 'User-Agent' not in headers:
+        headers['User-Agent'] = 'Origin-Language/1.0'
+    
+    # Make request
+    if client is not None:
+        response = client.get(url, headers, timeout)
+    else:
         response = requests.get(
             url, 
             headers=headers, 
@@ -83,31 +531,41 @@ def safe_http_get(url: str, headers: Optional[Dict[str, str]] = None,
             allow_redirects=True,
             stream=True  # Stream to check size before downloading
         )
-        
-        # Check status code
-        if not (200 <= response.status_code < 300):
-            raise OriginError(f"HTTP {response.status_code}: {response.reason}")
-        
-        # Check content length if available
-        content_length = response.headers.get('content-length')
-        if content_length:
-            size = int(content_length)
-            if size > max_size:
-                raise OriginError(f"Response too large: {size} bytes (max: {max_size})")
-        
-        # Read response with size checking
-        content = b""
-        for chunk in response.iter_content(chunk_size=8192):
-            content += chunk
-            if len(content) > max_size:
-                response.close()
-                raise OriginError(f"Response too large: {len(content)} bytes (max: {max_size})")
-        
-        return content.decode('utf-8')
-        
-    except requests.exceptions.RequestException as e:
-        raise OriginError(f"Network error: {e}")
-    except Exception as e:
-        if isinstance(e, OriginError):
-            raise
-        raise OriginError(f"Unexpected error: {e}") 
\ No newline at end of file
+    
+    # Check status code
+    if response.status_code == 304 and allow_not_modified:
+        return response
+    if not (200 <= response.status_code < 300):
+        response.close()
+        raise HTTPStatusError(f"HTTP {response.status_code}: {response.reason}", response.status_code,
+                              parse_retry_after(response.headers.get('Retry-After')))
+    
+    # Check content length if available
+    content_length = response.headers.get('content-length')
+    if content_length:
+        size = int(content_length)
+        if size > max_size:
+            response.close()
+            raise OriginError(f"Response too large: {size} bytes (max: {max_size})")
+    
+    return response
+
+
+def _iter_body(response, max_size: int, chunk_size: int) -> Iterator[str]:
+    """Read a response body with size checking, decoding each chunk as it arrives."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    received = 0
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            received += len(chunk)
+            if received > max_size:
+                raise OriginError(f"Response too large: {received} bytes (max: {max_size})")
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+    finally:
+        # Fully read responses are already back in the pool; this drops abandoned ones
+        response.close()
\ No newline at end of file
@@ -0,0 +1,81 @@
+import collections
+import json
+import pathlib
+import threading
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..errors import OriginError
+from ..replayer import NET_PREFIX
+
+
+def _request_key(url: str, headers: Optional[Dict[str, str]]) -> Tuple[str, str]:
+    """Identify a request by URL and headers, ignoring header order."""
+    return url, json.dumps(sorted((headers or {}).items()))
+
+
+class NetReplay:
+    """
+    Serves http_get responses from a recording instead of the network.
+    
+    Responses are matched by URL and request headers. A request made several
+    times gets the recorded responses in the order they were recorded, so
+    polling loops replay the same sequence of bodies. Recorded failures are
+    raised again with their original message.
+    """
+    
+    def __init__(self, exchanges: List[Dict[str, Any]], source: str = "recording"):
+        """
+        Initialize from recorded exchanges.
+        
+        Args:
+            exchanges: ``"kind": "net"`` events in recording order
+            source: Name of the recording, for error messages
+        """
+        self.source = source
+        self.served = 0
+        self._responses: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = {}
+        for exchange in exchanges:
+            key = _request_key(exchange["url"], exchange.get("headers"))
+            self._responses.setdefault(key, collections.deque()).append(exchange)
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_file(cls, file_path: pathlib.Path) -> 'NetReplay':
+        """
+        Load the network exchanges of a recording.
+        
+        Only exchange lines are decoded, so loading stays cheap for long recordings.
+        """
+        exchanges = []
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line_num, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line.startswith(NET_PREFIX):
+                        continue
+                    try:
+                        exchanges.append(json.loads(line))
+                    except json.JSONDecodeError as e:
+                        raise OriginError(f"Malformed JSON at line {line_num} of {file_path}: {e}")
+        except FileNotFoundError:
+            raise OriginError(f"Recording file not found: {file_path}")
+        return cls(exchanges, str(file_path))
+    
+    def respond(self, url: str, headers: Optional[Dict[str, str]] = None) -> str:
+        """
+        Get the next recorded response for a request.
+        
+        Raises:
+            OriginError: If the request failed when recorded, or was not recorded
+                         (as often as it is now made)
+        """
+        with self._lock:
+            pending = self._responses.get(_request_key(url, headers))
+            if not pending:
+                raise OriginError(f"No recorded response for {url} in {self.source}")
+            exchange = pending.popleft()
+            self.served += 1
+        
+        if "error" in exchange:
+            raise OriginError(exchange["error"])
+        return exchange["body"]
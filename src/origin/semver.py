@@ -1,42 +1,56 @@
+import bisect
+import functools
+import operator
 import re
-from typing import List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple, Union
 from .errors import OriginPkgError
 
+# Basic semver pattern: major.minor.patch[-prerelease][+build]
+_VERSION_PATTERN = re.compile(
+    r'^(\d+)\.(\d+)\.(\d+)(?:-([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?(?:\+([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?$'
+)
+
+# Distinct version and range strings whose parse results are kept
+PARSE_CACHE_SIZE = 16384
+
+# Prerelease part of a release's sort key, above every prerelease
+_RELEASE_KEY = (1,)
+
 
-@dataclass
 class SemVer:
-    """Semantic version representation."""
-    major: int
-    minor: int
-    patch: int
-    prerelease: Optional[str] = None
-    build: Optional[str] = None
-    
-    def __post_init__(self):
-        """Validate version components."""
-        if not all(isinstance(x, int) and x >= 0 for x in [self.major, self.minor, self.patch]):
+    """
+    Semantic version representation.
+    
+    Parsed versions are cached and shared, so they must not be modified. Each
+    one carries a ``sort_key`` tuple that orders versions by semver
+    precedence, so comparing two versions is a single tuple comparison.
+    """
+    __slots__ = ("major", "minor", "patch", "prerelease", "build", "sort_key")
+    
+    def __init__(self, major: int, minor: int, patch: int,
+                 prerelease: Optional[str] = None, build: Optional[str] = None):
+        """Create a version, validating its components."""
+        if not (isinstance(major, int) and isinstance(minor, int) and isinstance(patch, int)) \
+                or major < 0 or minor < 0 or patch < 0:
             raise ValueError("Version numbers must be non-negative integers")
+        self.major = major
+        self.minor = minor
+        self.patch = patch
+        self.prerelease = prerelease
+        self.build = build
+        self.sort_key = (major, minor, patch, _RELEASE_KEY if prerelease is None else _prerelease_key(prerelease))
     
     @classmethod
     def parse(cls, version_str: str) -> 'SemVer':
-        """Parse a semantic version string."""
-        # Basic semver pattern: major.minor.patch[-prerelease][+build]
-        pattern = r'^(\d+)\.(\d+)\.(\d+)(?:-([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?(?:\+([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?$'
-        match = re.match(pattern, version_str)
-        
-        if not match:
-            raise OriginPkgError(f"Invalid semantic version: {version_str}")
-        
-        major, minor, patch, prerelease, build = match.groups()
-        
-        return cls(
-            major=int(major),
-            minor=int(minor),
-            patch=int(patch),
-            prerelease=prerelease,
-            build=build
-        )
+        """Parse a semantic version string (cached, so repeated strings share one version)."""
+        return _parse_version(version_str)
+    
+    def __repr__(self) -> str:
+        return (f"SemVer(major={self.major}, minor={self.minor}, patch={self.patch}, "
+                f"prerelease={self.prerelease!r}, build={self.build!r})")
+    
+    def __hash__(self) -> int:
+        return hash(self.sort_key)
     
     def __str__(self) -> str:
         """Convert back to string representation."""
@@ -48,52 +62,76 @@ class SemVer:
         return result
     
     def __eq__(self, other: 'SemVer') -> bool:
-        """Compare versions for equality."""
+        """Compare versions for equality (build metadata is ignored)."""
         if not isinstance(other, SemVer):
             return False
-        return (self.major, self.minor, self.patch, self.prerelease) == \
-               (other.major, other.minor, other.patch, other.prerelease)
+        return self.sort_key == other.sort_key
     
     def __lt__(self, other: 'SemVer') -> bool:
         """Compare versions for ordering."""
         if not isinstance(other, SemVer):
             return NotImplemented
-        
-        # Compare major.minor.patch
-        if (self.major, self.minor, self.patch) < (other.major, other.minor, other.patch):
-            return True
-        if (self.major, self.minor, self.patch) > (other.major, other.minor, other.patch):
-            return False
-        
-        # If versions are equal, prerelease versions are lower
-        if self.prerelease is None and other.prerelease is not None:
-            return False
-        if self.prerelease is not None and other.prerelease is None:
-            return True
-        if self.prerelease is not None and other.prerelease is not None:
-            return self.prerelease < other.prerelease
-        
-        return False
+        return self.sort_key < other.sort_key
     
     def __le__(self, other: 'SemVer') -> bool:
-        return self < other or self == other
+        if not isinstance(other, SemVer):
+            return NotImplemented
+        return self.sort_key <= other.sort_key
     
     def __gt__(self, other: 'SemVer') -> bool:
-        return not self <= other
+        if not isinstance(other, SemVer):
+            return NotImplemented
+        return self.sort_key > other.sort_key
     
     def __ge__(self, other: 'SemVer') -> bool:
-        return not self < other
+        if not isinstance(other, SemVer):
+            return NotImplemented
+        return self.sort_key >= other.sort_key
+
+
+def _prerelease_key(prerelease: Optional[str]) -> Tuple:
+    """
+    Sort key for a prerelease, following semver precedence.
+    
+    A release sorts after any of its prereleases. Prerelease identifiers are
+    compared one by one: numeric ones numerically and below alphanumeric
+    ones, which compare as text; a prefix of another prerelease sorts first.
+    """
+    if prerelease is None:
+        return _RELEASE_KEY
+    return (0,) + tuple((0, int(part), part) if part.isdigit() else (1, 0, part)
+                        for part in prerelease.split('.'))
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_version(version_str: str) -> SemVer:
+    """Parse a version string; invalid strings raise OriginPkgError and are not cached."""
+    match = _VERSION_PATTERN.match(version_str)
+    
+    if not match:
+        raise OriginPkgError(f"Invalid semantic version: {version_str}")
+    
+    major, minor, patch, prerelease, build = match.groups()
+    
+    return SemVer(
+        major=int(major),
+        minor=int(minor),
+        patch=int(patch),
+        prerelease=prerelease,
+        build=build
+    )
 
 
 class SemVerRange:
     """Semantic version range parser and matcher."""
     
     def __init__(self, range_str: str):
-        """Initialize with a range string."""
+        """Initialize with a range string; each distinct string is only parsed once."""
         self.range_str = range_str
-        self.comparators = self._parse_range(range_str)
+        self.comparators = _parse_range_cached(range_str)
     
-    def _parse_range(self, range_str: str) -> List[Tuple[str, SemVer]]:
+    @classmethod
+    def _parse_range(cls, range_str: str) -> List[Tuple[str, SemVer]]:
         """Parse a version range string into comparators."""
         range_str = range_str.strip()
         
@@ -105,7 +143,7 @@ class SemVerRange:
         if not any(op in range_str for op in ['^', '~', '>=', '<=', '>', '<', '=']):
             try:
                 version = SemVer.parse(range_str)
-                return [('>=', version), ('<', self._next_patch(version))]
+                return [('>=', version), ('<', cls._next_patch(version))]
             except OriginPkgError:
                 pass
         
@@ -113,17 +151,17 @@ class SemVerRange:
         if range_str.startswith('^'):
             version_str = range_str[1:]
             version = SemVer.parse(version_str)
-            return self._parse_caret_range(version)
+            return cls._parse_caret_range(version)
         
         # Handle tilde ranges (~1.2.3, ~1.2)
         if range_str.startswith('~'):
             version_str = range_str[1:]
             version = SemVer.parse(version_str)
-            return self._parse_tilde_range(version)
+            return cls._parse_tilde_range(version)
         
-        # Handle comparison operators
+        # Handle comparison operators (a single comparator; compound ranges are below)
         for op in ['>=', '<=', '>', '<', '=']:
-            if range_str.startswith(op):
+            if range_str.startswith(op) and not re.search(r'\s', range_str):
                 version_str = range_str[len(op):]
                 version = SemVer.parse(version_str)
                 return [(op, version)]
@@ -155,13 +193,19 @@ class SemVerRange:
                 try:
                     version = SemVer.parse(part)
                     comparators.append(('>=', version))
-                    comparators.append(('<', self._next_patch(version)))
+                    comparators.append(('<', cls._next_patch(version)))
                 except OriginPkgError:
                     raise OriginPkgError(f"Invalid range specification: {part}")
         
+        # Every comparator applies, so they must leave some versions
+        intervals = [VersionSet([_comparator_interval(op, version)]) for op, version in comparators]
+        if functools.reduce(VersionSet.intersect, intervals, VersionSet.any()).is_empty():
+            raise OriginPkgError(f"Range matches no version: {range_str}")
+        
         return comparators
     
-    def _parse_caret_range(self, version: SemVer) -> List[Tuple[str, SemVer]]:
+    @classmethod
+    def _parse_caret_range(cls, version: SemVer) -> List[Tuple[str, SemVer]]:
         """Parse caret range (^1.2.3)."""
         if version.major == 0:
             if version.minor == 0:
@@ -174,7 +218,8 @@ class SemVerRange:
             # ^x.x.x: allow minor and patch updates
             return [('>=', version), ('<', SemVer(version.major + 1, 0, 0))]
     
-    def _parse_tilde_range(self, version: SemVer) -> List[Tuple[str, SemVer]]:
+    @classmethod
+    def _parse_tilde_range(cls, version: SemVer) -> List[Tuple[str, SemVer]]:
         """Parse tilde range (~1.2.3)."""
         if version.minor is None:
             # ~1: allow patch updates
@@ -183,7 +228,8 @@ class SemVerRange:
             # ~1.2: allow patch updates
             return [('>=', version), ('<', SemVer(version.major, version.minor + 1, 0))]
     
-    def _next_patch(self, version: SemVer) -> SemVer:
+    @classmethod
+    def _next_patch(cls, version: SemVer) -> SemVer:
         """Get the next patch version."""
         return SemVer(version.major, version.minor, version.patch + 1)
     
@@ -192,24 +238,165 @@ class SemVerRange:
         if not self.comparators:
             return True  # Wildcard matches everything
         
+        key = version.sort_key
         for op, range_version in self.comparators:
             if op == '>=':
-                if version < range_version:
+                if key < range_version.sort_key:
                     return False
             elif op == '<=':
-                if version > range_version:
+                if key > range_version.sort_key:
                     return False
             elif op == '>':
-                if version <= range_version:
+                if key <= range_version.sort_key:
                     return False
             elif op == '<':
-                if version >= range_version:
+                if key >= range_version.sort_key:
                     return False
             elif op == '=':
-                if version != range_version:
+                if key != range_version.sort_key:
                     return False
         
         return True
+    
+    def version_set(self) -> 'VersionSet':
+        """Get the versions this range matches as a VersionSet."""
+        return VersionSet.from_range(self.range_str)
+
+
+# A cut is a point between versions: (sort key, 0, version) lies just below
+# the version, (sort key, 1, version) just above it. The version itself is
+# kept for display; it compares by sort key, so it never changes the order.
+Cut = Tuple[tuple, int, Optional['SemVer']]
+
+_MIN_CUT: Cut = ((-1,), 0, None)
+_MAX_CUT: Cut = ((float("inf"),), 0, None)
+
+
+class VersionSet:
+    """
+    A set of versions, as a union of disjoint half-open intervals of cuts.
+    
+    Any SemVerRange converts to a VersionSet, and sets can be intersected and
+    combined, so whether ranges conflict is decided from their bounds
+    without looking at any actual versions. Intervals are kept sorted and
+    merged: ``intersect`` is linear in the number of intervals, ``union``
+    O(k log k), and ``contains`` a binary search.
+    """
+    __slots__ = ("intervals", "_lowers")
+    
+    def __init__(self, intervals: Iterable[Tuple[Cut, Cut]] = ()):
+        """Create a set from [lower, upper) cut intervals in any order."""
+        merged: List[Tuple[Cut, Cut]] = []
+        for lower, upper in sorted(interval for interval in intervals if interval[0] < interval[1]):
+            if merged and lower <= merged[-1][1]:
+                if upper > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], upper)
+            else:
+                merged.append((lower, upper))
+        self.intervals = merged
+        self._lowers = [lower for lower, _ in merged]
+    
+    @classmethod
+    def any(cls) -> 'VersionSet':
+        """The set of every version."""
+        return cls([(_MIN_CUT, _MAX_CUT)])
+    
+    @classmethod
+    def from_range(cls, range_spec: Union[str, SemVerRange]) -> 'VersionSet':
+        """
+        Get the versions a range matches.
+        
+        Raises:
+            OriginPkgError: If the range string is invalid
+        """
+        if isinstance(range_spec, SemVerRange):
+            range_spec = range_spec.range_str
+        return _range_set_cached(range_spec)
+    
+    def intersect(self, other: 'VersionSet') -> 'VersionSet':
+        """Get the versions in both sets."""
+        result = []
+        mine, theirs = self.intervals, other.intervals
+        i = j = 0
+        while i < len(mine) and j < len(theirs):
+            lower = max(mine[i][0], theirs[j][0])
+            upper = min(mine[i][1], theirs[j][1])
+            if lower < upper:
+                result.append((lower, upper))
+            if mine[i][1] < theirs[j][1]:
+                i += 1
+            else:
+                j += 1
+        return VersionSet(result)
+    
+    def union(self, other: 'VersionSet') -> 'VersionSet':
+        """Get the versions in either set."""
+        return VersionSet(self.intervals + other.intervals)
+    
+    def is_empty(self) -> bool:
+        """Whether no version is in the set."""
+        return not self.intervals
+    
+    def contains(self, version: SemVer) -> bool:
+        """Whether a version is in the set."""
+        cut = (version.sort_key, 0, version)
+        index = bisect.bisect_right(self._lowers, cut) - 1
+        return index >= 0 and cut < self.intervals[index][1]
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, VersionSet):
+            return NotImplemented
+        return self.intervals == other.intervals
+    
+    def __str__(self) -> str:
+        """Format the set as ranges joined by ``||``."""
+        if not self.intervals:
+            return "<empty>"
+        parts = []
+        for lower, upper in self.intervals:
+            if lower[2] is not None and lower[:2] == (upper[0], 0) and upper[1] == 1:
+                parts.append(f"={lower[2]}")
+                continue
+            bounds = []
+            if lower[2] is not None:
+                bounds.append((">=" if lower[1] == 0 else ">") + str(lower[2]))
+            if upper[2] is not None:
+                bounds.append(("<" if upper[1] == 0 else "<=") + str(upper[2]))
+            parts.append(" ".join(bounds) or "*")
+        return " || ".join(parts)
+    
+    def __repr__(self) -> str:
+        return f"VersionSet({str(self)!r})"
+
+
+def _comparator_interval(op: str, version: SemVer) -> Tuple[Cut, Cut]:
+    """Get the cut interval matched by one range comparator."""
+    below = (version.sort_key, 0, version)
+    above = (version.sort_key, 1, version)
+    if op == '>=':
+        return below, _MAX_CUT
+    if op == '>':
+        return above, _MAX_CUT
+    if op == '<':
+        return _MIN_CUT, below
+    if op == '<=':
+        return _MIN_CUT, above
+    return below, above  # '='
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _range_set_cached(range_str: str) -> VersionSet:
+    """Convert a range string to a VersionSet; the comparators of a range all apply at once."""
+    result = VersionSet.any()
+    for op, version in _parse_range_cached(range_str):
+        result = result.intersect(VersionSet([_comparator_interval(op, version)]))
+    return result
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_range_cached(range_str: str) -> Tuple[Tuple[str, SemVer], ...]:
+    """Parse a range string into comparators; invalid ranges raise OriginPkgError and are not cached."""
+    return tuple(SemVerRange._parse_range(range_str))
 
 
 def parse_version_range(range_str: str) -> SemVerRange:
@@ -224,22 +411,19 @@ def find_highest_compatible_version(versions: List[str], range_str: str) -> Opti
     
     try:
         range_obj = SemVerRange(range_str)
-        compatible_versions = []
-        
-        for version_str in versions:
-            try:
-                version = SemVer.parse(version_str)
-                if range_obj.satisfies(version):
-                    compatible_versions.append(version)
-            except OriginPkgError:
-                continue  # Skip invalid versions
-        
-        if not compatible_versions:
-            return None
-        
-        # Return the highest compatible version
-        highest = max(compatible_versions)
-        return str(highest)
+    except OriginPkgError:
+        return None
     
+    # One pass: parse (skipping invalid versions), filter and keep the highest
+    compatible_versions = (version for version in map(_parse_or_none, versions)
+                           if version is not None and range_obj.satisfies(version))
+    highest = max(compatible_versions, key=operator.attrgetter("sort_key"), default=None)
+    return str(highest) if highest is not None else None
+
+
+def _parse_or_none(version_str: str) -> Optional[SemVer]:
+    """Parse a version string, or get None if it is invalid."""
+    try:
+        return SemVer.parse(version_str)
     except OriginPkgError:
         return None 
\ No newline at end of file
@@ -0,0 +1,125 @@
+import os
+import pathlib
+import shutil
+import tempfile
+from typing import Optional
+from .errors import OriginPkgError
+
+# How libraries are placed in a project from the store
+LINK_MODES = ("auto", "hardlink", "symlink", "copy")
+
+
+def get_store_dir() -> pathlib.Path:
+    """Get the store location: ORIGIN_STORE_DIR, or ~/.origin/store."""
+    value = os.environ.get("ORIGIN_STORE_DIR")
+    if value:
+        return pathlib.Path(value).expanduser()
+    return pathlib.Path.home() / ".origin" / "store"
+
+
+def get_link_mode() -> str:
+    """Get the link mode from ORIGIN_LINK_MODE (default "auto")."""
+    mode = os.environ.get("ORIGIN_LINK_MODE") or "auto"
+    if mode not in LINK_MODES:
+        raise OriginPkgError(f"Invalid ORIGIN_LINK_MODE: {mode!r} (expected one of {', '.join(LINK_MODES)})")
+    return mode
+
+
+class PackageStore:
+    """
+    Content-addressable store of extracted packages, shared by all projects.
+    
+    Each package is kept once in ``<root>/<sha256>/<library>/``, keyed by the
+    checksum of its archive (the checksum recorded in origin.lock). Entries
+    are moved into place with a rename and never modified afterwards, so an
+    entry that exists is complete. Projects get hardlinks, a symlink or a
+    copy of the stored library instead of extracting their own.
+    """
+    
+    def __init__(self, root: Optional[pathlib.Path] = None):
+        """
+        Initialize the store.
+        
+        Args:
+            root: Store directory (defaults to ORIGIN_STORE_DIR or ~/.origin/store)
+        """
+        self.root = pathlib.Path(root) if root is not None else get_store_dir()
+    
+    def entry(self, checksum: str) -> pathlib.Path:
+        """Get the directory for an archive checksum."""
+        return self.root / checksum.lower()
+    
+    def has(self, checksum: str) -> bool:
+        """Check whether a package is in the store."""
+        return self.library(checksum) is not None
+    
+    def library(self, checksum: str) -> Optional[pathlib.Path]:
+        """Get the stored library for an archive checksum, or None if it is not stored."""
+        try:
+            items = list(self.entry(checksum).iterdir())
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return items[0] if len(items) == 1 and items[0].is_dir() else None
+    
+    def add(self, checksum: str, lib_dir: pathlib.Path) -> pathlib.Path:
+        """
+        Move an extracted library into the store.
+        
+        Does nothing if the checksum is already stored, for instance by
+        another install running at the same time.
+        
+        Returns:
+            The stored library
+        """
+        entry = self.entry(checksum)
+        if not entry.exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            temp = pathlib.Path(tempfile.mkdtemp(dir=self.root, prefix=".add-"))
+            try:
+                shutil.move(str(lib_dir), str(temp / lib_dir.name))
+                try:
+                    temp.rename(entry)
+                except OSError:
+                    if not entry.exists():
+                        raise
+            except OSError as e:
+                raise OriginPkgError(f"Failed to add {lib_dir.name} to the package store: {e}")
+            finally:
+                if temp.exists():
+                    shutil.rmtree(temp)
+        
+        library = self.library(checksum)
+        if library is None:
+            raise OriginPkgError(f"Corrupt package store entry: {entry}")
+        return library
+    
+    def link(self, checksum: str, dest: pathlib.Path, mode: str = "auto") -> None:
+        """
+        Place a stored library at ``dest``.
+        
+        Args:
+            checksum: Archive checksum of the library
+            dest: Path to create
+            mode: "hardlink" links every file, "symlink" links the directory,
+                  "copy" copies it, and "auto" hardlinks where possible and
+                  copies otherwise (e.g. when the store is on another filesystem)
+        """
+        library = self.library(checksum)
+        if library is None:
+            raise OriginPkgError(f"Package {checksum} is not in the store")
+        
+        try:
+            if mode == "symlink":
+                os.symlink(library, dest, target_is_directory=True)
+            elif mode == "copy":
+                shutil.copytree(library, dest)
+            else:
+                try:
+                    shutil.copytree(library, dest, copy_function=os.link)
+                except (shutil.Error, OSError):
+                    shutil.rmtree(dest, ignore_errors=True)
+                    if mode == "hardlink":
+                        raise
+                    shutil.copytree(library, dest)
+        except (shutil.Error, OSError) as e:
+            raise OriginPkgError(f"Failed to {mode} {library.name} from the package store: {e}")
@@ -1,6 +1,7 @@
 import pathlib
+import re
 import time
-from typing import Optional
+from typing import Optional, Union
 
 def generate_recording_filename(base_name: str, extension: str = ".orirec") -> str:
     """
@@ -32,4 +33,81 @@ def get_recording_path(script_path: pathlib.Path, output_dir: Optional[pathlib.P
     
     base_name = script_path.stem
     filename = generate_recording_filename(base_name)
-    return output_dir / filename 
\ No newline at end of file
+    return output_dir / filename
+
+
+class EventSlice:
+    """
+    A window of recording events.
+    
+    ``START:END`` selects events by index (END is exclusive). ``START..END``
+    selects events by block id, from the first event whose blockId is START
+    through the next event whose blockId is END. Either bound may be omitted.
+    
+    Block-id slices are stateful: use a fresh slice for each pass over events.
+    """
+    
+    def __init__(self, start: Optional[Union[int, str]] = None, end: Optional[Union[int, str]] = None,
+                 by_block: bool = False):
+        self.start = start
+        self.end = end
+        self.by_block = by_block
+        self._open = start is None
+        self._done = False
+    
+    @classmethod
+    def parse(cls, spec: str) -> 'EventSlice':
+        """
+        Parse a slice specification.
+        
+        Args:
+            spec: "START:END" (event indices) or "START..END" (block ids)
+        
+        Returns:
+            EventSlice for the given window
+        
+        Raises:
+            ValueError: If the specification is malformed
+        """
+        match = re.fullmatch(r'\s*(\d*)\s*:\s*(\d*)\s*', spec)
+        if match:
+            start = int(match.group(1)) if match.group(1) else None
+            end = int(match.group(2)) if match.group(2) else None
+            if start is not None and end is not None and end < start:
+                raise ValueError(f"Invalid slice '{spec}': END must not be before START")
+            return cls(start, end)
+        
+        if '..' in spec:
+            start, end = (part.strip() for part in spec.split('..', 1))
+            return cls(start or None, end or None, by_block=True)
+        
+        raise ValueError(f"Invalid slice '{spec}': use START:END (event indices) or START..END (block ids)")
+    
+    def contains(self, index: int, block_id: Optional[str]) -> bool:
+        """Check whether the event at ``index`` with ``block_id`` falls inside the window."""
+        if not self.by_block:
+            if self.start is not None and index < self.start:
+                return False
+            return self.end is None or index < self.end
+        
+        if self._done:
+            return False
+        if not self._open:
+            if block_id != self.start:
+                return False
+            self._open = True
+            return True
+        if self.end is not None and block_id == self.end:
+            self._done = True
+        return True
+    
+    def is_past(self, index: int) -> bool:
+        """Check whether no event at ``index`` or later can fall inside the window."""
+        if self.by_block:
+            return self._done
+        return self.end is not None and index >= self.end
+    
+    def __str__(self) -> str:
+        start = "" if self.start is None else str(self.start)
+        end = "" if self.end is None else str(self.end)
+        return f"{start}..{end}" if self.by_block else f"{start}:{end}"
\ No newline at end of file
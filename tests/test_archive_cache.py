@@ -0,0 +1,70 @@
+import hashlib
+import os
+
+import pytest
+from src.origin.archive_cache import ArchiveCache
+
+
+def _archive(tmp_path, name, data):
+    """Write an archive file and return it with its checksum."""
+    path = tmp_path / "downloads" / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(data)
+    return path, hashlib.sha256(data).hexdigest()
+
+
+class TestArchiveCache:
+    """Test caching package archives by checksum and URL."""
+    
+    def test_lookup_by_checksum_and_url(self, tmp_path):
+        cache = ArchiveCache(tmp_path / "cache")
+        path, checksum = _archive(tmp_path, "math-1.0.0.tar.gz", b"math")
+        cache.store("https://a/math-1.0.0.tar.gz", path, checksum)
+        
+        cached, cached_checksum = cache.lookup("https://a/math-1.0.0.tar.gz")
+        assert cached.name == "math-1.0.0.tar.gz"
+        assert cached.read_bytes() == b"math"
+        assert cached_checksum == checksum
+        
+        # A known checksum matches the content whatever URL it came from
+        assert cache.lookup("https://mirror/math.tar.gz", checksum.upper())[0] == cached
+        assert cache.lookup("https://a/other.tar.gz") is None
+        assert cache.lookup("https://a/math-1.0.0.tar.gz", "00" * 32) is None
+        assert (cache.hits, cache.misses) == (2, 2)
+    
+    def test_least_recently_used_are_evicted(self, tmp_path):
+        cache = ArchiveCache(tmp_path / "cache", max_bytes=250)
+        for index, name in enumerate(("a", "b", "c")):
+            path, checksum = _archive(tmp_path, f"{name}.tar.gz", name.encode() * 100)
+            cache.store(f"https://a/{name}.tar.gz", path, checksum)
+            archive, _ = cache.lookup(f"https://a/{name}.tar.gz")
+            os.utime(archive, (index, index))
+            if name == "b":
+                cache.lookup("https://a/a.tar.gz")  # Now newer than b
+        
+        assert cache.lookup("https://a/b.tar.gz") is None
+        assert cache.lookup("https://a/a.tar.gz") is not None
+        assert cache.lookup("https://a/c.tar.gz") is not None
+        assert cache.stats()["bytes"] == 200
+        assert len(list((tmp_path / "cache" / "urls").iterdir())) == 2
+    
+    def test_oversized_archives_are_not_stored(self, tmp_path):
+        cache = ArchiveCache(tmp_path / "cache", max_bytes=10)
+        path, checksum = _archive(tmp_path, "big.tar.gz", b"x" * 11)
+        cache.store("https://a/big.tar.gz", path, checksum)
+        assert cache.lookup("https://a/big.tar.gz") is None
+    
+    def test_prune_and_stats(self, tmp_path):
+        cache = ArchiveCache(tmp_path / "cache")
+        for name in ("a", "b"):
+            path, checksum = _archive(tmp_path, f"{name}.tar.gz", name.encode() * 10)
+            cache.store(f"https://a/{name}.tar.gz", path, checksum)
+        assert cache.stats()["archives"] == 2
+        assert cache.prune() == (0, 0)
+        
+        assert cache.prune(0) == (2, 20)
+        assert cache.stats()["archives"] == 0
+        assert cache.lookup("https://a/a.tar.gz") is None
+    
+    def test_stats_of_missing_cache(self, tmp_path):
+        assert ArchiveCache(tmp_path / "missing").stats()["archives"] == 0
@@ -0,0 +1,158 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+from src.origin.net import download
+from src.origin.policy import NetworkPolicy
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """Local stand-in package host that honours Range requests (except on /norange)."""
+    protocol_version = "HTTP/1.1"
+    data = bytes(range(256)) * 1024
+    ranges_seen = []
+    cut_after = None  # Drop the next response after this many bytes
+    cut_range_after = None  # Same, for the next Range request
+    lock = threading.Lock()
+    
+    def do_GET(self):
+        header = self.headers.get("Range")
+        with self.lock:
+            _RangeHandler.ranges_seen.append(header)
+            cut, _RangeHandler.cut_after = _RangeHandler.cut_after, None
+            if header and cut is None:
+                cut, _RangeHandler.cut_range_after = _RangeHandler.cut_range_after, None
+        
+        start, end, status = 0, len(self.data) - 1, 200
+        if header and self.path != "/norange":
+            first, _, last = header[len("bytes="):].partition("-")
+            start = int(first)
+            end = int(last) if last else end
+            if start >= len(self.data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(self.data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+        
+        body = self.data[start:end + 1]
+        self.send_response(status)
+        if self.path != "/norange":
+            self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(self.data)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if cut is not None:
+            self.wfile.write(body[:cut])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def package_host():
+    """Serve _RangeHandler on a free local port."""
+    _RangeHandler.ranges_seen = []
+    _RangeHandler.cut_after = None
+    _RangeHandler.cut_range_after = None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _policy():
+    return NetworkPolicy(sleep=lambda seconds: None)
+
+
+EXPECTED_DIGEST = hashlib.sha256(_RangeHandler.data).hexdigest()
+
+
+class TestResumableDownload:
+    """Test downloading into a .part file and resuming with Range requests."""
+    
+    def test_download_returns_digest(self, package_host, tmp_path):
+        """Test that the file is moved into place and its SHA-256 returned."""
+        dest = tmp_path / "pkg.tar.gz"
+        digest = download(f"{package_host}/pkg.tar.gz", dest, progress=False, policy=_policy(), connections=1)
+        assert digest == EXPECTED_DIGEST
+        assert dest.read_bytes() == _RangeHandler.data
+        assert list(tmp_path.iterdir()) == [dest]
+    
+    def test_dropped_connection_is_resumed(self, package_host, tmp_path):
+        """Test that a retry asks only for the bytes that were not received."""
+        _RangeHandler.cut_after = 1000
+        dest = tmp_path / "pkg.tar.gz"
+        digest = download(f"{package_host}/pkg.tar.gz", dest, progress=False, policy=_policy(), connections=1)
+        assert _RangeHandler.ranges_seen == [None, "bytes=1000-"]
+        assert digest == EXPECTED_DIGEST
+        assert dest.read_bytes() == _RangeHandler.data
+    
+    def test_earlier_partial_download_is_resumed(self, package_host, tmp_path):
+        """Test that a .part file left by an earlier run is continued."""
+        dest = tmp_path / "pkg.tar.gz"
+        (tmp_path / "pkg.tar.gz.part").write_bytes(_RangeHandler.data[:5000])
+        digest = download(f"{package_host}/pkg.tar.gz", dest, progress=False, policy=_policy(), connections=1)
+        assert _RangeHandler.ranges_seen == ["bytes=5000-"]
+        assert digest == EXPECTED_DIGEST
+    
+    def test_server_without_ranges_restarts(self, package_host, tmp_path):
+        """Test that a full response to a Range request replaces the partial file."""
+        dest = tmp_path / "pkg.tar.gz"
+        (tmp_path / "pkg.tar.gz.part").write_bytes(b"stale")
+        digest = download(f"{package_host}/norange", dest, progress=False, policy=_policy(), connections=1)
+        assert digest == EXPECTED_DIGEST
+        assert dest.read_bytes() == _RangeHandler.data
+    
+    def test_unsatisfiable_range_restarts(self, package_host, tmp_path):
+        """Test that a partial file longer than the file on the server is discarded."""
+        dest = tmp_path / "pkg.tar.gz"
+        (tmp_path / "pkg.tar.gz.part").write_bytes(b"x" * (len(_RangeHandler.data) + 10))
+        digest = download(f"{package_host}/pkg.tar.gz", dest, progress=False, policy=_policy(), connections=1)
+        assert _RangeHandler.ranges_seen == [f"bytes={len(_RangeHandler.data) + 10}-", None]
+        assert digest == EXPECTED_DIGEST
+
+
+class TestParallelDownload:
+    """Test fetching large files as parallel ranges."""
+    
+    @pytest.fixture(autouse=True)
+    def small_threshold(self):
+        with patch('src.origin.net.PARALLEL_DOWNLOAD_MIN_SIZE', 1024):
+            yield
+    
+    def test_parallel_download(self, package_host, tmp_path):
+        """Test that ranges are fetched separately and joined in order."""
+        dest = tmp_path / "pkg.tar.gz"
+        digest = download(f"{package_host}/pkg.tar.gz", dest, progress=False, policy=_policy(), connections=4)
+        assert sorted(_RangeHandler.ranges_seen[1:]) == [
+            "bytes=0-65535", "bytes=131072-196607", "bytes=196608-262143", "bytes=65536-131071"
+        ]
+        assert digest == EXPECTED_DIGEST
+        assert dest.read_bytes() == _RangeHandler.data
+        assert list(tmp_path.iterdir()) == [dest]
+    
+    def test_failed_range_is_resumed(self, package_host, tmp_path):
+        """Test that a retry only requests what is missing from an interrupted range."""
+        dest = tmp_path / "pkg.tar.gz"
+        _RangeHandler.cut_range_after = 100
+        digest = download(f"{package_host}/pkg.tar.gz", dest, progress=False, policy=_policy(), connections=2)
+        assert digest == EXPECTED_DIGEST
+        assert dest.read_bytes() == _RangeHandler.data
+        # One probe, two ranges, and the rest of the range that was cut
+        assert len(_RangeHandler.ranges_seen) == 4
+        assert _RangeHandler.ranges_seen[-1] in ("bytes=100-131071", "bytes=131172-262143")
+    
+    def test_disabled_with_one_connection(self, package_host, tmp_path):
+        """Test that connections=1 downloads in a single request."""
+        download(f"{package_host}/pkg.tar.gz", tmp_path / "pkg.tar.gz", progress=False, policy=_policy(), connections=1)
+        assert _RangeHandler.ranges_seen == [None]
@@ -0,0 +1,83 @@
+import hashlib
+import io
+import tarfile
+import zipfile
+
+import pytest
+from src.origin.archive import extract_archive
+from src.origin.hashing import HASH_BLOCK_SIZE, HashingReader, HashingWriter, file_digest, file_hasher
+
+
+DATA = bytes(range(256)) * (HASH_BLOCK_SIZE // 256 * 2 + 3)
+
+
+class TestFileDigest:
+    """Test hashing files in blocks."""
+    
+    def test_matches_whole_file_hash(self, tmp_path):
+        """Test a file spanning several blocks."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(DATA)
+        assert file_digest(path) == hashlib.sha256(DATA).hexdigest()
+        assert file_digest(path, "md5") == hashlib.md5(DATA).hexdigest()
+    
+    def test_without_hashlib_file_digest(self, tmp_path, monkeypatch):
+        """Test the fallback for Pythons without hashlib.file_digest."""
+        monkeypatch.delattr(hashlib, "file_digest", raising=False)
+        path = tmp_path / "data.bin"
+        path.write_bytes(DATA)
+        assert file_digest(path) == hashlib.sha256(DATA).hexdigest()
+    
+    def test_hasher_can_be_continued(self, tmp_path):
+        """Test that the returned hasher keeps accepting data."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"partial ")
+        hasher = file_hasher(path)
+        hasher.update(b"download")
+        assert hasher.hexdigest() == hashlib.sha256(b"partial download").hexdigest()
+
+
+class TestHashingStreams:
+    """Test hashing data as it is read or written."""
+    
+    def test_reader(self):
+        """Test that reads, and whatever is drained afterwards, are hashed."""
+        reader = HashingReader(io.BytesIO(DATA))
+        assert reader.read(10) == DATA[:10]
+        reader.drain()
+        assert reader.hexdigest() == hashlib.sha256(DATA).hexdigest()
+    
+    def test_writer(self):
+        """Test that writes reach the file and the hash."""
+        out = io.BytesIO()
+        writer = HashingWriter(out)
+        writer.write(DATA[:100])
+        writer.write(DATA[100:])
+        assert out.getvalue() == DATA
+        assert writer.hexdigest() == hashlib.sha256(DATA).hexdigest()
+
+
+class TestExtractDigest:
+    """Test that extracting an archive also checksums it."""
+    
+    @pytest.mark.parametrize("name, mode", [("lib.tar.gz", "w:gz"), ("lib.tar", "w")])
+    def test_tar(self, tmp_path, name, mode):
+        source = tmp_path / "lib"
+        source.mkdir()
+        (source / "lib.origin").write_bytes(DATA)
+        archive = tmp_path / name
+        with tarfile.open(archive, mode) as tar:
+            tar.add(source, arcname="lib")
+        
+        digest = extract_archive(archive, tmp_path / "out")
+        assert digest == hashlib.sha256(archive.read_bytes()).hexdigest()
+        assert (tmp_path / "out" / "lib" / "lib.origin").read_bytes() == DATA
+    
+    def test_zip(self, tmp_path):
+        archive = tmp_path / "lib.zip"
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            zip_file.writestr("lib/lib.origin", "say 1")
+        
+        digest = extract_archive(archive, tmp_path / "out")
+        assert digest == hashlib.sha256(archive.read_bytes()).hexdigest()
+        assert (tmp_path / "out" / "lib" / "lib.origin").read_text() == "say 1"
@@ -1,9 +1,71 @@
+import json
 import pytest
 import responses
 import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch
-from src.origin.runtime.net import safe_http_get, validate_url, get_max_fetch_bytes
+from src.origin.runtime.net import safe_http_get, iter_http_get, http_get_many, http_get_json, iter_http_get_json, http_get_async, await_http, await_all, validate_url, get_max_fetch_bytes, HTTPClient, get_http_pool_size
+from src.origin.runtime.http_cache import HTTPCache
+from src.origin.runtime.net_replay import NetReplay
+from src.origin.recorder import Recorder
+from src.origin.replayer import Replayer
 from src.origin.errors import OriginError
+from src.origin.evaluator import Evaluator
+import lexer
+import parser
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    """Local stand-in API that keeps connections open between requests."""
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+    
+    # Extra response headers per path, for cache tests
+    CACHE_HEADERS = {
+        "/fresh": {"Cache-Control": "max-age=60"},
+        "/etag": {"ETag": '"v1"', "Cache-Control": "no-cache"},
+        "/nostore": {"Cache-Control": "no-store", "ETag": '"v1"'},
+        "/plain": {},
+    }
+    
+    def do_GET(self):
+        _KeepAliveHandler.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            return
+        if self.path.startswith("/slow/"):
+            time.sleep(0.2)
+        if self.path.startswith("/big/"):
+            body = "é".encode("utf-8") * int(self.path[len("/big/"):])
+        elif self.path.startswith("/json/"):
+            count = int(self.path[len("/json/"):])
+            body = json.dumps([{"id": i} for i in range(count)]).encode("utf-8")
+        else:
+            body = f"hello {self.path}".encode("utf-8")
+        self.send_response(404 if self.path == "/missing" else 200)
+        for name, value in self.CACHE_HEADERS.get(self.path.split("?")[0], {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """Serve _KeepAliveHandler on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
 
 
 class TestHTTPValidation:
@@ -162,6 +224,296 @@ class TestHTTPGet:
                 safe_http_get("https://api.example.com/data")
 
 
+class TestHTTPClient:
+    """Test the connection-pooled HTTP client."""
+    
+    def test_connections_are_reused(self, local_server):
+        """Test that repeated requests to one host share a connection."""
+        client = HTTPClient()
+        try:
+            results = [safe_http_get(f"{local_server}/item/{i}", client=client) for i in range(20)]
+            assert results[3] == "hello /item/3"
+            assert client.stats() == {"requests": 20, "connections": 1, "reused": 19}
+        finally:
+            client.close()
+    
+    def test_idle_connections_are_dropped(self, local_server):
+        """Test that the pool is reset after the idle timeout."""
+        client = HTTPClient(idle_timeout=0)
+        try:
+            safe_http_get(f"{local_server}/a", client=client)
+            safe_http_get(f"{local_server}/b", client=client)
+            assert client.stats()["connections"] == 2
+        finally:
+            client.close()
+    
+    def test_error_status_releases_connection(self, local_server):
+        """Test that non-2xx responses still raise with a pooled client."""
+        client = HTTPClient()
+        try:
+            with pytest.raises(OriginError, match="HTTP 404"):
+                safe_http_get(f"{local_server}/missing", client=client)
+            assert safe_http_get(f"{local_server}/ok", client=client) == "hello /ok"
+        finally:
+            client.close()
+    
+    def test_stats_before_first_request(self):
+        """Test that an unused client reports no activity."""
+        assert HTTPClient().stats() == {"requests": 0, "connections": 0, "reused": 0}
+
+
+class TestStreamingGet:
+    """Test streaming and large-body reads."""
+    
+    def test_iter_http_get_decodes_split_characters(self, local_server):
+        """Test that multi-byte characters split across chunks decode correctly."""
+        pieces = list(iter_http_get(f"{local_server}/big/5", chunk_size=3))
+        assert len(pieces) > 1
+        assert "".join(pieces) == "é" * 5
+    
+    def test_large_body(self, local_server):
+        """Test reading a multi-megabyte body."""
+        assert safe_http_get(f"{local_server}/big/1000000") == "é" * 1000000
+    
+    def test_iter_http_get_enforces_size_limit(self, local_server):
+        """Test that the size limit applies while streaming."""
+        with patch.dict(os.environ, {"ORIGIN_MAX_FETCH_BYTES": "10"}):
+            with pytest.raises(OriginError, match="Response too large"):
+                list(iter_http_get(f"{local_server}/big/100"))
+
+
+class TestHTTPGetMany:
+    """Test concurrent fetching of many URLs."""
+    
+    def test_results_in_order_with_errors(self, local_server):
+        """Test that results keep URL order and failures are reported per URL."""
+        urls = [f"{local_server}/a", f"{local_server}/missing", "ftp://example.com/x", f"{local_server}/b"]
+        results = http_get_many(urls, 4)
+        
+        assert [r["url"] for r in results] == urls
+        assert results[0] == {"url": urls[0], "body": "hello /a", "error": None}
+        assert results[1]["body"] is None and "HTTP 404" in results[1]["error"]
+        assert "not allowed" in results[2]["error"] or "Only HTTP" in results[2]["error"]
+        assert results[3]["body"] == "hello /b"
+    
+    def test_requests_run_concurrently(self, local_server):
+        """Test that slow requests overlap instead of running back to back."""
+        client = HTTPClient(pool_size=8)
+        try:
+            start = time.perf_counter()
+            results = http_get_many([f"{local_server}/slow/{i}" for i in range(8)], 8, client=client)
+            elapsed = time.perf_counter() - start
+        finally:
+            client.close()
+        
+        assert all(r["error"] is None for r in results)
+        assert elapsed < 8 * 0.2 / 2
+    
+    def test_rejects_single_url(self):
+        """Test that a bare string is not mistaken for a list of URLs."""
+        with pytest.raises(OriginError, match="list of URLs"):
+            http_get_many("https://api.example.com/data")
+
+
+class TestHTTPGetAsync:
+    """Test background requests joined with await and await_all."""
+    
+    @pytest.fixture
+    def client(self):
+        client = HTTPClient()
+        yield client
+        client.close()
+    
+    def test_requests_overlap(self, local_server, client):
+        """Test that the caller keeps running while requests are in flight."""
+        start = time.monotonic()
+        handles = [http_get_async(f"{local_server}/slow/{i}", client=client) for i in range(4)]
+        assert time.monotonic() - start < 0.1
+        assert await_all(handles) == [f"hello /slow/{i}" for i in range(4)]
+        assert time.monotonic() - start < 0.6
+    
+    def test_errors_raised_on_await(self, local_server, client):
+        """Test that a failed request raises when it is awaited."""
+        handle = http_get_async(f"{local_server}/missing", client=client)
+        with pytest.raises(OriginError, match="HTTP 404"):
+            await_http(handle)
+        with pytest.raises(OriginError, match="HTTP 404"):
+            await_all([http_get_async(f"{local_server}/a", client=client), handle])
+    
+    def test_await_requires_handle(self):
+        """Test that await rejects values that are not request handles."""
+        with pytest.raises(OriginError, match="http_get_async"):
+            await_http("body")
+        with pytest.raises(OriginError, match="list of handles"):
+            await_all("body")
+    
+    def test_origin_await(self, local_server):
+        """Test http_get_async and await from Origin code."""
+        source = f"""
+let h = http_get_async("{local_server}/a")
+let hs = [http_get_async("{local_server}/b"), http_get_async("{local_server}/c")]
+let a = await(h)
+let rest = await_all(hs)
+let text = "await(h)"
+"""
+        variables = {}
+        evaluator = Evaluator()
+        try:
+            evaluator.execute(parser.parse(lexer.tokenize(source)), net_allowed=True, variables=variables)
+        finally:
+            evaluator.close()
+        assert variables["a"] == "hello /a"
+        assert variables["rest"] == ["hello /b", "hello /c"]
+        assert variables["text"] == "await(h)"
+
+
+class TestHTTPGetJSON:
+    """Test fetching and parsing JSON responses."""
+    
+    def test_http_get_json(self, local_server):
+        """Test that the body is returned parsed."""
+        assert http_get_json(f"{local_server}/json/3") == [{"id": 0}, {"id": 1}, {"id": 2}]
+    
+    def test_invalid_json(self, local_server):
+        """Test that non-JSON bodies raise OriginError."""
+        with pytest.raises(OriginError, match="Invalid JSON"):
+            http_get_json(f"{local_server}/plain")
+    
+    def test_iter_http_get_json_streams_elements(self, local_server):
+        """Test that array elements are parsed from the response stream."""
+        client = HTTPClient()
+        try:
+            # Several read chunks long, so elements are split across chunks
+            items = iter_http_get_json(f"{local_server}/json/50000", client=client)
+            assert sum(item["id"] for item in items) == sum(range(50000))
+        finally:
+            client.close()
+    
+    def test_origin_callback(self, local_server):
+        """Test calling a user-defined function on each element from Origin code."""
+        source = f"""
+define keep(item):
+    item["id"]
+let count = http_get_json("{local_server}/json/4", keep)
+"""
+        variables = {}
+        Evaluator().execute(parser.parse(lexer.tokenize(source)), net_allowed=True, variables=variables)
+        assert variables["count"] == 4
+
+
+class TestHTTPCache:
+    """Test the on-disk HTTP response cache."""
+    
+    @pytest.fixture
+    def client(self, tmp_path):
+        _KeepAliveHandler.requests_seen = []
+        client = HTTPClient(cache=HTTPCache(tmp_path / "http-cache"))
+        yield client
+        client.close()
+    
+    def test_fresh_response_served_from_cache(self, local_server, client):
+        """Test that max-age responses are reused without a request."""
+        assert safe_http_get(f"{local_server}/fresh", client=client) == "hello /fresh"
+        assert safe_http_get(f"{local_server}/fresh", client=client) == "hello /fresh"
+        assert len(_KeepAliveHandler.requests_seen) == 1
+        assert client.cache.stats() == {"hits": 1, "revalidated": 0, "misses": 1}
+    
+    def test_etag_revalidation(self, local_server, client):
+        """Test that stale entries are revalidated with If-None-Match."""
+        assert safe_http_get(f"{local_server}/etag", client=client) == "hello /etag"
+        assert safe_http_get(f"{local_server}/etag", client=client) == "hello /etag"
+        assert _KeepAliveHandler.requests_seen == [("/etag", None), ("/etag", '"v1"')]
+        assert client.cache.stats()["revalidated"] == 1
+    
+    def test_uncacheable_responses(self, local_server, client):
+        """Test that no-store and validator-less responses are not cached."""
+        for path in ("/nostore", "/plain"):
+            safe_http_get(f"{local_server}{path}", client=client)
+            safe_http_get(f"{local_server}{path}", client=client)
+        assert len(_KeepAliveHandler.requests_seen) == 4
+        assert not list(client.cache.root.glob("*.json"))
+    
+    def test_request_headers_are_part_of_the_key(self, local_server, client):
+        """Test that requests with different headers are cached separately."""
+        safe_http_get(f"{local_server}/fresh", {"Accept": "text/plain"}, client=client)
+        safe_http_get(f"{local_server}/fresh", {"Accept": "text/html"}, client=client)
+        assert len(_KeepAliveHandler.requests_seen) == 2
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used entries are evicted over the size limit."""
+        cache = HTTPCache(tmp_path, max_bytes=25)
+        headers = {"Cache-Control": "max-age=60"}
+        cache.store("http://a", {}, headers, "a" * 10)
+        cache.store("http://b", {}, headers, "b" * 10)
+        os.utime(tmp_path / f"{cache._key('http://a', {})}.json", (0, 0))
+        os.utime(tmp_path / f"{cache._key('http://b', {})}.json", (1, 1))
+        cache.lookup("http://a", {})  # a is now the most recently used
+        cache.store("http://c", {}, headers, "c" * 10)
+        
+        assert cache.lookup("http://a", {}) is not None
+        assert cache.lookup("http://b", {}) is None
+        assert cache.lookup("http://c", {}) is not None
+    
+    def test_expires_header(self, tmp_path):
+        """Test freshness from an Expires date."""
+        cache = HTTPCache(tmp_path)
+        cache.store("http://past", {}, {"Expires": "Wed, 21 Oct 2015 07:28:00 GMT", "ETag": '"x"'}, "old")
+        cache.store("http://future", {}, {"Expires": "Wed, 21 Oct 2099 07:28:00 GMT"}, "new")
+        assert not cache.lookup("http://past", {}).is_fresh()
+        assert cache.lookup("http://future", {}).is_fresh()
+
+
+class TestNetRecordReplay:
+    """Test recording http_get exchanges and serving them back with --replay-net."""
+    
+    def _record(self, tmp_path, local_server):
+        path = tmp_path / "run.orirec"
+        recorder = Recorder(path)
+        client = HTTPClient(recorder=recorder)
+        try:
+            safe_http_get(f"{local_server}/a?n=1", client=client)
+            recorder.record("SayNode:a", {"variables": {}, "functions": []})
+            safe_http_get(f"{local_server}/a?n=1", {"Accept": "text/plain"}, client=client)
+            with pytest.raises(OriginError):
+                safe_http_get(f"{local_server}/missing", client=client)
+        finally:
+            client.close()
+            recorder.close()
+        return path
+    
+    def test_exchanges_are_recorded_apart_from_steps(self, tmp_path, local_server):
+        """Test that net lines are written but not loaded as steps."""
+        replayer = Replayer.from_file(self._record(tmp_path, local_server))
+        assert len(replayer.events) == 1
+        assert [e["seq"] for e in replayer.net_events] == [0, 1, 1]
+        assert replayer.net_events[1]["headers"] == {"Accept": "text/plain"}
+        assert replayer.net_events[2]["error"] == "HTTP 404: Not Found"
+    
+    def test_replay_serves_recorded_responses(self, tmp_path, local_server):
+        """Test that replayed requests return recorded bodies and errors without the network."""
+        replay = NetReplay.from_file(self._record(tmp_path, local_server))
+        client = HTTPClient(replay=replay)
+        _KeepAliveHandler.requests_seen = []
+        
+        assert safe_http_get(f"{local_server}/a?n=1", {"Accept": "text/plain"}, client=client) == "hello /a?n=1"
+        assert safe_http_get(f"{local_server}/a?n=1", client=client) == "hello /a?n=1"
+        with pytest.raises(OriginError, match="HTTP 404"):
+            safe_http_get(f"{local_server}/missing", client=client)
+        assert _KeepAliveHandler.requests_seen == []
+        assert client.stats()["requests"] == 0
+    
+    def test_repeated_requests_replay_in_order(self):
+        """Test that each recorded response is served once, in recording order."""
+        replay = NetReplay([
+            {"kind": "net", "url": "http://x/poll", "headers": {}, "body": "pending"},
+            {"kind": "net", "url": "http://x/poll", "headers": {}, "body": "done"},
+        ])
+        assert replay.respond("http://x/poll") == "pending"
+        assert replay.respond("http://x/poll") == "done"
+        with pytest.raises(OriginError, match="No recorded response"):
+            replay.respond("http://x/poll")
+
+
 class TestEnvironmentConfig:
     """Test environment variable configuration."""
     
@@ -173,4 +525,10 @@ class TestEnvironmentConfig:
     def test_custom_max_fetch_bytes(self):
         """Test custom max fetch bytes from environment."""
         with patch.dict(os.environ, {"ORIGIN_MAX_FETCH_BYTES": "1048576"}):
-            assert get_max_fetch_bytes() == 1024 * 1024  # 1MB 
\ No newline at end of file
+            assert get_max_fetch_bytes() == 1024 * 1024  # 1MB
+    
+    def test_custom_http_pool_size(self):
+        """Test HTTP pool size from environment."""
+        with patch.dict(os.environ, {"ORIGIN_HTTP_POOL_SIZE": "4"}):
+            assert get_http_pool_size() == 4
+            assert HTTPClient().pool_size == 4 
\ No newline at end of file
@@ -0,0 +1,282 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from src.origin.errors import OriginPkgError
+from src.origin.pkgmgr import PackageManager
+from src.origin.registry import Registry
+
+
+def _archive(lib_name: str, source: str, manifest=None) -> bytes:
+    """A .tar.gz holding one library directory with a single file, and optionally its pkg.json."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        files = {f"{lib_name}.origin": source}
+        if manifest is not None:
+            files["pkg.json"] = json.dumps(manifest)
+        for filename, text in files.items():
+            data = text.encode("utf-8")
+            info = tarfile.TarInfo(f"{lib_name}/{filename}")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class _ArchiveHandler(BaseHTTPRequestHandler):
+    """Local stand-in package host serving the archives in ``files``."""
+    files = {}
+    
+    def do_GET(self):
+        body = self.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def package_host():
+    """Serve _ArchiveHandler on a free local port."""
+    _ArchiveHandler.files = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ArchiveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestInstall:
+    """Test installing every dependency in pkg.json."""
+    
+    @pytest.fixture(autouse=True)
+    def project(self, tmp_path, monkeypatch, package_host):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("ORIGIN_STORE_DIR", str(tmp_path / "store"))
+        monkeypatch.setenv("ORIGIN_ARCHIVE_CACHE_DIR", str(tmp_path / "archives"))
+        self.root = tmp_path
+        self.host = package_host
+        self.registry = {}
+    
+    def publish(self, name, version, source=None, dependencies=None):
+        """Put a package on the host and in the registry."""
+        lib_name = name.split("/")[-1]
+        path = f"/{lib_name}-{version}.tar.gz"
+        manifest = {"name": name, "version": version, "dependencies": dependencies} if dependencies else None
+        _ArchiveHandler.files[path] = _archive(lib_name, source or f"say \"{name} {version}\"", manifest)
+        self.registry[f"{name}@{version}"] = f"{self.host}{path}"
+    
+    def manager(self, dependencies):
+        (self.root / "pkg.json").write_text(json.dumps({"name": "app", "dependencies": dependencies}))
+        (self.root / "registry.json").write_text(json.dumps(self.registry))
+        pm = PackageManager(self.root)
+        pm.registry = Registry(self.root / "registry.json")
+        return pm
+    
+    def test_install_all_dependencies(self):
+        """Test that every dependency is resolved, installed and locked with its URL."""
+        for name in ("std/math", "std/text", "net"):
+            self.publish(name, "1.0.0")
+            self.publish(name, "1.1.0")
+        self.publish("std/math", "2.0.0")
+        
+        pm = self.manager({"std/math": "^1.0.0", "std/text": "~1.0.0", "net": ">=1.0.0"})
+        writes = []
+        write = pm.lockfile._write
+        pm.lockfile._write = lambda data: (writes.append(data), write(data))
+        pm.install(jobs=3)
+        assert len(writes) == 1
+        
+        libs = self.root / ".origin" / "libs"
+        assert sorted(p.name for p in libs.iterdir()) == ["math", "net", "text"]
+        assert (libs / "math" / "math.origin").read_text() == 'say "std/math 1.1.0"'
+        locked = json.loads((self.root / "origin.lock").read_text())["packages"]
+        assert locked["std/text"]["version"] == "1.0.0"
+        assert locked["std/math"]["url"] == self.registry["std/math@1.1.0"]
+        assert locked["net"]["checksum"] == hashlib.sha256(_ArchiveHandler.files["/net-1.1.0.tar.gz"]).hexdigest()
+        assert not [p for p in (self.root / ".origin").iterdir() if p.name.startswith(".install-")]
+    
+    def test_transitive_dependencies(self):
+        """Test that dependencies in packages' own pkg.json are installed and locked."""
+        self.publish("std/text", "1.0.0")
+        self.publish("std/text", "2.0.0")
+        self.publish("ui", "1.0.0", dependencies={"std/text": "^1.0.0"})
+        pm = self.manager({"ui": "^1.0.0"})
+        pm.install()
+        
+        libs = self.root / ".origin" / "libs"
+        assert sorted(p.name for p in libs.iterdir()) == ["text", "ui"]
+        locked = json.loads((self.root / "origin.lock").read_text())["packages"]
+        assert locked["std/text"]["version"] == "1.0.0"
+        assert locked["ui"]["dependencies"] == {"std/text": "^1.0.0"}
+        
+        # The locked dependencies are used without reading the archive again
+        _ArchiveHandler.files.clear()
+        shutil.rmtree(self.root / "archives")
+        pm = self.manager({"ui": "^1.0.0"})
+        assert [(p.name, p.version) for p in pm.plan_install()] == [("std/text", "1.0.0"), ("ui", "1.0.0")]
+    
+    def test_locked_version_is_kept(self):
+        """Test that a locked version still satisfying pkg.json is installed over newer ones."""
+        self.publish("std/math", "1.0.0")
+        pm = self.manager({"std/math": "^1.0.0"})
+        pm.install()
+        
+        self.publish("std/math", "1.2.0")
+        pm = self.manager({"std/math": "^1.0.0"})
+        assert [(p.name, p.version) for p in pm.plan_install()] == [("std/math", "1.0.0")]
+        
+        pm = self.manager({"std/math": "^1.2.0"})
+        assert [(p.name, p.version) for p in pm.plan_install()] == [("std/math", "1.2.0")]
+    
+    def test_failure_changes_nothing(self):
+        """Test that one failed package leaves installed libraries and the lockfile alone."""
+        self.publish("std/math", "1.0.0")
+        pm = self.manager({"std/math": "^1.0.0"})
+        pm.install()
+        lock = (self.root / "origin.lock").read_text()
+        
+        self.publish("std/math", "1.1.0", 'say "new"')
+        self.publish("gone", "1.0.0")
+        del _ArchiveHandler.files["/gone-1.0.0.tar.gz"]
+        pm = self.manager({"std/math": "^1.1.0", "gone": "^1.0.0"})
+        with pytest.raises(OriginPkgError, match="gone@1.0.0"):
+            pm.install()
+        
+        assert (self.root / ".origin" / "libs" / "math" / "math.origin").read_text() == 'say "std/math 1.0.0"'
+        assert (self.root / "origin.lock").read_text() == lock
+    
+    def test_locked_checksum_is_verified(self):
+        """Test that an archive no longer matching its locked checksum is rejected."""
+        self.publish("std/math", "1.0.0")
+        pm = self.manager({"std/math": "^1.0.0"})
+        pm.install()
+        
+        self.publish("std/math", "1.0.0", 'say "tampered"')
+        shutil.rmtree(self.root / "store")
+        shutil.rmtree(self.root / "archives")
+        pm = self.manager({"std/math": "^1.0.0"})
+        with pytest.raises(OriginPkgError, match="Checksum verification failed"):
+            pm.install()
+    
+    def test_unresolvable_dependencies_are_listed(self):
+        """Test that every missing dependency is reported at once."""
+        self.publish("std/math", "1.0.0")
+        pm = self.manager({"std/math": "^2.0.0", "missing": "^1.0.0"})
+        with pytest.raises(OriginPkgError, match=r"missing@\^1.0.0, std/math@\^2.0.0"):
+            pm.install()
+    
+    def test_second_checkout_uses_the_store(self, monkeypatch):
+        """Test that a locked package in the store is linked without downloading it."""
+        self.publish("std/math", "1.0.0")
+        pm = self.manager({"std/math": "^1.0.0"})
+        pm.install()
+        
+        checkout = self.root / "checkout"
+        checkout.mkdir()
+        shutil.copy(self.root / "pkg.json", checkout)
+        shutil.copy(self.root / "origin.lock", checkout)
+        monkeypatch.chdir(checkout)
+        _ArchiveHandler.files.clear()  # Any download would now fail
+        
+        PackageManager(checkout).install()
+        installed = checkout / ".origin" / "libs" / "math" / "math.origin"
+        assert installed.read_text() == 'say "std/math 1.0.0"'
+        assert os.path.samefile(installed, self.root / ".origin" / "libs" / "math" / "math.origin")
+    
+    def test_symlink_installs_can_be_removed(self, monkeypatch):
+        monkeypatch.setenv("ORIGIN_LINK_MODE", "symlink")
+        self.publish("std/math", "1.0.0")
+        pm = self.manager({"std/math": "^1.0.0"})
+        pm.install()
+        lib = self.root / ".origin" / "libs" / "math"
+        assert lib.is_symlink()
+        
+        pm.install()  # Reinstalling replaces the link
+        pm.remove("math")
+        assert not os.path.lexists(lib)
+        assert (self.root / "store").exists()
+    
+    def test_frozen_install_skips_installed_packages(self):
+        """Test that --frozen keeps unchanged libraries without the registry, the store or origin.lock writes."""
+        self.publish("std/math", "1.0.0")
+        self.publish("ui", "1.0.0", dependencies={"std/math": "^1.0.0"})
+        self.manager({"ui": "^1.0.0"}).install()
+        lock = (self.root / "origin.lock").read_text()
+        
+        self.registry.clear()  # The registry is not consulted
+        pm = self.manager({"ui": "^1.0.0"})
+        pm.store.link = None  # Nor is anything linked again
+        pm.install(frozen=True)
+        assert (self.root / "origin.lock").read_text() == lock
+    
+    def test_frozen_install_repairs_and_fetches(self):
+        """Test that --frozen relinks changed libraries from the store and fetches missing packages."""
+        self.publish("std/math", "1.0.0")
+        self.publish("std/text", "1.0.0")
+        self.manager({"std/math": "^1.0.0", "std/text": "^1.0.0"}).install()
+        libs = self.root / ".origin" / "libs"
+        (libs / "math" / "math.origin").unlink()
+        (libs / "math" / "math.origin").write_text("edited")
+        shutil.rmtree(libs / "text")
+        shutil.rmtree(self.root / "store" / json.loads((self.root / "origin.lock").read_text())
+                      ["packages"]["std/text"]["checksum"])
+        shutil.rmtree(self.root / "archives")
+        
+        self.registry.clear()
+        pm = self.manager({"std/math": "^1.0.0", "std/text": "^1.0.0"})
+        pm.install(jobs=2, frozen=True)
+        assert (libs / "math" / "math.origin").read_text() == 'say "std/math 1.0.0"'
+        assert (libs / "text" / "text.origin").read_text() == 'say "std/text 1.0.0"'
+    
+    def test_frozen_install_requires_matching_lock(self):
+        """Test that --frozen refuses a lockfile that does not satisfy pkg.json."""
+        self.publish("std/math", "1.0.0")
+        self.manager({"std/math": "^1.0.0"}).install()
+        
+        pm = self.manager({"std/math": "^2.0.0", "std/text": "^1.0.0"})
+        with pytest.raises(OriginPkgError, match="std/math is locked at 1.0.0.*\n.*std/text is not locked"):
+            pm.install(frozen=True)
+    
+    def test_add_reinstalls_locked_version(self):
+        """Test that adding a locked package installs the locked URL and verifies its checksum."""
+        self.publish("std/math", "1.0.0")
+        self.manager({"std/math": "^1.0.0"}).install()
+        shutil.rmtree(self.root / ".origin" / "libs" / "math")
+        
+        self.publish("std/math", "1.1.0")
+        self.manager({"std/math": "^1.0.0"}).add("std/math@^1.0.0")
+        math = self.root / ".origin" / "libs" / "math" / "math.origin"
+        assert math.read_text() == 'say "std/math 1.0.0"'
+    
+    def test_offline_install_from_archive_cache(self):
+        """Test that --offline installs locked packages from cached archives only."""
+        self.publish("std/math", "1.0.0")
+        self.publish("std/text", "1.0.0")
+        pm = self.manager({"std/math": "^1.0.0"})
+        pm.install()
+        shutil.rmtree(self.root / "store")
+        shutil.rmtree(self.root / ".origin" / "libs")
+        _ArchiveHandler.files.clear()
+        
+        pm = self.manager({"std/math": "^1.0.0"})
+        pm.offline = True
+        pm.install()
+        assert (self.root / ".origin" / "libs" / "math" / "math.origin").exists()
+        
+        pm = self.manager({"std/math": "^1.0.0", "std/text": "^1.0.0"})
+        pm.offline = True
+        with pytest.raises(OriginPkgError, match="not in the archive cache"):
+            pm.install()
@@ -1,5 +1,6 @@
+import json
 import pytest
-from src.origin.builtins.json import parse
+from src.origin.builtins.json import parse, iter_array
 from src.origin.errors import OriginError
 
 
@@ -179,4 +180,40 @@ class TestJSONParseErrors:
     def test_invalid_json_invalid_escape(self):
         """Test error on invalid escape sequences."""
         with pytest.raises(OriginError, match="Invalid JSON"):
-            parse('"string with \\x invalid escape"') 
\ No newline at end of file
+            parse('"string with \\x invalid escape"')
+
+
+class TestIterArray:
+    """Test lazy parsing of top-level JSON arrays from chunks."""
+    
+    DATA = [1, 23.5e3, "a,]b", {"x": [1, 2, {"y": None}]}, [], True, None, -0.5, "é" * 10, 1e-7]
+    
+    def _chunks(self, text, size):
+        return [text[i:i + size] for i in range(0, len(text), size)]
+    
+    def test_elements_split_across_chunks(self):
+        """Test every chunk size, including ones that cut numbers and strings."""
+        text = json.dumps(self.DATA, indent=2)
+        for size in (1, 2, 3, 7, len(text)):
+            assert list(iter_array(self._chunks(text, size))) == self.DATA
+    
+    def test_number_cut_at_chunk_boundary(self):
+        """Test that a number is not yielded before all of its digits arrived."""
+        assert list(iter_array(["[12", "34, 1.", "5]"])) == [1234, 1.5]
+    
+    def test_empty_array(self):
+        """Test empty arrays with surrounding whitespace."""
+        assert list(iter_array([" [ ", " ] "])) == []
+    
+    def test_elements_are_yielded_lazily(self):
+        """Test that elements are available before the rest of the input is read."""
+        def chunks():
+            yield '[{"id": 1}, '
+            raise AssertionError("read too far")
+        assert next(iter_array(chunks())) == {"id": 1}
+    
+    def test_invalid_arrays(self):
+        """Test errors for non-arrays and malformed arrays."""
+        for text in ('{"a": 1}', '[1,]', '[1 2]', '[1', '[1] extra', ''):
+            with pytest.raises(OriginError, match="Invalid JSON"):
+                list(iter_array([text]))
\ No newline at end of file
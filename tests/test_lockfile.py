@@ -1,9 +1,11 @@
 import unittest
 import tempfile
 import json
+import multiprocessing
 import os
 import sys
 from pathlib import Path
+from unittest.mock import patch
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -12,6 +14,13 @@ from origin.lock import Lockfile
 from origin.errors import OriginPkgError
 
 
+def _add_packages(lock_path, prefix, count):
+    """Add packages one at a time, as a separate origin process would."""
+    lockfile = Lockfile(Path(lock_path))
+    for i in range(count):
+        lockfile.add_package(f"{prefix}{i}", "1.0.0", f"{prefix}{i}")
+
+
 class TestLockfile(unittest.TestCase):
     """Test lockfile functionality."""
     
@@ -187,6 +196,57 @@ class TestLockfile(unittest.TestCase):
         # Should raise error when loading
         with self.assertRaises(OriginPkgError):
             self.lockfile.load()
+    
+    def test_transaction_writes_once(self):
+        """Test that changes in a transaction are written together when it ends."""
+        with patch.object(self.lockfile, '_write', wraps=self.lockfile._write) as write:
+            with self.lockfile.transaction():
+                for i in range(10):
+                    self.lockfile.add_package(f"pkg{i}", "1.0.0", f"sum{i}")
+                self.lockfile.remove_package("pkg0")
+                self.assertFalse(self.lock_path.exists())
+            self.assertEqual(write.call_count, 1)
+        
+        packages = json.loads(self.lock_path.read_text())["packages"]
+        self.assertEqual(sorted(packages), [f"pkg{i}" for i in range(1, 10)])
+    
+    def test_failed_transaction_is_discarded(self):
+        """Test that a transaction whose block raises leaves the lockfile unchanged."""
+        self.lockfile.add_package("kept", "1.0.0", "abc")
+        before = self.lock_path.read_text()
+        
+        with self.assertRaises(RuntimeError):
+            with self.lockfile.transaction():
+                self.lockfile.add_package("dropped", "1.0.0", "def")
+                raise RuntimeError("install failed")
+        
+        self.assertEqual(self.lock_path.read_text(), before)
+        self.assertFalse(self.lockfile.has_package("dropped"))
+    
+    def test_failed_write_keeps_old_file(self):
+        """Test that an interrupted write leaves the previous lockfile and no temporary files."""
+        self.lockfile.add_package("kept", "1.0.0", "abc")
+        before = self.lock_path.read_text()
+        
+        with patch('origin.lock.json.dump', side_effect=OSError("disk full")):
+            with self.assertRaises(OriginPkgError):
+                self.lockfile.add_package("new", "1.0.0", "def")
+        
+        self.assertEqual(self.lock_path.read_text(), before)
+        self.assertEqual(sorted(p.name for p in Path(self.temp_dir).iterdir()), [".origin.lock.lck", "origin.lock"])
+    
+    def test_concurrent_processes(self):
+        """Test that processes changing the same lockfile don't lose each other's packages."""
+        processes = [
+            multiprocessing.Process(target=_add_packages, args=(str(self.lock_path), prefix, 20))
+            for prefix in ("a", "b", "c", "d")
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        
+        self.assertEqual(len(Lockfile(self.lock_path).get_all_packages()), 80)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,65 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+import lexer
+import parser
+from src.origin.builtins.parallel import parallel
+from src.origin.evaluator import Evaluator
+from src.origin.errors import OriginError
+
+
+class TestParallel:
+    """Test the parallel builtin."""
+    
+    def test_results_in_order(self):
+        """Test that results follow the order of the items."""
+        def slow_square(x):
+            time.sleep(0.01 * (5 - x))
+            return x * x
+        
+        assert parallel(slow_square, [1, 2, 3, 4], 4) == [1, 4, 9, 16]
+    
+    def test_bounded_concurrency(self):
+        """Test that no more than `concurrency` calls run at once."""
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+        
+        def track(_):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+        
+        parallel(track, range(12), 3)
+        assert peak[0] == 3
+    
+    def test_error_propagates(self):
+        """Test that an error raised by the function propagates."""
+        def fail_on_two(x):
+            if x == 2:
+                raise OriginError("boom")
+            return x
+        
+        with pytest.raises(OriginError, match="boom"):
+            parallel(fail_on_two, [1, 2, 3], 2)
+    
+    def test_invalid_concurrency(self):
+        """Test that concurrency must be a positive integer."""
+        with pytest.raises(OriginError, match="concurrency"):
+            parallel(str, [1], 0)
+    
+    def test_origin_function(self):
+        """Test calling parallel on a user-defined function from Origin code."""
+        source = """
+define double(x):
+    x * 2
+let doubled = parallel(double, [1, 2, 3], 2)
+"""
+        variables = {}
+        Evaluator().execute(parser.parse(lexer.tokenize(source)), variables=variables)
+        assert variables["doubled"] == [2, 4, 6]
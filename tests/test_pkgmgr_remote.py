@@ -274,6 +274,47 @@ class TestRegistry:
         with open(self.registry_path, 'r') as f:
             data = json.load(f)
             assert data["std/math@1.0.0"] == "https://example.com/math-1.0.0.tar.gz"
+    
+    def test_registry_resolve_range_uses_index(self):
+        """Test that range lookups pick the highest match from the per-package index."""
+        registry_data = {
+            "std/math@1.10.0": "https://example.com/math-1.10.0.tar.gz",
+            "std/math@1.9.0": "https://example.com/math-1.9.0.tar.gz",
+            "std/math@3.0.0-beta": "https://example.com/math-3.0.0-beta.tar.gz",
+            "std/mathx@1.11.0": "https://example.com/mathx-1.11.0.tar.gz",
+            "std/math@latest": "https://example.com/math-latest.tar.gz",
+            "ui@1.0.0": {"url": "https://example.com/ui-1.0.0.tar.gz", "dependencies": {"std/math": "^1.0.0"}}
+        }
+        with open(self.registry_path, 'w') as f:
+            json.dump(registry_data, f)
+        
+        registry = Registry(self.registry_path)
+        assert registry.resolve_range("std/math", "^1.0.0") == ("1.10.0", "https://example.com/math-1.10.0.tar.gz")
+        assert [v for v, _ in registry.versions("std/math")] == ["3.0.0-beta", "1.10.0", "1.9.0", "latest"]
+        assert registry.resolve("std/math", "latest") == "https://example.com/math-latest.tar.gz"
+        assert registry.resolve("ui", "1.0.0") == "https://example.com/ui-1.0.0.tar.gz"
+        assert registry.dependencies("ui", "1.0.0") == {"std/math": "^1.0.0"}
+        assert registry.dependencies("std/math", "1.9.0") is None
+    
+    def test_registry_index_is_saved_and_invalidated(self):
+        """Test that the saved index is reused until registry.json changes."""
+        with open(self.registry_path, 'w') as f:
+            json.dump({"std/math@1.0.0": "https://example.com/math-1.0.0.tar.gz"}, f)
+        Registry(self.registry_path).resolve("std/math", "1.0.0")
+        index_path = self.registry_path.with_name("registry.json.idx")
+        assert index_path.exists()
+        
+        registry = Registry(self.registry_path)
+        with patch.object(Registry, '_load_registry', side_effect=AssertionError("registry.json was parsed")):
+            assert registry.resolve_range("std/math", "*") == ("1.0.0", "https://example.com/math-1.0.0.tar.gz")
+        
+        with open(self.registry_path, 'w') as f:
+            json.dump({"std/math@1.0.0": "https://example.com/math-1.0.0.tar.gz",
+                       "std/math@1.1.0": "https://example.com/math-1.1.0.tar.gz"}, f)
+        assert Registry(self.registry_path).resolve_range("std/math", "*")[0] == "1.1.0"
+        
+        registry.add_alias("std/math@1.2.0", "https://example.com/math-1.2.0.tar.gz")
+        assert registry.resolve_range("std/math", "*")[0] == "1.2.0"
 
 
 class TestPackageSpecParsing:
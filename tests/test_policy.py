@@ -0,0 +1,208 @@
+import io
+import json
+import urllib.error
+import urllib.response
+from unittest.mock import patch
+
+import pytest
+from src.origin.policy import NetworkPolicy, parse_retry_after
+from src.origin.net import download
+from src.origin.runtime.net import HTTPClient, NetworkError, safe_http_get
+from src.origin.errors import OriginError, OriginPkgError
+
+
+class FakeClock:
+    """Clock whose sleep advances time instantly."""
+    
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class Transient(Exception):
+    """Error the tests treat as worth retrying."""
+    
+    def __init__(self, retry_after=None):
+        super().__init__("try again")
+        self.retry_after = retry_after
+
+
+def _policy(clock, **kwargs):
+    return NetworkPolicy(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def _flaky(failures, error=Transient):
+    """A request that fails ``failures`` times before succeeding."""
+    calls = []
+    def attempt():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error()
+        return "ok"
+    return attempt, calls
+
+
+def _is_transient(e):
+    return isinstance(e, Transient)
+
+
+class TestRetries:
+    """Test retrying transient failures with backoff."""
+    
+    def test_transient_errors_are_retried(self):
+        """Test that a request succeeds after transient failures, with growing delays."""
+        clock = FakeClock()
+        attempt, calls = _flaky(2)
+        with patch('src.origin.policy.random.uniform', side_effect=lambda low, high: high):
+            assert _policy(clock).call("http://a/x", attempt, _is_transient) == "ok"
+        assert len(calls) == 3
+        assert clock.sleeps == [0.5, 1.0]
+    
+    def test_retries_are_limited(self):
+        """Test that the last error is raised once retries run out."""
+        clock = FakeClock()
+        attempt, calls = _flaky(10)
+        with pytest.raises(Transient):
+            _policy(clock, max_retries=2).call("http://a/x", attempt, _is_transient)
+        assert len(calls) == 3
+    
+    def test_permanent_errors_are_not_retried(self):
+        """Test that errors the caller does not consider transient fail at once."""
+        clock = FakeClock()
+        attempt, calls = _flaky(1, ValueError)
+        with pytest.raises(ValueError):
+            _policy(clock).call("http://a/x", attempt, _is_transient)
+        assert len(calls) == 1
+    
+    def test_retry_after_is_honoured(self):
+        """Test that a server's Retry-After sets the minimum delay."""
+        clock = FakeClock()
+        attempt, _ = _flaky(1, lambda: Transient(retry_after=7))
+        _policy(clock).call("http://a/x", attempt, _is_transient)
+        assert clock.sleeps[0] >= 7
+    
+    def test_parse_retry_after(self):
+        """Test Retry-After in seconds and as a date."""
+        assert parse_retry_after("120") == 120.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+class TestRateLimit:
+    """Test the per-host token bucket."""
+    
+    def test_requests_wait_for_tokens(self):
+        """Test that requests beyond the burst are spaced at the rate."""
+        clock = FakeClock()
+        policy = _policy(clock, rate=2, burst=2)
+        for _ in range(4):
+            policy.call("http://a/x", lambda: None, _is_transient)
+        assert clock.sleeps == [0.5, 0.5]
+    
+    def test_hosts_are_limited_separately(self):
+        """Test that each host has its own bucket."""
+        clock = FakeClock()
+        policy = _policy(clock, rate=1, burst=1)
+        policy.call("http://a/x", lambda: None, _is_transient)
+        policy.call("http://b/x", lambda: None, _is_transient)
+        assert clock.sleeps == []
+
+
+class TestCircuitBreaker:
+    """Test failing fast on hosts that keep failing."""
+    
+    def test_circuit_opens_and_recovers(self):
+        """Test that an open circuit rejects requests until the reset time has passed."""
+        clock = FakeClock()
+        policy = _policy(clock, max_retries=0, breaker_threshold=2, breaker_reset=10)
+        attempt, calls = _flaky(2)
+        for _ in range(2):
+            with pytest.raises(Transient):
+                policy.call("http://a/x", attempt, _is_transient)
+        
+        with pytest.raises(OriginError, match="Circuit open for a"):
+            policy.call("http://a/x", attempt, _is_transient)
+        assert len(calls) == 2
+        policy.call("http://b/x", lambda: None, _is_transient)  # Other hosts are unaffected
+        
+        clock.now += 10
+        assert policy.call("http://a/x", attempt, _is_transient) == "ok"
+        assert policy.call("http://a/x", attempt, _is_transient) == "ok"
+    
+    def test_circuit_error_class(self):
+        """Test that callers choose the error raised for an open circuit."""
+        clock = FakeClock()
+        policy = _policy(clock, max_retries=0, breaker_threshold=1)
+        with pytest.raises(Transient):
+            policy.call("http://a/x", _flaky(1)[0], _is_transient)
+        with pytest.raises(OriginPkgError):
+            policy.call("http://a/x", lambda: None, _is_transient, OriginPkgError)
+
+
+class TestConfiguration:
+    """Test loading settings from pkg.json and the environment."""
+    
+    def test_load_from_manifest(self, tmp_path):
+        """Test the pkg.json "network" section."""
+        (tmp_path / "pkg.json").write_text(json.dumps({
+            "name": "app", "network": {"rate": 5, "retries": 1, "retry_on": [500, 503]}
+        }))
+        policy = NetworkPolicy.load(tmp_path)
+        assert policy.rate == 5
+        assert policy.max_retries == 1
+        assert policy.retry_statuses == {500, 503}
+    
+    def test_environment_overrides_manifest(self, tmp_path):
+        """Test that ORIGIN_NET_* variables take precedence."""
+        (tmp_path / "pkg.json").write_text(json.dumps({"network": {"retries": 1}}))
+        with patch.dict('os.environ', {'ORIGIN_NET_RETRIES': '0', 'ORIGIN_NET_RETRY_ON': '429,500'}):
+            policy = NetworkPolicy.load(tmp_path)
+        assert policy.max_retries == 0
+        assert policy.retry_statuses == {429, 500}
+    
+    def test_invalid_settings(self, tmp_path):
+        """Test that unknown or invalid settings are reported."""
+        (tmp_path / "pkg.json").write_text(json.dumps({"network": {"retry": 1}}))
+        with pytest.raises(OriginError, match="Unknown network settings: retry"):
+            NetworkPolicy.load(tmp_path)
+
+
+class TestPolicyUsers:
+    """Test that http_get and package downloads go through the policy."""
+    
+    def test_http_get_retries_network_errors(self):
+        """Test that a refused connection is retried before failing."""
+        clock = FakeClock()
+        client = HTTPClient(policy=_policy(clock, max_retries=2))
+        try:
+            with pytest.raises(NetworkError):
+                safe_http_get("http://127.0.0.1:9/", timeout=1, client=client)
+        finally:
+            client.close()
+        assert len(clock.sleeps) == 2
+    
+    def test_download_retries_retryable_status(self, tmp_path):
+        """Test that downloads retry statuses in the retry set only."""
+        clock = FakeClock()
+        errors = [urllib.error.HTTPError("http://a/pkg.zip", 503, "Unavailable", {}, None)]
+        def urlopen(request, timeout=None):
+            if errors:
+                raise errors.pop()
+            return urllib.response.addinfourl(io.BytesIO(b"zip"), {}, request.full_url, 200)
+        with patch('src.origin.net.urllib.request.urlopen', side_effect=urlopen) as mock_urlopen:
+            download("http://a/pkg.zip", tmp_path / "pkg.zip", progress=False, policy=_policy(clock))
+        assert mock_urlopen.call_count == 2
+        
+        not_found = urllib.error.HTTPError("http://a/missing.zip", 404, "Not Found", {}, None)
+        with patch('src.origin.net.urllib.request.urlopen', side_effect=not_found) as mock_urlopen:
+            with pytest.raises(OriginPkgError, match="404"):
+                download("http://a/missing.zip", tmp_path / "missing.zip", progress=False, policy=_policy(clock))
+        assert mock_urlopen.call_count == 1
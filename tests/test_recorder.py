@@ -10,9 +10,12 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import lexer
 import parser
-from src.origin.recorder import Recorder
+from src.origin.recorder import Recorder, SamplingRecorder
+from src.origin.errors import OriginError
 from src.origin.evaluator import Evaluator
+from src.origin.replayer import Replayer
 from src.origin.snapshot import safe_snapshot
+from src.origin.utils import EventSlice
 
 
 class TestRecorder(unittest.TestCase):
@@ -139,6 +142,179 @@ class TestRecorder(unittest.TestCase):
         variables = final_event["locals"]
         self.assertEqual(variables["a"], 1)
         self.assertEqual(variables["b"], 2)
+    
+    def test_recorder_index_slice(self):
+        """Test that a recorder with an index slice only writes that window."""
+        with Recorder(self.recording_path, event_slice=EventSlice.parse("1:3")) as recorder:
+            for i in range(5):
+                recorder.record(f"LetNode:x{i}", {"variables": {"x": i}, "functions": []})
+        
+        with open(self.recording_path, 'r') as f:
+            events = [json.loads(line) for line in f]
+        
+        self.assertEqual([e["seq"] for e in events], [1, 2])
+        self.assertEqual(recorder.event_count, 2)
+        self.assertEqual(recorder.seq, 5)
+    
+    def test_recorder_block_slice(self):
+        """Test that a recorder with a block id slice starts and stops on block ids."""
+        block_ids = ["LetNode:a", "LetNode:b", "SayNode:b", "LetNode:c", "SayNode:c"]
+        with Recorder(self.recording_path, event_slice=EventSlice.parse("LetNode:b..LetNode:c")) as recorder:
+            for block_id in block_ids:
+                recorder.record(block_id, {"variables": {}, "functions": []})
+        
+        with open(self.recording_path, 'r') as f:
+            events = [json.loads(line) for line in f]
+        
+        self.assertEqual([e["blockId"] for e in events], ["LetNode:b", "SayNode:b", "LetNode:c"])
+    
+    def test_recorder_writes_change_sets(self):
+        """Test that each event lists the variables changed since the previous event."""
+        with Recorder(self.recording_path) as recorder:
+            recorder.record("LetNode:x", {"variables": {}, "functions": []})
+            recorder.record("LetNode:y", {"variables": {"x": 1}, "functions": []})
+            recorder.record("LetNode:x", {"variables": {"x": 1, "y": 2}, "functions": []})
+            recorder.record("SayNode:x", {"variables": {"x": 3}, "functions": []})
+        
+        with open(self.recording_path, 'r') as f:
+            events = [json.loads(line) for line in f]
+        
+        self.assertNotIn("changed", events[0])
+        self.assertEqual(events[1]["changed"], ["x"])
+        self.assertEqual(events[2]["changed"], ["y"])
+        self.assertEqual(sorted(events[3]["changed"]), ["x", "y"])
+    
+    def test_recorder_writes_checkpoints(self):
+        """Test that checkpointing recorders write deltas between full checkpoints."""
+        states = [{}, {"x": 1}, {"x": 1, "y": 2}, {"x": 3}, {"x": 3}]
+        with Recorder(self.recording_path, checkpoint_every=2) as recorder:
+            for variables in states:
+                recorder.record("LetNode:x", {"variables": variables, "functions": []})
+        
+        with open(self.recording_path, 'r') as f:
+            events = [json.loads(line) for line in f]
+        
+        self.assertTrue(all(e["version"] == "v3" for e in events))
+        self.assertEqual([bool(e.get("checkpoint")) for e in events], [True, False, True, False, True])
+        self.assertEqual(events[1]["delta"], {"x": 1})
+        self.assertEqual(events[2]["locals"], {"x": 1, "y": 2})
+        self.assertEqual(sorted(events[3]["changed"]), ["x", "y"])
+        self.assertEqual(events[3]["delta"], {"x": 3})
+    
+    def test_resume_from_checkpoint(self):
+        """Test that execution resumes from a recorded checkpoint."""
+        source = """
+        let a = 1
+        let b = a + 1
+        let a = 10
+        say a + b
+        """
+        ast = parser.parse(lexer.tokenize(source))
+        
+        with Recorder(self.recording_path, checkpoint_every=1) as recorder:
+            with patch('builtins.print'):
+                Evaluator(recorder).execute(ast)
+        
+        # Resume at "let a = 10" with a = 1 and b = 2 restored
+        replayer = Replayer.from_file(self.recording_path)
+        checkpoint = next(replayer.events[i] for i in range(len(replayer.events))
+                          if replayer.events[i].get("position", {}).get("stmt") == 2)
+        self.assertEqual(checkpoint["locals"]["b"], 2)
+        
+        with patch('builtins.print') as mock_print:
+            Evaluator().resume(ast, checkpoint["position"]["stmt"], checkpoint["locals"])
+        mock_print.assert_called_with(12)
+    
+    def test_resume_point(self):
+        """Test choosing the latest resumable checkpoint."""
+        source = """
+        let a = 1
+        let b = 2
+        """
+        ast = parser.parse(lexer.tokenize(source))
+        with Recorder(self.recording_path, checkpoint_every=1) as recorder:
+            Evaluator(recorder).execute(ast)
+        
+        replayer = Replayer.from_file(self.recording_path)
+        self.assertEqual(replayer.resume_point()["position"], {"stmt": 1})
+        self.assertEqual(replayer.resume_point(0)["position"], {"stmt": 0})
+
+
+
+class TestSamplingRecorder(unittest.TestCase):
+    """Test the sampling ring-buffer recorder."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.recording_path = pathlib.Path(self.temp_dir) / "sampled.orirec"
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+    
+    def _read_events(self):
+        with open(self.recording_path, 'r') as f:
+            return [json.loads(line) for line in f]
+    
+    def test_every_nth_event(self):
+        """Test that only every Nth event is sampled."""
+        recorder = SamplingRecorder(self.recording_path, every=3)
+        for i in range(10):
+            recorder.record(f"LetNode:x{i}", {"variables": {"x": i}, "functions": []})
+        
+        self.assertEqual([e["seq"] for e in recorder.ring], [2, 5, 8])
+    
+    def test_block_patterns(self):
+        """Test that only matching block ids are sampled."""
+        recorder = SamplingRecorder(self.recording_path, block_patterns=["SayNode:*"])
+        for block_id in ["LetNode:a", "SayNode:a", "LetNode:b", "SayNode:b"]:
+            recorder.record(block_id, {"variables": {}, "functions": []})
+        
+        self.assertEqual([e["blockId"] for e in recorder.ring], ["SayNode:a", "SayNode:b"])
+    
+    def test_rate_limit(self):
+        """Test that a low rate keeps only the first event of a burst."""
+        recorder = SamplingRecorder(self.recording_path, rate=0.001)
+        for i in range(5):
+            recorder.record(f"LetNode:x{i}", {"variables": {}, "functions": []})
+        
+        self.assertEqual([e["seq"] for e in recorder.ring], [0])
+    
+    def test_ring_keeps_last_events(self):
+        """Test that the ring buffer is bounded and keeps the most recent events."""
+        recorder = SamplingRecorder(self.recording_path, ring_size=3)
+        for i in range(10):
+            recorder.record(f"LetNode:x{i}", {"variables": {"x": i}, "functions": []})
+        
+        self.assertEqual([e["locals"]["x"] for e in recorder.ring], [7, 8, 9])
+    
+    def test_skipped_events_are_not_snapshotted(self):
+        """Test that lazy environments are only built for sampled events."""
+        calls = []
+        recorder = SamplingRecorder(self.recording_path, every=4)
+        for i in range(8):
+            recorder.record("LetNode:x", lambda i=i: calls.append(i) or {"variables": {"x": i}})
+        
+        self.assertEqual(calls, [3, 7])
+    
+    def test_no_file_on_success(self):
+        """Test that a successful run leaves no recording behind."""
+        with SamplingRecorder(self.recording_path) as recorder:
+            recorder.record("LetNode:x", {"variables": {"x": 1}, "functions": []})
+        
+        self.assertFalse(self.recording_path.exists())
+    
+    def test_dump_on_error(self):
+        """Test that the last sampled events are written when an OriginError escapes."""
+        with self.assertRaises(OriginError):
+            with SamplingRecorder(self.recording_path, ring_size=2) as recorder:
+                for i in range(5):
+                    recorder.record(f"LetNode:x{i}", {"variables": {"x": i}, "functions": []})
+                raise OriginError("boom")
+        
+        events = self._read_events()
+        self.assertEqual([e["seq"] for e in events], [3, 4])
+        self.assertEqual(recorder.event_count, 2)
 
 
 if __name__ == "__main__":
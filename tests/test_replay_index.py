@@ -0,0 +1,137 @@
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.origin.replayer import Replayer
+from src.origin.replay_index import RecordingIndex, RecordingQuery, index_path_for
+from src.origin.replay_shell import ReplayShell
+
+
+class TestRecordingIndex(unittest.TestCase):
+    """Test cases for the recording search index and queries."""
+    
+    def setUp(self):
+        """Write a recording where x grows and y appears late."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.recording_path = pathlib.Path(self.temp_dir) / "test.orirec"
+        states = [
+            ("LetNode:x", {}),
+            ("LetNode:x", {"x": 50}),
+            ("SayNode:x", {"x": 150}),
+            ("LetNode:y", {"x": 150}),
+            ("LetNode:x", {"x": 150, "y": "done"}),
+            ("SayNode:x", {"x": 20, "y": "done"}),
+        ]
+        with open(self.recording_path, 'w') as f:
+            for i, (block_id, variables) in enumerate(states):
+                event = {"version": "v2", "ts": float(i), "seq": i, "blockId": block_id,
+                         "locals": variables, "globals": {"functions": []}}
+                f.write(json.dumps(event) + '\n')
+        self.replayer = Replayer.from_file(self.recording_path)
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+    
+    def test_build_index(self):
+        """Test that changes and block executions are indexed."""
+        index = RecordingIndex.build(self.replayer)
+        self.assertEqual(index.changes_of("x"), [1, 2, 5])
+        self.assertEqual(index.changes_of("y"), [4])
+        self.assertEqual(index.events_for_block("LetNode:x"), [0, 1, 4])
+        self.assertEqual(index.changes_of("missing"), [])
+    
+    def test_next_change(self):
+        """Test finding the next change of a variable."""
+        index = RecordingIndex.build(self.replayer)
+        self.assertEqual(index.next_change("x", 1), 2)
+        self.assertEqual(index.next_change("x", 2), 5)
+        self.assertIsNone(index.next_change("x", 5))
+    
+    def test_index_saved_beside_recording(self):
+        """Test that the index is persisted and reused while the recording is unchanged."""
+        RecordingIndex.for_recording(self.recording_path, self.replayer)
+        index_path = index_path_for(self.recording_path)
+        self.assertTrue(index_path.exists())
+        
+        with patch.object(RecordingIndex, 'build', side_effect=AssertionError("rebuilt")):
+            index = RecordingIndex.for_recording(self.recording_path, self.replayer)
+        self.assertEqual(index.changes_of("x"), [1, 2, 5])
+    
+    def test_stale_index_is_rebuilt(self):
+        """Test that an index is rebuilt after the recording changes."""
+        RecordingIndex.for_recording(self.recording_path, self.replayer)
+        with open(self.recording_path, 'a') as f:
+            f.write(json.dumps({"version": "v2", "ts": 6.0, "blockId": "LetNode:z",
+                                "locals": {"x": 20, "y": "done", "z": 1}, "globals": {}}) + '\n')
+        
+        replayer = Replayer.from_file(self.recording_path)
+        index = RecordingIndex.for_recording(self.recording_path, replayer)
+        self.assertEqual(index.changes_of("z"), [6])
+    
+    def test_compare_query(self):
+        """Test comparison queries only match change points with matching values."""
+        index = RecordingIndex.build(self.replayer)
+        results = RecordingQuery.parse("x > 100").run(self.replayer, index)
+        self.assertEqual(results, [(2, 150)])
+        
+        results = RecordingQuery.parse('y == "done"').run(self.replayer, index)
+        self.assertEqual(results, [(4, "done")])
+    
+    def test_var_and_block_queries(self):
+        """Test var=, 'changed' and block= queries."""
+        index = RecordingIndex.build(self.replayer)
+        self.assertEqual([i for i, _ in RecordingQuery.parse("var=x").run(self.replayer, index)], [1, 2, 5])
+        self.assertEqual([i for i, _ in RecordingQuery.parse("y changed").run(self.replayer, index)], [4])
+        self.assertEqual([i for i, _ in RecordingQuery.parse("block=SayNode:x").run(self.replayer, index)], [2, 5])
+    
+    def test_invalid_query(self):
+        """Test that malformed queries are rejected."""
+        with self.assertRaises(ValueError):
+            RecordingQuery.parse("x ~ 3")
+    
+    def test_shell_when_changed(self):
+        """Test that the shell jumps to the next change of a variable."""
+        shell = ReplayShell(self.replayer)
+        self.replayer.goto(2)
+        with patch('builtins.print'):
+            self.assertTrue(shell.handle_when("x changed"))
+        self.assertEqual(self.replayer.current_index, 5)
+    
+    def test_shell_find(self):
+        """Test that the shell lists matching events."""
+        shell = ReplayShell(self.replayer, recording_path=self.recording_path)
+        with patch('builtins.print') as mock_print:
+            shell.handle_find("x > 100")
+        mock_print.assert_called_with("  2: SayNode:x  x = 150")
+    
+    
+    def test_shell_steps_use_recorded_change_sets(self):
+        """Test that adjacent steps only diff the keys the recording lists."""
+        events = [
+            {"version": "v2", "ts": 0.0, "blockId": "LetNode:x", "locals": {"x": 1, "y": 1}, "globals": {}},
+            {"version": "v2", "ts": 1.0, "blockId": "LetNode:y", "locals": {"x": 2, "y": 2}, "globals": {},
+             "changed": ["x"]}
+        ]
+        shell = ReplayShell(Replayer(events))
+        self.assertEqual(shell.compute_changes(0, 1), {"x": (1, 2)})
+        self.assertEqual(shell.compute_changes(1, 0), {"x": (2, 1)})
+    
+    def test_shell_jump_compares_environments(self):
+        """Test that non-adjacent jumps diff the full environments."""
+        shell = ReplayShell(self.replayer)
+        self.assertEqual(shell.compute_changes(0, 5), {"x": (None, 20), "y": (None, "done")})
+    
+    def test_shell_caches_display_values(self):
+        """Test that truncated values are computed once per event and key."""
+        shell = ReplayShell(self.replayer)
+        with patch('src.origin.replay_shell.truncate_value', side_effect=lambda v: v) as mock_truncate:
+            shell.compute_changes(1, 2)
+            shell.compute_changes(2, 1)
+        self.assertEqual(mock_truncate.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
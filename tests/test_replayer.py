@@ -4,8 +4,10 @@ import tempfile
 import unittest
 from unittest.mock import patch
 
-from src.origin.replayer import Replayer
-from src.origin.diff import compute_diff, format_diff, truncate_value
+from src.origin.recorder import Recorder
+from src.origin.replayer import Replayer, _apply_event, extract_recording
+from src.origin.utils import EventSlice
+from src.origin.diff import changed_keys, compute_diff, format_diff, truncate_value
 
 class TestReplayer(unittest.TestCase):
     """Test cases for the Replayer class."""
@@ -157,6 +159,19 @@ class TestReplayer(unittest.TestCase):
         self.assertIsNotNone(env)
         self.assertEqual(env['variables'], {"n": 5})
     
+    def test_changed_keys(self):
+        """Test reading recorded change sets."""
+        events = [
+            {"version": "v2", "ts": 0.0, "blockId": "LetNode:x", "locals": {}, "globals": {}},
+            {"version": "v2", "ts": 1.0, "blockId": "SayNode:x", "locals": {"x": 1}, "globals": {}, "changed": ["x"]}
+        ]
+        replayer = Replayer(events)
+        self.assertIsNone(replayer.changed_keys(0))
+        self.assertEqual(replayer.changed_keys(1), ["x"])
+        
+        # Old-format recordings carry no change sets
+        self.assertIsNone(Replayer(self.sample_events).changed_keys(1))
+    
     def test_get_info(self):
         """Test info retrieval."""
         replayer = Replayer(self.sample_events)
@@ -198,7 +213,7 @@ class TestReplayer(unittest.TestCase):
         
         with patch('builtins.print') as mock_print:
             replayer = Replayer(large_events)
-            mock_print.assert_called_with("Warning: Large recording with 1000001 events. Consider using --slice flag in future.")
+            mock_print.assert_called_with("Warning: Large recording with 1000001 events. Consider loading a range with --slice START:END.")
 
 class TestDiff(unittest.TestCase):
     """Test cases for diff functionality."""
@@ -239,6 +254,19 @@ class TestDiff(unittest.TestCase):
         self.assertEqual(len(changes), 1)
         self.assertEqual(changes["y"], (2, None))
     
+    def test_changed_keys(self):
+        """Test listing added, modified and removed keys."""
+        keys = changed_keys({"x": 1, "y": 2, "z": 3}, {"x": 1, "y": 5, "w": 0})
+        self.assertEqual(sorted(keys), ["w", "y", "z"])
+    
+    def test_compute_diff_with_keys(self):
+        """Test that only the given keys are compared."""
+        env1 = {"variables": {"x": 1, "y": 2}}
+        env2 = {"variables": {"x": 3, "y": 4}}
+        
+        changes = compute_diff(env1, env2, keys=["x"])
+        self.assertEqual(changes, {"x": (1, 3)})
+    
     def test_format_diff(self):
         """Test diff formatting."""
         changes = {"x": (1, 3), "y": (None, 2), "z": (4, None)}
@@ -269,5 +297,108 @@ class TestDiff(unittest.TestCase):
         result = truncate_value(large_dict)
         self.assertEqual(result["key"], "<truncated>")
 
+class TestCheckpoints(unittest.TestCase):
+    """Test cases for replaying v3 checkpointed recordings."""
+    
+    def setUp(self):
+        """Write a v3 recording with a checkpoint every 3 events."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.recording_path = pathlib.Path(self.temp_dir) / "test.orirec"
+        self.states = [{"n": i, "half": i // 2} for i in range(10)]
+        self.states[5].pop("half")
+        with Recorder(self.recording_path, checkpoint_every=3) as recorder:
+            for i, variables in enumerate(self.states):
+                recorder.record(f"LetNode:n{i}", {"variables": variables, "functions": ["f"] if i > 6 else []})
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+    
+    def test_env_at_rebuilds_state(self):
+        """Test that any event's state is rebuilt, in any access order."""
+        replayer = Replayer.from_file(self.recording_path)
+        for i in [9, 0, 4, 5, 3, 8, 1, 2, 7, 6]:
+            self.assertEqual(replayer.env_at(i)["variables"], self.states[i])
+        self.assertEqual(replayer.env_at(8)["functions"], ["f"])
+        self.assertEqual(replayer.env_at(6)["functions"], [])
+    
+    def test_stepping_applies_one_delta(self):
+        """Test that stepping forward continues from the previous state."""
+        replayer = Replayer.from_file(self.recording_path)
+        replayer.env_at(4)
+        with patch('src.origin.replayer._apply_event', wraps=_apply_event) as mock_apply:
+            replayer.env_at(5)
+        self.assertEqual(mock_apply.call_count, 1)
+    
+    def test_slice_starts_with_checkpoint(self):
+        """Test that a slice between checkpoints is rebased onto a checkpoint."""
+        replayer = Replayer.from_file(self.recording_path, EventSlice.parse("4:8"))
+        self.assertTrue(replayer.events[0]["checkpoint"])
+        self.assertEqual([replayer.env_at(i)["variables"] for i in range(4)], self.states[4:8])
+        
+        out_path = pathlib.Path(self.temp_dir) / "sub.orirec"
+        extract_recording(self.recording_path, out_path, EventSlice.parse("5:9"))
+        extracted = Replayer.from_file(out_path)
+        self.assertEqual([extracted.env_at(i)["variables"] for i in range(4)], self.states[5:9])
+
+class TestSlicing(unittest.TestCase):
+    """Test cases for loading and extracting slices of recordings."""
+    
+    def setUp(self):
+        """Write a small v2 recording."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.recording_path = pathlib.Path(self.temp_dir) / "test.orirec"
+        block_ids = ["LetNode:a", "LetNode:b", "SayNode:a", "LetNode:c", "SayNode:c"]
+        with open(self.recording_path, 'w') as f:
+            for i, block_id in enumerate(block_ids):
+                event = {"version": "v2", "ts": float(i), "seq": i, "blockId": block_id,
+                         "locals": {"i": i}, "globals": {"functions": []}}
+                f.write(json.dumps(event) + '\n')
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+    
+    def test_parse_index_slice(self):
+        """Test parsing START:END index slices."""
+        event_slice = EventSlice.parse("1:3")
+        self.assertFalse(event_slice.by_block)
+        self.assertEqual((event_slice.start, event_slice.end), (1, 3))
+        
+        open_slice = EventSlice.parse(":2")
+        self.assertEqual((open_slice.start, open_slice.end), (None, 2))
+    
+    def test_parse_block_slice(self):
+        """Test parsing START..END block id slices."""
+        event_slice = EventSlice.parse("LetNode:b..LetNode:c")
+        self.assertTrue(event_slice.by_block)
+        self.assertEqual((event_slice.start, event_slice.end), ("LetNode:b", "LetNode:c"))
+    
+    def test_parse_invalid_slice(self):
+        """Test that malformed slices are rejected."""
+        with self.assertRaises(ValueError):
+            EventSlice.parse("5:2")
+        with self.assertRaises(ValueError):
+            EventSlice.parse("LetNode:x")
+    
+    def test_from_file_index_slice(self):
+        """Test loading only a range of events by index."""
+        replayer = Replayer.from_file(self.recording_path, event_slice=EventSlice.parse("1:3"))
+        self.assertEqual([e["seq"] for e in replayer.events], [1, 2])
+    
+    def test_from_file_block_slice(self):
+        """Test loading only a range of events by block id."""
+        replayer = Replayer.from_file(self.recording_path, event_slice=EventSlice.parse("LetNode:b..LetNode:c"))
+        self.assertEqual([e["blockId"] for e in replayer.events], ["LetNode:b", "SayNode:a", "LetNode:c"])
+    
+    def test_extract_recording(self):
+        """Test writing a sub-recording."""
+        out_path = pathlib.Path(self.temp_dir) / "sub.orirec"
+        count = extract_recording(self.recording_path, out_path, EventSlice.parse("3:"))
+        self.assertEqual(count, 2)
+        
+        replayer = Replayer.from_file(out_path)
+        self.assertEqual([e["seq"] for e in replayer.events], [3, 4])
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from src.origin.resolver import ResolutionError, Resolver
+
+
+class FakeRegistry:
+    """Packages as {"name": {"version": {dependency: range}}}, counting lookups."""
+    
+    def __init__(self, packages):
+        self.packages = packages
+        self.version_calls = []
+        self.dependency_calls = []
+    
+    def versions(self, name):
+        self.version_calls.append(name)
+        return [(version, f"https://pkg.test/{name}-{version}.tar.gz") for version in self.packages.get(name, {})]
+    
+    def dependencies(self, name, version, url):
+        self.dependency_calls.append((name, version))
+        return self.packages[name][version]
+    
+    def resolver(self, preferred=None):
+        return Resolver(self.versions, self.dependencies, preferred)
+
+
+def _versions(resolution):
+    return {name: package.version for name, package in resolution.items()}
+
+
+class TestResolver:
+    """Test resolving dependency graphs."""
+    
+    def test_transitive_dependencies(self):
+        """Test that dependencies of dependencies are resolved to their newest matching versions."""
+        registry = FakeRegistry({
+            "app-ui": {"1.0.0": {"widgets": "^2.0.0"}, "1.1.0": {"widgets": "^2.1.0", "text": "~1.0.0"}},
+            "widgets": {"2.0.0": {}, "2.1.0": {"text": "^1.0.0"}, "2.2.0": {"text": "^1.0.0"}, "3.0.0": {}},
+            "text": {"1.0.0": {}, "1.0.5": {}, "1.1.0": {}},
+        })
+        resolution = registry.resolver().resolve({"app-ui": "^1.0.0"})
+        assert _versions(resolution) == {"app-ui": "1.1.0", "widgets": "2.2.0", "text": "1.0.5"}
+        assert resolution["widgets"].url == "https://pkg.test/widgets-2.2.0.tar.gz"
+        assert resolution["app-ui"].dependencies == {"widgets": "^2.1.0", "text": "~1.0.0"}
+    
+    def test_backtracks_to_older_versions(self):
+        """Test that a version whose dependencies conflict is given up for an older one."""
+        registry = FakeRegistry({
+            "a": {"1.0.0": {"c": "^1.0.0"}, "2.0.0": {"c": "^2.0.0"}},
+            "b": {"1.0.0": {"d": "^1.0.0"}, "1.1.0": {"d": "^1.0.0", "c": "^1.0.0"}},
+            "c": {"1.0.0": {}, "2.0.0": {}},
+            "d": {"1.0.0": {}, "1.1.0": {"e": "^3.0.0"}},
+            "e": {"1.0.0": {}},
+        })
+        resolution = registry.resolver().resolve({"a": "*", "b": "^1.1.0"})
+        assert _versions(resolution) == {"a": "1.0.0", "b": "1.1.0", "c": "1.0.0", "d": "1.0.0"}
+    
+    def test_cycles(self):
+        """Test that packages depending on each other resolve."""
+        registry = FakeRegistry({
+            "a": {"1.0.0": {"b": "^1.0.0"}},
+            "b": {"1.0.0": {"a": "^1.0.0"}},
+        })
+        assert _versions(registry.resolver().resolve({"a": "^1.0.0"})) == {"a": "1.0.0", "b": "1.0.0"}
+    
+    def test_preferred_versions_are_kept(self):
+        """Test that locked versions are chosen while they satisfy every requirement."""
+        registry = FakeRegistry({"a": {"1.0.0": {}, "1.1.0": {}, "2.0.0": {}}})
+        assert _versions(registry.resolver({"a": "1.0.0"}).resolve({"a": "^1.0.0"})) == {"a": "1.0.0"}
+        assert _versions(registry.resolver({"a": "1.0.0"}).resolve({"a": "^1.1.0"})) == {"a": "1.1.0"}
+    
+    def test_missing_dependencies_are_listed(self):
+        """Test that every unsatisfiable direct dependency is reported at once."""
+        registry = FakeRegistry({"a": {"1.0.0": {}}})
+        with pytest.raises(ResolutionError, match=r"No version satisfies a@\^2.0.0, missing@\^1.0.0"):
+            registry.resolver().resolve({"a": "^2.0.0", "missing": "^1.0.0"})
+    
+    def test_conflict_is_explained(self):
+        """Test that an unsatisfiable graph names the requirements that conflict."""
+        registry = FakeRegistry({
+            "a": {"1.0.0": {"c": "^1.0.0"}},
+            "b": {"1.0.0": {"c": "^2.0.0"}, "1.1.0": {"c": "^2.1.0"}},
+            "c": {"1.0.0": {}, "2.0.0": {}, "2.1.0": {}},
+        })
+        with pytest.raises(ResolutionError) as excinfo:
+            registry.resolver().resolve({"a": "^1.0.0", "b": "^1.0.0"}, root="app")
+        message = str(excinfo.value)
+        assert message.startswith("Cannot resolve dependencies: no version of a satisfies ^1.0.0 (required by app)")
+        assert "a@1.0.0 leads to a conflict: no version of b satisfies ^1.0.0 (required by app)" in message
+        assert "b@1.1.0 requires c ^2.1.0, but no version of c matches that and ^1.0.0 (required by a@1.0.0)" in message
+        assert "b@1.0.0 requires c ^2.0.0" in message
+    
+    def test_lookups_are_memoized(self):
+        """Test that each package's versions and dependencies are fetched once."""
+        registry = FakeRegistry({
+            "a": {"1.0.0": {"c": "^1.0.0"}, "2.0.0": {"c": "^2.0.0"}},
+            "b": {"1.0.0": {"c": "^1.0.0"}},
+            "c": {"1.0.0": {}, "2.0.0": {}},
+        })
+        registry.resolver().resolve({"a": "*", "b": "*"})
+        assert sorted(registry.version_calls) == ["a", "b", "c"]
+        assert len(registry.dependency_calls) == len(set(registry.dependency_calls))
+    
+    def test_large_graph(self):
+        """Test that a 1000-package graph resolves quickly."""
+        packages = {}
+        for i in range(1000):
+            for minor in range(5):
+                dependencies = {f"p{j}": f"^1.{minor % 3}.0" for j in (i + 1, i * 2 + 1, i * 3 + 2) if j < 1000}
+                packages.setdefault(f"p{i}", {})[f"1.{minor}.0"] = dependencies
+        registry = FakeRegistry(packages)
+        
+        start = time.perf_counter()
+        resolution = registry.resolver().resolve({"p0": "^1.0.0"})
+        assert len(resolution) == 1000
+        assert time.perf_counter() - start < 5
@@ -6,7 +6,7 @@ import os
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from origin.semver import SemVer, SemVerRange, parse_version_range, find_highest_compatible_version
+from origin.semver import SemVer, SemVerRange, VersionSet, parse_version_range, find_highest_compatible_version
 from origin.errors import OriginPkgError
 
 
@@ -72,6 +72,25 @@ class TestSemVer(unittest.TestCase):
         self.assertTrue(v1_beta < v1_final)
         self.assertTrue(v1_final > v1_alpha)
     
+    def test_prerelease_precedence(self):
+        """Test prerelease ordering by identifier, numeric identifiers numerically."""
+        ordered = ["1.0.0-alpha", "1.0.0-alpha.1", "1.0.0-alpha.beta", "1.0.0-beta",
+                   "1.0.0-beta.2", "1.0.0-beta.11", "1.0.0-rc.1", "1.0.0"]
+        versions = [SemVer.parse(v) for v in ordered]
+        self.assertEqual([str(v) for v in sorted(reversed(versions))], ordered)
+        self.assertEqual(max(versions, key=lambda v: v.sort_key), versions[-1])
+    
+    def test_build_metadata_is_ignored_in_comparisons(self):
+        """Test that versions differing only in build metadata are equal and hash alike."""
+        self.assertEqual(SemVer.parse("1.0.0+a"), SemVer.parse("1.0.0+b"))
+        self.assertEqual(len({SemVer.parse("1.0.0+a"), SemVer.parse("1.0.0")}), 1)
+    
+    def test_parsed_versions_are_shared(self):
+        """Test that parsing is cached and versions have no per-instance dict."""
+        version = SemVer.parse("1.2.3")
+        self.assertIs(SemVer.parse("1.2.3"), version)
+        self.assertFalse(hasattr(version, "__dict__"))
+    
     def test_version_string_conversion(self):
         """Test converting versions back to strings."""
         test_cases = [
@@ -240,5 +259,65 @@ class TestFindHighestCompatibleVersion(unittest.TestCase):
         self.assertEqual(result, "1.2.0")
 
 
+
+class TestVersionSet(unittest.TestCase):
+    """Test interval arithmetic on version ranges."""
+    
+    def test_from_range(self):
+        """Test converting ranges to intervals."""
+        test_cases = [
+            ("^1.2.0", ">=1.2.0 <2.0.0"),
+            ("~1.4.0", ">=1.4.0 <1.5.0"),
+            ("<1.0.0", "<1.0.0"),
+            ("=1.2.3", "=1.2.3"),
+            ("*", "*"),
+            (">=1.0.0 <=1.5.0", ">=1.0.0 <=1.5.0"),
+        ]
+        
+        for range_str, expected in test_cases:
+            with self.subTest(range=range_str):
+                self.assertEqual(str(VersionSet.from_range(range_str)), expected)
+    
+    def test_intersect(self):
+        """Test intersecting overlapping and disjoint ranges."""
+        caret = VersionSet.from_range("^1.2.0")
+        self.assertEqual(str(caret.intersect(VersionSet.from_range("~1.4.0"))), ">=1.4.0 <1.5.0")
+        self.assertEqual(str(caret.intersect(VersionSet.from_range(">1.9.0"))), ">1.9.0 <2.0.0")
+        self.assertTrue(caret.intersect(VersionSet.from_range("^2.0.0")).is_empty())
+        self.assertTrue(VersionSet.from_range("<1.0.0").intersect(VersionSet.from_range(">=1.0.0")).is_empty())
+        self.assertFalse(VersionSet.from_range("<=1.0.0").intersect(VersionSet.from_range(">=1.0.0")).is_empty())
+    
+    def test_union(self):
+        """Test that unions keep disjoint intervals apart and merge touching ones."""
+        caret = VersionSet.from_range("^1.2.0")
+        self.assertEqual(str(caret.union(VersionSet.from_range("^3.0.0"))), ">=1.2.0 <2.0.0 || >=3.0.0 <4.0.0")
+        self.assertEqual(str(caret.union(VersionSet.from_range("~2.0.0"))), ">=1.2.0 <2.1.0")
+        self.assertEqual(VersionSet.from_range("<1.0.0").union(VersionSet.from_range(">=1.0.0")), VersionSet.any())
+        
+        split = caret.union(VersionSet.from_range("^3.0.0"))
+        self.assertEqual(str(split.intersect(VersionSet.from_range(">=1.5.0 <3.5.0"))),
+                         ">=1.5.0 <2.0.0 || >=3.0.0 <3.5.0")
+    
+    def test_contains(self):
+        """Test membership agrees with SemVerRange.satisfies."""
+        versions = ["0.9.0", "1.0.0", "1.2.0", "1.2.5", "1.9.9", "2.0.0", "2.0.0-beta", "3.0.0", "3.1.0"]
+        ranges = ["^1.2.0", "~1.2.0", ">=1.0.0 <2.0.0", ">1.2.0", "<=2.0.0", "1.2.5", "*"]
+        
+        for range_str in ranges:
+            version_set = VersionSet.from_range(range_str)
+            version_range = SemVerRange(range_str)
+            for version_str in versions:
+                with self.subTest(range=range_str, version=version_str):
+                    version = SemVer.parse(version_str)
+                    self.assertEqual(version_set.contains(version), version_range.satisfies(version))
+    
+    def test_empty_compound_range_is_invalid(self):
+        """Test that a range whose comparators exclude each other is rejected."""
+        with self.assertRaises(OriginPkgError):
+            VersionSet.from_range(">=2.0.0 <1.0.0")
+        self.assertTrue(VersionSet().is_empty())
+        self.assertEqual(str(VersionSet()), "<empty>")
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,83 @@
+import errno
+import os
+from unittest.mock import patch
+
+import pytest
+from src.origin.errors import OriginPkgError
+from src.origin.store import PackageStore, get_link_mode
+
+CHECKSUM = "ab" * 32
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A store holding one library, 'math', under CHECKSUM."""
+    store = PackageStore(tmp_path / "store")
+    lib_dir = tmp_path / "extracted" / "math"
+    (lib_dir / "sub").mkdir(parents=True)
+    (lib_dir / "math.origin").write_text("say 1")
+    (lib_dir / "sub" / "util.origin").write_text("say 2")
+    store.add(CHECKSUM, lib_dir)
+    return store
+
+
+class TestPackageStore:
+    """Test adding packages to the store and linking them into projects."""
+    
+    def test_add(self, store, tmp_path):
+        """Test that a library is moved into its checksum's entry."""
+        assert store.has(CHECKSUM)
+        assert store.has(CHECKSUM.upper())
+        assert store.library(CHECKSUM) == tmp_path / "store" / CHECKSUM / "math"
+        assert not (tmp_path / "extracted" / "math").exists()
+        assert not store.has("cd" * 32)
+    
+    def test_add_existing_is_a_no_op(self, store, tmp_path):
+        """Test that adding a stored checksum again keeps the first copy."""
+        other = tmp_path / "other" / "math"
+        other.mkdir(parents=True)
+        (other / "math.origin").write_text("say 3")
+        library = store.add(CHECKSUM, other)
+        assert (library / "math.origin").read_text() == "say 1"
+        assert [p.name for p in store.root.iterdir()] == [CHECKSUM]
+    
+    def test_hardlink(self, store, tmp_path):
+        """Test that hardlinked installs share the stored files."""
+        dest = tmp_path / "libs" / "math"
+        dest.parent.mkdir()
+        store.link(CHECKSUM, dest, "hardlink")
+        assert os.path.samefile(dest / "sub" / "util.origin", store.library(CHECKSUM) / "sub" / "util.origin")
+    
+    def test_symlink(self, store, tmp_path):
+        dest = tmp_path / "math"
+        store.link(CHECKSUM, dest, "symlink")
+        assert dest.is_symlink()
+        assert (dest / "math.origin").read_text() == "say 1"
+    
+    def test_copy(self, store, tmp_path):
+        dest = tmp_path / "math"
+        store.link(CHECKSUM, dest, "copy")
+        assert not os.path.samefile(dest / "math.origin", store.library(CHECKSUM) / "math.origin")
+    
+    def test_auto_falls_back_to_copy(self, store, tmp_path):
+        """Test that "auto" copies when hardlinks are impossible, e.g. across filesystems."""
+        def cross_device(src, dst):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        dest = tmp_path / "math"
+        with patch('src.origin.store.os.link', side_effect=cross_device):
+            store.link(CHECKSUM, dest, "auto")
+            with pytest.raises(OriginPkgError, match="Failed to hardlink"):
+                store.link(CHECKSUM, tmp_path / "math2", "hardlink")
+        assert (dest / "sub" / "util.origin").read_text() == "say 2"
+        assert not (tmp_path / "math2").exists()
+    
+    def test_link_missing_package(self, store, tmp_path):
+        with pytest.raises(OriginPkgError, match="not in the store"):
+            store.link("cd" * 32, tmp_path / "x")
+    
+    def test_link_mode_setting(self, monkeypatch):
+        monkeypatch.setenv("ORIGIN_LINK_MODE", "symlink")
+        assert get_link_mode() == "symlink"
+        monkeypatch.setenv("ORIGIN_LINK_MODE", "reflink")
+        with pytest.raises(OriginPkgError, match="Invalid ORIGIN_LINK_MODE"):
+            get_link_mode()